@@ -1,21 +1,28 @@
-import logging
-from game_logger import setup_logging
+from game_logger import setup_logging, ClassLogger
+import time
 import pygame
 from players import UserPlayer, AIPlayer
 from pieces import Piece
+from pgn import PGNGame, write_game
 
 setup_logging()
 
 
 class Game:
-    def __init__(self, ui, user_player, ai_player, board):
+    logger = ClassLogger()
+    # Upper bound on loop iterations per second, so an idle game sleeps
+    FRAME_RATE = 60
+
+    def __init__(self, ui, user_player, ai_player, board, pgn_path=None):
         self.ui = ui
         self.user_player = user_player
         self.ai_player = ai_player
         self.board = board
+        # File the game is appended to as PGN when it ends, or None
+        self.pgn_path = pgn_path
         self.game_running = True
         self.current_player = user_player
-        self.logger = logging.getLogger(self.__class__.__name__)
+        self.clock = pygame.time.Clock()
         self.logger.info("A new game has been created.")
 
     def get_square_from_mouse(pos, cell_size=100):
@@ -43,28 +50,56 @@ class Game:
                 if event.type == pygame.QUIT:
                     self.game_running = False
 
+                elif event.type == pygame.VIDEOEXPOSE:
+                    # The window was uncovered: paint every square again
+                    self.ui.invalidate()
+
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     clicked_square = self.ui.get_square_from_mouse(event.pos)
                     if self.current_player == self.user_player:
                         self.handle_user_player_click(clicked_square)
                         self.update_ui()
-                if self.current_player == self.ai_player:
-                    self.logger.info("AI's Turn ")
-                        # AI player's turn logic
-                    self.handle_ai_player_turn()
-                    pygame.display.update()
-
-                elif self.board.is_game_over():
-                    self.logger.info("Game over!")
-                    self.game_running = False
 
-            self.logger.info(f"Current player's turn: {id(self.current_player)}")
-            self.logger.info(f"AI player definition: {id(self.ai_player)}")
+            # The AI searches in the background; each frame only checks on it
+            if self.current_player == self.ai_player and self.game_running:
+                self.handle_ai_player_turn()
+
+            # Logged every frame, so only at DEBUG
+            self.logger.debug("Current player's turn: %d",
+                              id(self.current_player))
+            self.logger.debug("AI player definition: %d", id(self.ai_player))
+            # Only squares that changed are painted and pushed to the screen
             self.update_ui()
-            pygame.display.update()
+            self.clock.tick(self.FRAME_RATE)
+
+        if self.ai_player.is_thinking or self.ai_player.is_pondering:
+            self.ai_player.stop_thinking()
+        if self.board.is_game_over():
+            self.logger.info("Game over: %s", self.board.game_status)
+        if self.pgn_path is not None:
+            self.save_game(self.pgn_path)
+
+    def save_game(self, path):
+        """
+        Appends the moves played so far to a PGN file, with "*" as the result
+        if the game was left unfinished.
+
+        Args:
+            path (str): The PGN file to append to.
+        """
+        players = {self.user_player.colour: "Player",
+                   self.ai_player.colour: f"AI (depth {self.ai_player.depth})"}
+        game = PGNGame.from_board(self.board, {
+            "Event": "Casual game", "Date": time.strftime("%Y.%m.%d"),
+            "White": players["White"], "Black": players["Black"]})
+        with open(path, "a", encoding="utf-8") as stream:
+            write_game(stream, game)
+        self.logger.info("Game saved to %s", path)
 
     def handle_user_player_click(self, clicked_square):
         piece = self.board.get_piece_at_position(*clicked_square)
+        # Highlights of the previous click are replaced by this click's
+        self.ui.clear_highlights()
         # self.logger.info(f"Piece: {piece}")
         # self.logger.info (f"Stored {self.user_player.chosen_piece}")
         if isinstance(piece, Piece):  # Ensure piece is actually a Piece object
@@ -75,26 +110,28 @@ class Game:
             else:
                 # No possible moves, highlight in red
                 self.ui.highlight_square(*clicked_square, colour="RED")
-            self.logger.info(f"Player {self.current_player} clicked on square {clicked_square} with piece {piece}")
+            self.logger.info("Player %s clicked on square %s with piece %s",
+                             self.current_player, clicked_square, piece)
         else:
             # Handle empty cell click, possibly highlight in red if no piece is selected
             if not self.current_player.chosen_piece:
                 self.ui.highlight_square(*clicked_square, colour="RED")
-            self.logger.info(f"Player {self.current_player} clicked on empty square {clicked_square}")
+            self.logger.info("Player %s clicked on empty square %s",
+                             self.current_player, clicked_square)
 
 
         if self.user_player.chosen_piece != None and isinstance(self.user_player.chosen_piece, Piece):
             possible_moves = self.user_player.chosen_piece.get_possible_moves(self.board)
-            self.logger.info (f"Stored {self.user_player.chosen_piece}")
-            self.logger.info(f"Clicked piece is {clicked_square}")
-            self.logger.info(f"Possible moves are {possible_moves}" )
+            self.logger.info("Stored %s", self.user_player.chosen_piece)
+            self.logger.info("Clicked piece is %s", clicked_square)
+            self.logger.info("Possible moves are %s", possible_moves)
             if clicked_square in (possible_moves):
                 self.logger.info("Move is valid")
 
                 # Move the piece to the new position
                 self.board.move_piece(self.user_player.chosen_square, clicked_square)
                 # Log the move
-                self.logger.info(f"Moved {piece} to {clicked_square}")
+                self.logger.info("Moved %s to %s", piece, clicked_square)
                 self.switch_turns()
                 
                 
@@ -108,7 +145,25 @@ class Game:
 
     def update_ui(self):
         self.ui.display_board(self.board.get_board())
-        pygame.display.update()
+        self.ui.update_display()
 
     def handle_ai_player_turn(self):
-        self.ai_player.make_move(self.board)
\ No newline at end of file
+        """
+        Starts the AI's search on its turn, shows its progress while it runs
+        and plays its move once it is done, without blocking the event loop.
+        """
+        if not self.ai_player.is_thinking:
+            self.logger.info("AI's Turn ")
+            self.ai_player.start_thinking(self.board)
+            return
+        moved = self.ai_player.poll_move(self.board)
+        if moved is None:
+            depth, nodes, elapsed = self.ai_player.progress
+            self.ui.show_status(f"thinking: depth {depth}, {nodes} nodes, "
+                                f"{elapsed:.1f}s")
+            return
+        self.ui.show_status(None)
+        if moved:
+            self.switch_turns()
+            # Keep thinking on the user's time, if the AI ponders
+            self.ai_player.start_pondering(self.board)
\ No newline at end of file
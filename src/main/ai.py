@@ -1,16 +1,46 @@
+import time
 from board import ChessBoard
-from utilities import Utilities
-from pieces import Piece
-# from pieces import Piece
-
-import copy
+from pieces import Piece, MoveGenerator
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from move_ordering import MoveOrderer
+from evaluation import CENTIPAWNS, compute_piece_square_score
+from bitboard import PIECE_INDEX
 
 
+class SearchTimeout(Exception):
+    """
+    Raised inside minimax when the time or node budget of a search runs out.
+    """
 
 
 class AI:
-    def __init__(self, chess_board: ChessBoard):
+    # How many nodes are searched between two checks of the budget
+    CHECK_INTERVAL = 256
+    # Safety margin of delta pruning, in centipawns
+    DELTA_MARGIN = 200
+    # Score of being checkmated at the root; mates further away score less
+    MATE_SCORE = 1000000
+    # Scores at least this far from zero are mates, whatever their distance
+    MATE_THRESHOLD = MATE_SCORE - 1000
+
+    def __init__(self, chess_board: ChessBoard, hash_size_mb: float = 16,
+                 transposition_table: TranspositionTable = None):
         self.chess_board = chess_board
+        self.transposition_table = transposition_table or \
+            TranspositionTable(hash_size_mb)
+        self.nodes = 0
+        self.completed_depth = 0
+        # Any object with is_set(), e.g. a threading or multiprocessing
+        # Event; once set, the running search stops like on a timeout
+        self.stop_event = None
+        # Called as on_iteration(depth, score, best_move) after every
+        # completed iteration of search, e.g. to report progress
+        self.on_iteration = None
+        self.__can_stop = False
+        self.__deadline = None
+        self.__node_limit = None
+        self.__next_check = self.CHECK_INTERVAL
+        self.__root_move = None
         self.piece_score = {
             "King": 1000,
             "Queen": 10,
@@ -19,60 +49,223 @@ class AI:
             "Knight": 3,
             "Pawn": 1
         }
+        self.move_orderer = MoveOrderer(self.piece_score)
     
-    def evaluate(self, board: list) -> tuple:
+    def evaluate(self, board: list = None, full: bool = False) -> tuple:
         """
-        Evaluates the score of the current board state.
+        Evaluates the score of the current board state: material plus
+        piece-square terms, in whole centipawns, positive when Black is
+        better. Piece values are rounded to whole centipawns, so fractional
+        weights such as a 3.255 bishop still give integer scores, which the
+        transposition table stores exactly.
+
+        The running totals kept by the chess board are used by default.
+        With full=True the score is rebuilt square by square instead, which
+        is slower but useful for checking the running totals.
 
         Args:
-            board (list): The chess board state.
+            board (list): The chess board state, used by the full
+                          recompute. Defaults to the AI's chess board.
+            full (bool): True to recompute the score from scratch.
 
         Returns:
             tuple: A tuple containing the score and the best move.
         """
-        score = 0
+        if full:
+            return self.__evaluate_full(board or self.chess_board.get_board()), None
+
+        counts = self.chess_board.bitboards.counts
+        score = self.chess_board.piece_square_score
+        for name, value in self.piece_score.items():
+            score += (counts[PIECE_INDEX[("Black", name)]] -
+                      counts[PIECE_INDEX[("White", name)]]) * \
+                round(value * CENTIPAWNS)
+        return score, None
+
+    def __evaluate_full(self, board: list) -> int:
+        """
+        Recomputes the evaluation by walking all 64 squares.
+
+        Args:
+            board (list): The chess board state.
+
+        Returns:
+            int: The score in centipawns, positive when Black is better.
+        """
+        score = compute_piece_square_score(board)
         for i in range(8):
             for j in range(8):
                 piece = board[i][j]
                 if isinstance(piece, Piece):
-                    piece_value = self.piece_score[piece.__class__.__name__]
+                    piece_value = round(self.piece_score[piece.name] *
+                                        CENTIPAWNS)
                     if piece.colour == "White":
                         score -= piece_value
                     elif piece.colour == "Black":
                         score += piece_value
-                        
-                if self.is_capture_move(i, j, piece, board):
-                    capture_bonus = 5 
-                    score += capture_bonus if piece.colour == "Black" else -capture_bonus
+        return score
 
-        return score, None
+    def search(self, max_depth: int, is_maximizing_player: bool,
+               time_limit: float = None, node_limit: int = None,
+               start_depth: int = 1) -> tuple:
+        """
+        Runs an iterative-deepening search: minimax to depth 1, 2, 3... until
+        max_depth is reached, the time or node budget runs out or the stop
+        event is set.
+
+        Each iteration tries the best move of the previous one first. The
+        first iteration always runs to completion so that a move is found.
+
+        Args:
+            max_depth (int): The deepest iteration to run.
+            is_maximizing_player (bool): True if the side to move is the
+                                         maximizing player, False otherwise.
+            time_limit (float): The wall-clock budget in seconds, or None.
+            node_limit (int): The node budget, or None.
+            start_depth (int): The depth of the first iteration.
 
-    def is_capture_move(self, row: int, col: int, piece: Piece, board: list) -> bool:
+        Returns:
+            tuple: The score and best move of the last completed iteration.
+        """
+        self.nodes = 0
+        self.completed_depth = 0
+        self.__root_move = None
+        self.__can_stop = False
+        self.__next_check = self.CHECK_INTERVAL
+        self.move_orderer.new_search()
+        self.transposition_table.new_search()
+        started = time.monotonic()
+        self.__deadline = None if time_limit is None else started + time_limit
+        self.__node_limit = node_limit
+        result = (None, None)
+
+        for depth in range(min(start_depth, max_depth), max_depth + 1):
+            try:
+                result = self.minimax(depth, is_maximizing_player)
+            except SearchTimeout:
+                break
+            self.completed_depth = depth
+            self.__root_move = result[1]
+            if self.on_iteration is not None:
+                self.on_iteration(depth, *result)
+            # Budgets only apply once a first move is known
+            self.__can_stop = True
+            try:
+                self.check_budget()
+            except SearchTimeout:
+                break
+
+        self.__can_stop = False
+        return result
+
+    def search_move(self, move, depth: int, is_maximizing_player: bool,
+                    alpha: float = float('-inf'), beta: float = float('inf'),
+                    time_limit: float = None) -> float:
         """
-        Checks if a move is a capture move.
+        Searches the subtree below one root move, as minimax would when it
+        reaches that move at the root. Unlike search, it can be stopped by
+        the stop event from the start.
 
         Args:
-            row (int): The row index of the piece.
-            col (int): The column index of the piece.
-            piece (Piece): The piece object.
-            board (list): The chess board state.
+            move (Move): The root move to play.
+            depth (int): The depth of the search, counting the root move.
+            is_maximizing_player (bool): True if the side playing the move
+                                         is the maximizing player.
+            alpha (float): The alpha value for alpha-beta pruning.
+            beta (float): The beta value for alpha-beta pruning.
+            time_limit (float): The wall-clock budget in seconds, or None.
+
+        Returns:
+            float: The score of the move within the alpha-beta window.
+
+        Raises:
+            SearchTimeout: If the time budget runs out or the stop event is
+                           set first.
+        """
+        self.nodes = 0
+        self.move_orderer.new_search()
+        self.__deadline = None if time_limit is None \
+            else time.monotonic() + time_limit
+        self.__node_limit = None
+        self.__can_stop = time_limit is not None or \
+            self.stop_event is not None
+        self.__next_check = self.CHECK_INTERVAL
+        self.chess_board.make_move(move)
+        try:
+            score, _ = self.minimax(depth - 1, not is_maximizing_player,
+                                    alpha, beta, 1)
+        finally:
+            self.chess_board.unmake_move()
+            self.__can_stop = False
+        return score
+
+    def set_budget(self, time_limit: float = None,
+                   node_limit: int = None) -> None:
+        """
+        Replaces the budget of the running search, e.g. when a search
+        started without limits while pondering becomes the real search. The
+        time limit counts from now and the node limit includes the nodes
+        already searched.
+
+        Args:
+            time_limit (float): The wall-clock budget in seconds, or None.
+            node_limit (int): The node budget, or None.
+        """
+        self.__deadline = None if time_limit is None \
+            else time.monotonic() + time_limit
+        self.__node_limit = node_limit
+
+    def principal_variation(self, max_length: int = 8) -> list:
+        """
+        Reads the expected line of play from the transposition table: the
+        stored best move of the current position, then of the position after
+        it, and so on. The walk stops at a missing or illegal move or when a
+        position repeats.
+
+        Args:
+            max_length (int): The most moves to return.
 
         Returns:
-            bool: True if the move is a capture move, False otherwise.
+            list: The Move records of the line, the side to move's first.
         """
-        if not isinstance(piece, Piece):
-            return False
+        board = self.chess_board
+        moves = []
+        seen = set()
+        try:
+            while len(moves) < max_length:
+                key = board.zobrist_key
+                entry = self.transposition_table.probe(key)
+                if entry is None or entry[3] is None or key in seen:
+                    break
+                move = entry[3]
+                if move not in MoveGenerator.generate_legal_moves(
+                        board, board.side_to_move):
+                    break
+                seen.add(key)
+                board.make_move(move)
+                moves.append(move)
+        finally:
+            for _ in moves:
+                board.unmake_move()
+        return moves
 
-        for dx in range(-1, 2):
-            for dy in range(-1, 2):
-                new_row, new_col = row + dx, col + dy
-                if 0 <= new_row < 8 and 0 <= new_col < 8:
-                    target_piece = board[new_row][new_col]
-                    if isinstance(target_piece, Piece) and target_piece.colour != piece.colour:
-                        return True
-        return False
+    def check_budget(self) -> None:
+        """
+        Raises SearchTimeout when the time or node budget has run out or the
+        stop event is set. Called every CHECK_INTERVAL nodes to keep the
+        clock reads cheap.
+        """
+        self.__next_check = self.nodes + self.CHECK_INTERVAL
+        if not self.__can_stop:
+            return
+        if self.__node_limit is not None and self.nodes >= self.__node_limit:
+            raise SearchTimeout()
+        if self.__deadline is not None and time.monotonic() >= self.__deadline:
+            raise SearchTimeout()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeout()
 
-    def minimax(self, depth: int, is_maximizing_player: bool, alpha: float = float('-inf'), beta: float = float('inf')) -> tuple:
+    def minimax(self, depth: int, is_maximizing_player: bool, alpha: float = float('-inf'), beta: float = float('inf'), ply: int = 0) -> tuple:
         """
         Implements the minimax algorithm to find the best move.
 
@@ -81,25 +274,54 @@ class AI:
             is_maximizing_player (bool): True if the current player is the maximizing player, False otherwise.
             alpha (float): The alpha value for alpha-beta pruning.
             beta (float): The beta value for alpha-beta pruning.
+            ply (int): The distance from the root of the search.
 
         Returns:
             tuple: A tuple containing the evaluation score and the best move.
         """
-        original_board = copy.deepcopy(self.chess_board.get_board())
+        self.nodes += 1
+        if self.nodes >= self.__next_check:
+            self.check_budget()
 
         if depth == 0:
-            eval_score = self.evaluate(original_board)
-            return eval_score
+            return self.quiescence(is_maximizing_player, alpha, beta, ply)
+
+        # Reuse the result of an earlier search of the same position when it
+        # went at least as deep and its bound decides this window
+        key = self.chess_board.zobrist_key
+        original_alpha, original_beta = alpha, beta
+        hash_move = None
+        entry = self.transposition_table.probe(key)
+        if entry is not None:
+            entry_depth, entry_score, bound, hash_move = entry
+            entry_score = self.score_from_table(entry_score, ply)
+            if entry_depth >= depth:
+                if bound == EXACT:
+                    return entry_score, hash_move
+                if bound == LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if beta <= alpha:
+                    return entry_score, hash_move
+        if ply == 0 and self.__root_move is not None:
+            # The previous iteration's best move is searched first
+            hash_move = self.__root_move
 
         if is_maximizing_player:
             max_eval = float('-inf')
             best_move = None
-            for potential in self.all_moves(original_board)[0]:
-                self.chess_board.set_board(copy.deepcopy(original_board))
-                from_cc = (potential[0]+potential[1])
-                to_cc = (potential[2]+potential[3])
-                self.chess_board.move_piece(from_cc, to_cc)
-                eval, _ = self.minimax(depth - 1, False, alpha, beta)
+            moves = MoveGenerator.generate_legal_moves(self.chess_board,
+                                                       "Black")
+            if not moves:
+                return self.score_no_moves("Black", ply), None
+            for potential in self.move_orderer.order_moves(
+                    moves, self.chess_board, ply, hash_move):
+                self.chess_board.make_move(potential)
+                try:
+                    eval, _ = self.minimax(depth - 1, False, alpha, beta, ply + 1)
+                finally:
+                    self.chess_board.unmake_move()
             
                 if eval > max_eval:
                     max_eval = eval
@@ -107,24 +329,28 @@ class AI:
 
                 alpha = max(alpha, eval)
                 if beta <= alpha:
+                    self.move_orderer.record_cutoff(potential, "Black", depth,
+                                                    ply)
                     break
 
-            self.chess_board.set_board(original_board) 
+            self.store_result(key, depth, max_eval, best_move, original_alpha,
+                              original_beta, ply)
             return max_eval, best_move
 
         else:
             min_eval = float('inf')
             best_move = None
-            for potential in self.all_moves(original_board)[1]:  
-                from_cc = (potential[0]+potential[1])
-                to_cc = (potential[2]+potential[3])
-                piece = self.get_piece_at_position(potential[0], potential[1])
-                if piece != '-' and piece.colour == "b":
-                    continue 
-
-                self.chess_board.set_board(copy.deepcopy(original_board))
-                self.chess_board.move_piece(from_cc, to_cc)
-                eval, _ = self.minimax(depth - 1, True, alpha, beta)
+            moves = MoveGenerator.generate_legal_moves(self.chess_board,
+                                                       "White")
+            if not moves:
+                return self.score_no_moves("White", ply), None
+            for potential in self.move_orderer.order_moves(
+                    moves, self.chess_board, ply, hash_move):
+                self.chess_board.make_move(potential)
+                try:
+                    eval, _ = self.minimax(depth - 1, True, alpha, beta, ply + 1)
+                finally:
+                    self.chess_board.unmake_move()
                 
                 if eval < min_eval:
                     min_eval = eval
@@ -132,26 +358,182 @@ class AI:
 
                 beta = min(beta, eval)
                 if beta <= alpha:
+                    self.move_orderer.record_cutoff(potential, "White", depth,
+                                                    ply)
                     break
 
-            self.chess_board.set_board(original_board) 
+            self.store_result(key, depth, min_eval, best_move, original_alpha,
+                              original_beta, ply)
             return min_eval, best_move
 
+    def score_no_moves(self, colour: str, ply: int) -> int:
+        """
+        Scores a position where the side to move has no legal moves: a loss
+        if it is checkmated, preferring the quickest mate, or a draw if it
+        is stalemated.
 
-    def all_moves(self, board):
-        self.moves = [[], []]
-        for i in range(8):
-            for j in range(8):
-                piece = board[i][j]
-                if isinstance(piece, Piece):
-                    for x in range(8):
-                        for y in range(8):
-                            if piece.is_valid_move((x,y), board):
-                                if piece.colour == "w":
-                                    self.moves[0].append((i, j, x, y))
-                                elif piece.colour == "b":
-                                    # print(f"Black piece {piece} at {i},{j} can move to {x},{y}")
-                                    self.moves[1].append((i, j, x, y))
-        return self.moves
+        Args:
+            colour (str): The colour to move.
+            ply (int): The distance from the root of the search.
+
+        Returns:
+            int: The score, positive when Black is better.
+        """
+        if not self.chess_board.is_king_in_check(colour):
+            return 0
+        mated = self.MATE_SCORE - ply
+        return -mated if colour == "Black" else mated
 
+    def score_to_table(self, score: int, ply: int) -> int:
+        """
+        Converts a mate score counted from the root into one counted from
+        the node at the given ply, so that a stored mate keeps the right
+        distance when the position is reached at another ply. Other scores
+        are stored as they are.
+
+        Args:
+            score (int): The score, with mates counted from the root.
+            ply (int): The distance of the node from the root.
+
+        Returns:
+            int: The score to store.
+        """
+        if score >= self.MATE_THRESHOLD:
+            return score + ply
+        if score <= -self.MATE_THRESHOLD:
+            return score - ply
+        return score
 
+    def score_from_table(self, score: int, ply: int) -> int:
+        """
+        Converts a stored mate score counted from its node back into one
+        counted from the root of the current search. The inverse of
+        score_to_table.
+
+        Args:
+            score (int): The stored score.
+            ply (int): The distance of the node from the root.
+
+        Returns:
+            int: The score, with mates counted from the root.
+        """
+        if score >= self.MATE_THRESHOLD:
+            return score - ply
+        if score <= -self.MATE_THRESHOLD:
+            return score + ply
+        return score
+
+    def store_result(self, key: int, depth: int, score: float, best_move,
+                     alpha: float, beta: float, ply: int = 0) -> None:
+        """
+        Stores a search result in the transposition table with the bound
+        type implied by the window it was searched with. Mate scores are
+        stored relative to the node.
+
+        Args:
+            key (int): The Zobrist key of the searched position.
+            depth (int): The depth the position was searched to.
+            score (float): The score the search returned.
+            best_move (Move): The best move found, if any.
+            alpha (float): The alpha value the search started with.
+            beta (float): The beta value the search started with.
+            ply (int): The distance of the position from the root.
+        """
+        if score in (float('inf'), float('-inf')):
+            return
+        if score <= alpha:
+            bound = UPPER_BOUND
+        elif score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.transposition_table.store(key, depth,
+                                       self.score_to_table(score, ply), bound,
+                                       best_move)
+
+    def quiescence(self, is_maximizing_player: bool, alpha: float,
+                   beta: float, ply: int) -> tuple:
+        """
+        Searches captures and promotions only, until the position is quiet,
+        so that leaf scores do not stop in the middle of an exchange.
+
+        The side to move may always stand pat on the static evaluation
+        instead of capturing. Captures that could not lift the score to the
+        window even after winning the captured piece plus DELTA_MARGIN are
+        skipped (delta pruning).
+
+        Args:
+            is_maximizing_player (bool): True if the current player is the maximizing player, False otherwise.
+            alpha (float): The alpha value for alpha-beta pruning.
+            beta (float): The beta value for alpha-beta pruning.
+            ply (int): The distance from the root of the search.
+
+        Returns:
+            tuple: A tuple containing the evaluation score and None.
+        """
+        self.nodes += 1
+        if self.nodes >= self.__next_check:
+            self.check_budget()
+
+        board = self.chess_board.get_board()
+        stand_pat, _ = self.evaluate(board)
+        if is_maximizing_player:
+            if stand_pat >= beta:
+                return stand_pat, None
+            alpha = max(alpha, stand_pat)
+        else:
+            if stand_pat <= alpha:
+                return stand_pat, None
+            beta = min(beta, stand_pat)
+
+        colour = "Black" if is_maximizing_player else "White"
+        moves = self.move_orderer.order_moves(
+            MoveGenerator.generate_legal_moves(self.chess_board, colour,
+                                               captures_only=True),
+            self.chess_board, ply)
+        best_score = stand_pat
+        for potential in moves:
+            to_row, to_col = potential.to_position
+            victim = board[to_row][to_col]
+            gain = self.piece_score["Pawn"] if victim == "-" \
+                else self.piece_score[victim.name]
+            if potential.promotion is not None:
+                gain += self.piece_score[potential.promotion] - \
+                    self.piece_score["Pawn"]
+            gain *= CENTIPAWNS
+            if is_maximizing_player:
+                if stand_pat + gain + self.DELTA_MARGIN <= alpha:
+                    continue
+            elif stand_pat - gain - self.DELTA_MARGIN >= beta:
+                continue
+
+            self.chess_board.make_move(potential)
+            try:
+                score, _ = self.quiescence(not is_maximizing_player, alpha,
+                                           beta, ply + 1)
+            finally:
+                self.chess_board.unmake_move()
+
+            if is_maximizing_player:
+                best_score = max(best_score, score)
+                alpha = max(alpha, score)
+            else:
+                best_score = min(best_score, score)
+                beta = min(beta, score)
+            if beta <= alpha:
+                break
+
+        return best_score, None
+
+    def all_moves(self) -> list:
+        """
+        Generates the legal moves of both sides on the chess board.
+
+        Returns:
+            list: Two lists of Move records, White's moves first and Black's
+                  moves second.
+        """
+        self.moves = [
+            MoveGenerator.generate_legal_moves(self.chess_board, "White"),
+            MoveGenerator.generate_legal_moves(self.chess_board, "Black")]
+        return self.moves
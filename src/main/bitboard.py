@@ -0,0 +1,568 @@
+"""
+Bitboard representation of a chess position.
+
+Every square is mapped to a bit index ``row * 8 + col``, so square 0 is the
+top-left corner of the board (row 0, col 0) and square 63 is the bottom-right
+corner (row 7, col 7). A bitboard is a plain Python int where bit ``n`` is set
+when square ``n`` is part of the set.
+"""
+
+COLOURS = ("White", "Black")
+PIECE_NAMES = ("Pawn", "Knight", "Bishop", "Rook", "Queen", "King")
+
+PIECE_INDEX = {(colour, name): colour_index * 6 + piece_index
+               for colour_index, colour in enumerate(COLOURS)
+               for piece_index, name in enumerate(PIECE_NAMES)}
+COLOUR_INDEX = {colour: index for index, colour in enumerate(COLOURS)}
+
+SQUARE_BB = tuple(1 << square for square in range(64))
+
+
+def square_index(row: int, col: int) -> int:
+    """
+    Converts a (row, col) position to a square index.
+
+    Args:
+        row (int): The row of the square.
+        col (int): The column of the square.
+
+    Returns:
+        int: The square index in the range 0-63.
+    """
+    return row * 8 + col
+
+
+def square_position(square: int) -> tuple:
+    """
+    Converts a square index to a (row, col) position.
+
+    Args:
+        square (int): The square index in the range 0-63.
+
+    Returns:
+        tuple: The (row, col) position of the square.
+    """
+    return divmod(square, 8)
+
+
+def iter_squares(bitboard: int):
+    """
+    Yields the index of every set bit of a bitboard, lowest first.
+
+    Args:
+        bitboard (int): The bitboard to iterate.
+
+    Yields:
+        int: The index of each set square.
+    """
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+def pop_count(bitboard: int) -> int:
+    """
+    Counts the set bits of a bitboard.
+
+    Args:
+        bitboard (int): The bitboard to count.
+
+    Returns:
+        int: The number of squares in the set.
+    """
+    return bin(bitboard).count("1")
+
+
+def _build_between_table() -> tuple:
+    """
+    Builds the table of squares lying strictly between two aligned squares.
+
+    Returns:
+        tuple: ``table[a][b]`` is the bitboard of the squares between ``a``
+               and ``b``, or 0 when they do not share a rank, file or
+               diagonal.
+    """
+    table = [[0] * 64 for _ in range(64)]
+    directions = [(-1, 0), (1, 0), (0, -1), (0, 1),
+                  (-1, -1), (-1, 1), (1, -1), (1, 1)]
+    for square in range(64):
+        row, col = square_position(square)
+        for row_step, col_step in directions:
+            path = 0
+            new_row, new_col = row + row_step, col + col_step
+            while 0 <= new_row < 8 and 0 <= new_col < 8:
+                target = square_index(new_row, new_col)
+                table[square][target] = path
+                path |= SQUARE_BB[target]
+                new_row += row_step
+                new_col += col_step
+    return tuple(tuple(row) for row in table)
+
+
+BETWEEN = _build_between_table()
+
+
+def _build_step_attacks(offsets: tuple) -> tuple:
+    """
+    Builds the attack bitboard of a stepping piece from every square.
+
+    Args:
+        offsets (tuple): The (row, col) steps the piece can make.
+
+    Returns:
+        tuple: ``table[square]`` is the bitboard of the attacked squares.
+    """
+    table = []
+    for square in range(64):
+        row, col = square_position(square)
+        attacks = 0
+        for row_step, col_step in offsets:
+            new_row, new_col = row + row_step, col + col_step
+            if 0 <= new_row < 8 and 0 <= new_col < 8:
+                attacks |= SQUARE_BB[square_index(new_row, new_col)]
+        table.append(attacks)
+    return tuple(table)
+
+
+def _build_rays(direction: tuple) -> tuple:
+    """
+    Builds the ray from every square in one direction to the board edge.
+
+    Args:
+        direction (tuple): The (row, col) step of the ray.
+
+    Returns:
+        tuple: ``table[square]`` is the bitboard of the ray, not including
+               the square itself.
+    """
+    row_step, col_step = direction
+    table = []
+    for square in range(64):
+        row, col = square_position(square)
+        ray = 0
+        row, col = row + row_step, col + col_step
+        while 0 <= row < 8 and 0 <= col < 8:
+            ray |= SQUARE_BB[square_index(row, col)]
+            row, col = row + row_step, col + col_step
+        table.append(ray)
+    return tuple(table)
+
+
+KNIGHT_ATTACKS = _build_step_attacks(((-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                                      (1, -2), (1, 2), (2, -1), (2, 1)))
+KING_ATTACKS = _build_step_attacks(((-1, -1), (-1, 0), (-1, 1), (0, -1),
+                                    (0, 1), (1, -1), (1, 0), (1, 1)))
+# Indexed by colour index: White pawns attack up the board (towards row 0),
+# Black pawns down it
+PAWN_ATTACKS = (_build_step_attacks(((-1, -1), (-1, 1))),
+                _build_step_attacks(((1, -1), (1, 1))))
+
+# Rays whose square indices grow away from the start square, where the
+# nearest blocker is the lowest set bit, and rays whose indices shrink,
+# where it is the highest set bit
+POSITIVE_ROOK_RAYS = (_build_rays((0, 1)), _build_rays((1, 0)))
+NEGATIVE_ROOK_RAYS = (_build_rays((0, -1)), _build_rays((-1, 0)))
+POSITIVE_BISHOP_RAYS = (_build_rays((1, -1)), _build_rays((1, 1)))
+NEGATIVE_BISHOP_RAYS = (_build_rays((-1, -1)), _build_rays((-1, 1)))
+
+
+def _sliding_attacks(square: int, occupied: int, positive_rays: tuple,
+                     negative_rays: tuple) -> int:
+    """
+    Gets the squares a sliding piece attacks: each ray up to and including
+    its first occupied square.
+
+    Args:
+        square (int): The square index of the piece.
+        occupied (int): The bitboard of all occupied squares.
+        positive_rays (tuple): The ray tables of increasing square indices.
+        negative_rays (tuple): The ray tables of decreasing square indices.
+
+    Returns:
+        int: The bitboard of the attacked squares.
+    """
+    attacks = 0
+    for rays in positive_rays:
+        ray = rays[square]
+        blockers = ray & occupied
+        if blockers:
+            # Cut the ray off behind the nearest blocker
+            ray ^= rays[(blockers & -blockers).bit_length() - 1]
+        attacks |= ray
+    for rays in negative_rays:
+        ray = rays[square]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= rays[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+
+def rook_attacks(square: int, occupied: int) -> int:
+    """
+    Gets the squares a rook attacks.
+
+    Args:
+        square (int): The square index of the rook.
+        occupied (int): The bitboard of all occupied squares.
+
+    Returns:
+        int: The bitboard of the attacked squares.
+    """
+    return _sliding_attacks(square, occupied, POSITIVE_ROOK_RAYS,
+                            NEGATIVE_ROOK_RAYS)
+
+
+def bishop_attacks(square: int, occupied: int) -> int:
+    """
+    Gets the squares a bishop attacks.
+
+    Args:
+        square (int): The square index of the bishop.
+        occupied (int): The bitboard of all occupied squares.
+
+    Returns:
+        int: The bitboard of the attacked squares.
+    """
+    return _sliding_attacks(square, occupied, POSITIVE_BISHOP_RAYS,
+                            NEGATIVE_BISHOP_RAYS)
+
+
+# The full rank and file, and the full diagonals, through every square
+ROOK_LINES = tuple(rook_attacks(square, 0) for square in range(64))
+BISHOP_LINES = tuple(bishop_attacks(square, 0) for square in range(64))
+
+
+class BitBoards:
+    """
+    Keeps one bitboard per piece type and colour, plus occupancy masks.
+
+    The bitboards are indexed by ``PIECE_INDEX[(colour, name)]``, with the six
+    White piece types first and the six Black piece types after them. The
+    square of each king is tracked too, so it never has to be searched for.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty set of bitboards.
+        """
+        self.__pieces = [0] * 12
+        self.__occupancy = [0, 0]
+        self.__occupied = 0
+        self.__counts = [0] * 12
+        self.__king_squares = [None, None]
+
+    @property
+    def occupied(self) -> int:
+        """
+        Gets the bitboard of all occupied squares.
+        """
+        return self.__occupied
+
+    @property
+    def counts(self) -> list:
+        """
+        Gets the number of pieces of each type and colour, indexed like the
+        bitboards. The counts are kept up to date as pieces are added and
+        removed, so reading them costs nothing.
+        """
+        return self.__counts
+
+    def clear(self) -> None:
+        """
+        Removes every piece from the bitboards.
+        """
+        self.__pieces = [0] * 12
+        self.__occupancy = [0, 0]
+        self.__occupied = 0
+        self.__counts = [0] * 12
+        self.__king_squares = [None, None]
+
+    def load(self, board: list) -> None:
+        """
+        Rebuilds the bitboards from an 8x8 list of lists.
+
+        Args:
+            board (list): The board state holding pieces and "-" strings.
+        """
+        self.clear()
+        for row in range(8):
+            for col in range(8):
+                piece = board[row][col]
+                if piece != "-":
+                    self.add_piece(piece.colour, piece.name,
+                                   square_index(row, col))
+
+    def add_piece(self, colour: str, name: str, square: int) -> None:
+        """
+        Places a piece on a square.
+
+        Args:
+            colour (str): The colour of the piece.
+            name (str): The name of the piece.
+            square (int): The square index to place the piece on.
+        """
+        bit = SQUARE_BB[square]
+        index = PIECE_INDEX[(colour, name)]
+        self.__pieces[index] |= bit
+        self.__occupancy[COLOUR_INDEX[colour]] |= bit
+        self.__occupied |= bit
+        self.__counts[index] += 1
+        if name == "King":
+            self.__king_squares[COLOUR_INDEX[colour]] = square
+
+    def remove_piece(self, colour: str, name: str, square: int) -> None:
+        """
+        Removes a piece from a square.
+
+        Args:
+            colour (str): The colour of the piece.
+            name (str): The name of the piece.
+            square (int): The square index to clear.
+        """
+        mask = ~SQUARE_BB[square]
+        index = PIECE_INDEX[(colour, name)]
+        self.__pieces[index] &= mask
+        self.__occupancy[COLOUR_INDEX[colour]] &= mask
+        self.__occupied &= mask
+        self.__counts[index] -= 1
+        if name == "King":
+            self.__king_squares[COLOUR_INDEX[colour]] = None
+
+    def move_piece(self, colour: str, name: str, from_square: int,
+                   to_square: int) -> None:
+        """
+        Moves a piece between two squares. The target square must be empty.
+
+        Args:
+            colour (str): The colour of the piece.
+            name (str): The name of the piece.
+            from_square (int): The square index the piece leaves.
+            to_square (int): The square index the piece lands on.
+        """
+        bits = SQUARE_BB[from_square] | SQUARE_BB[to_square]
+        self.__pieces[PIECE_INDEX[(colour, name)]] ^= bits
+        self.__occupancy[COLOUR_INDEX[colour]] ^= bits
+        self.__occupied ^= bits
+        if name == "King":
+            self.__king_squares[COLOUR_INDEX[colour]] = to_square
+
+    def get_pieces(self, colour: str, name: str) -> int:
+        """
+        Gets the bitboard of one piece type of one colour.
+
+        Args:
+            colour (str): The colour of the pieces.
+            name (str): The name of the pieces.
+
+        Returns:
+            int: The bitboard of the matching pieces.
+        """
+        return self.__pieces[PIECE_INDEX[(colour, name)]]
+
+    def get_occupancy(self, colour: str) -> int:
+        """
+        Gets the bitboard of all squares occupied by one colour.
+
+        Args:
+            colour (str): The colour of the pieces.
+
+        Returns:
+            int: The occupancy bitboard of the colour.
+        """
+        return self.__occupancy[COLOUR_INDEX[colour]]
+
+    def is_occupied(self, square: int) -> bool:
+        """
+        Checks if a square holds a piece.
+
+        Args:
+            square (int): The square index to check.
+
+        Returns:
+            bool: True if the square is occupied, False otherwise.
+        """
+        return bool(self.__occupied & SQUARE_BB[square])
+
+    def colour_at(self, square: int):
+        """
+        Gets the colour of the piece on a square.
+
+        Args:
+            square (int): The square index to check.
+
+        Returns:
+            str: The colour of the piece, or None if the square is empty.
+        """
+        bit = SQUARE_BB[square]
+        if self.__occupancy[0] & bit:
+            return "White"
+        if self.__occupancy[1] & bit:
+            return "Black"
+        return None
+
+    def piece_at(self, square: int):
+        """
+        Gets the colour and name of the piece on a square.
+
+        Args:
+            square (int): The square index to check.
+
+        Returns:
+            tuple: A (colour, name) tuple, or None if the square is empty.
+        """
+        bit = SQUARE_BB[square]
+        if not self.__occupied & bit:
+            return None
+        for (colour, name), index in PIECE_INDEX.items():
+            if self.__pieces[index] & bit:
+                return colour, name
+        return None
+
+    def is_path_clear(self, from_square: int, to_square: int) -> bool:
+        """
+        Checks if every square strictly between two squares is empty.
+
+        Args:
+            from_square (int): The square index the path starts from.
+            to_square (int): The square index the path ends on.
+
+        Returns:
+            bool: True if nothing blocks the path, False otherwise.
+        """
+        return not BETWEEN[from_square][to_square] & self.__occupied
+
+    def king_square(self, colour: str):
+        """
+        Gets the square of the king of a colour.
+
+        Args:
+            colour (str): The colour of the king.
+
+        Returns:
+            int: The square index of the king, or None if it is not on the
+                 board.
+        """
+        return self.__king_squares[COLOUR_INDEX[colour]]
+
+    def is_square_attacked(self, square: int, colour: str,
+                           occupied: int = None) -> bool:
+        """
+        Checks if any piece of a colour attacks a square, working outwards
+        from the square: a piece attacks the square exactly when the same
+        piece standing on the square would attack it back (pawns apart, which
+        look the other way).
+
+        Args:
+            square (int): The square index to check.
+            colour (str): The colour of the attacking side.
+            occupied (int): The occupancy that blocks sliding pieces, if not
+                            the current one. Leaving the king out of it shows
+                            the squares a king in check cannot retreat to.
+
+        Returns:
+            bool: True if the square is attacked, False otherwise.
+        """
+        colour_index = COLOUR_INDEX[colour]
+        pieces = self.__pieces
+        base = colour_index * 6
+        if occupied is None:
+            occupied = self.__occupied
+        if PAWN_ATTACKS[1 - colour_index][square] & pieces[base] or \
+                KNIGHT_ATTACKS[square] & pieces[base + 1] or \
+                KING_ATTACKS[square] & pieces[base + 5]:
+            return True
+        queens = pieces[base + 4]
+        diagonal = pieces[base + 2] | queens
+        if diagonal and bishop_attacks(square, occupied) & diagonal:
+            return True
+        straight = pieces[base + 3] | queens
+        return bool(straight and rook_attacks(square, occupied) & straight)
+
+    def attackers_to(self, square: int, colour: str) -> int:
+        """
+        Gets every piece of a colour that attacks a square.
+
+        Args:
+            square (int): The square index to check.
+            colour (str): The colour of the attacking side.
+
+        Returns:
+            int: The bitboard of the attacking pieces.
+        """
+        colour_index = COLOUR_INDEX[colour]
+        pieces = self.__pieces
+        base = colour_index * 6
+        queens = pieces[base + 4]
+        return (PAWN_ATTACKS[1 - colour_index][square] & pieces[base]) | \
+            (KNIGHT_ATTACKS[square] & pieces[base + 1]) | \
+            (KING_ATTACKS[square] & pieces[base + 5]) | \
+            (bishop_attacks(square, self.__occupied) &
+             (pieces[base + 2] | queens)) | \
+            (rook_attacks(square, self.__occupied) &
+             (pieces[base + 3] | queens))
+
+    def attacked_squares(self, colour: str) -> int:
+        """
+        Gets the attack map of a colour: every square one of its pieces
+        attacks, whether empty or occupied.
+
+        Args:
+            colour (str): The colour of the attacking side.
+
+        Returns:
+            int: The bitboard of the attacked squares.
+        """
+        colour_index = COLOUR_INDEX[colour]
+        pieces = self.__pieces
+        base = colour_index * 6
+        occupied = self.__occupied
+        attacks = 0
+        for square in iter_squares(pieces[base]):
+            attacks |= PAWN_ATTACKS[colour_index][square]
+        for square in iter_squares(pieces[base + 1]):
+            attacks |= KNIGHT_ATTACKS[square]
+        for square in iter_squares(pieces[base + 2] | pieces[base + 4]):
+            attacks |= bishop_attacks(square, occupied)
+        for square in iter_squares(pieces[base + 3] | pieces[base + 4]):
+            attacks |= rook_attacks(square, occupied)
+        for square in iter_squares(pieces[base + 5]):
+            attacks |= KING_ATTACKS[square]
+        return attacks
+
+    def pin_rays(self, colour: str) -> dict:
+        """
+        Finds the pieces of a colour that are pinned to their king. A pinned
+        piece may only move along the line between the king and the pinning
+        piece, or capture the pinning piece.
+
+        Args:
+            colour (str): The colour of the king.
+
+        Returns:
+            dict: The square index of each pinned piece, mapped to the
+                  bitboard of the squares it may still move to.
+        """
+        king_square = self.__king_squares[COLOUR_INDEX[colour]]
+        if king_square is None:
+            return {}
+        colour_index = COLOUR_INDEX[colour]
+        pieces = self.__pieces
+        base = (1 - colour_index) * 6
+        queens = pieces[base + 4]
+        own = self.__occupancy[colour_index]
+        occupied = self.__occupied
+        pins = {}
+        for sliders in ((pieces[base + 3] | queens) & ROOK_LINES[king_square],
+                        (pieces[base + 2] | queens) &
+                        BISHOP_LINES[king_square]):
+            for square in iter_squares(sliders):
+                between = BETWEEN[king_square][square]
+                blockers = between & occupied
+                # Pinned: exactly one piece in the way, and it is our own
+                if blockers and not blockers & (blockers - 1) and \
+                        blockers & own:
+                    pins[blockers.bit_length() - 1] = \
+                        between | SQUARE_BB[square]
+        return pins
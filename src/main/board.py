@@ -1,34 +1,189 @@
-from pprint import pprint
-from game_logger import setup_logging
+from game_logger import setup_logging, ClassLogger
 import logging
+import struct
 from pieces import Piece, Pawn, Rook, Bishop, Knight, King, Queen
+from pieces import Move, MoveGenerator
+from pieces.move_generator import CAPTURE, EN_PASSANT, CASTLING, \
+    DOUBLE_PAWN_PUSH, PROMOTION
+from bitboard import BitBoards, PIECE_INDEX, COLOURS, PIECE_NAMES, \
+    square_index
+from zobrist import PIECE_SQUARE_KEYS, SIDE_KEY, CASTLING_KEYS, \
+    EN_PASSANT_KEYS, compute_key
+from evaluation import SIGNED_PIECE_SQUARE, compute_piece_square_score
 setup_logging()
 
+PROMOTION_CLASSES = {"Queen": Queen, "Rook": Rook, "Bishop": Bishop,
+                     "Knight": Knight}
+
+# Castling rights bits with the (row, rook column) each one depends on
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+CASTLING_SQUARES = ((WHITE_KINGSIDE, "White", 7, 7),
+                    (WHITE_QUEENSIDE, "White", 7, 0),
+                    (BLACK_KINGSIDE, "Black", 0, 7),
+                    (BLACK_QUEENSIDE, "Black", 0, 0))
+
+# Results of ChessBoard.game_status
+ONGOING, CHECKMATE, STALEMATE, DRAW = "ongoing", "checkmate", "stalemate", \
+    "draw"
+
+# Packed position: one byte per square, then the side to move, the en
+# passant square, the halfmove clock and the fullmove number. A square byte
+# is 0 when empty, otherwise PIECE_INDEX + 1 with UNMOVED_FLAG set while the
+# piece is on its initial position.
+POSITION_STRUCT = struct.Struct("<64sBBHH")
+POSITION_SIZE = POSITION_STRUCT.size
+UNMOVED_FLAG = 0x80
+NO_SQUARE = 0xFF
+PIECE_CLASSES = {"Pawn": Pawn, "Knight": Knight, "Bishop": Bishop,
+                 "Rook": Rook, "Queen": Queen, "King": King}
+# Piece byte (without UNMOVED_FLAG) -> (colour, piece class)
+PIECE_CODES = {PIECE_INDEX[(colour, name)] + 1: (colour, PIECE_CLASSES[name])
+               for colour in COLOURS for name in PIECE_NAMES}
+
+# Forsyth-Edwards Notation: lower case letters for Black, upper case for White
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+FEN_PIECES = {"p": Pawn, "n": Knight, "b": Bishop, "r": Rook, "q": Queen,
+              "k": King}
+FEN_LETTERS = {piece_cls.__name__: letter
+               for letter, piece_cls in FEN_PIECES.items()}
+FEN_SIDES = {"w": "White", "b": "Black"}
+# Castling rights bit -> FEN letter, in the order FEN writes them
+CASTLING_LETTERS = ((WHITE_KINGSIDE, "K"), (WHITE_QUEENSIDE, "Q"),
+                    (BLACK_KINGSIDE, "k"), (BLACK_QUEENSIDE, "q"))
+FILES = "abcdefgh"
+
+
+def square_name(position: tuple) -> str:
+    """
+    Converts a (row, col) position to a square name such as "e4". Row 0 is
+    Black's back row, the eighth rank.
+
+    Args:
+        position (tuple): The (row, col) of the square.
+
+    Returns:
+        str: The square name.
+    """
+    row, col = position
+    return f"{FILES[col]}{8 - row}"
+
+
+def parse_square(name: str) -> tuple:
+    """
+    Converts a square name such as "e4" to a (row, col) position.
+
+    Args:
+        name (str): The square name.
+
+    Returns:
+        tuple: The (row, col) of the square.
+
+    Raises:
+        ValueError: If the name is not a square.
+    """
+    if len(name) != 2 or name[0] not in FILES or name[1] not in "12345678":
+        raise ValueError(f"Invalid square {name!r}")
+    return 8 - int(name[1]), FILES.index(name[0])
+
 
 class ChessBoard:
     """
     Represents the chess board, responsible for setting up the board and moving pieces.
     """
 
+    logger = ClassLogger()
+
     def __init__(self):
-        self.logger = logging.getLogger(self.__class__.__name__)
         self.__board = [["-" for _ in range(8)] for _ in range(8)]
+        self.__bitboards = BitBoards()
+        self.__en_passant_position = None
+        self.__side_to_move = "White"
+        self.__halfmove_clock = 0
+        self.__fullmove_number = 1
+        # Undo records of the moves made so far, most recent last
+        self.__history = []
+        # Zobrist keys of the positions before each move in the history
+        self.__key_history = []
+        self.__key = 0
+        # Running piece-square score in centipawns, positive for Black
+        self.__piece_square_score = 0
         self.__setup_pieces()
-        self.__is_game_over = False
+        self.__key = compute_key(self)
+        # (position tag, legal moves, game status) of the last position the
+        # status was asked for
+        self.__status_cache = None
         self.logger.info("A new chess board has been created.")
-        self.logger.info(f"Initial board state: \n{self}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Initial board state: \n%s", self)
 
     def __setup_pieces_for_colour(self, colour, back_row):
 
         front_row = back_row + 1 if colour == "Black" else back_row - 1
 
         for col, piece_cls in enumerate([Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook], start=0):
-            self.logger.info(f"Setting up {colour} piece {piece_cls.__name__} at {(back_row, col)}")
+            self.logger.debug("Setting up %s piece %s at %s", colour,
+                              piece_cls.__name__, (back_row, col))
             # Set up the main pieces on the back row
-            self.__board[back_row][col] = piece_cls(colour, (back_row, col))
+            self.__place_piece(piece_cls(colour, (back_row, col)))
             # Set up pawns on the front row
-            self.logger.info(f"Setting up {colour} Pawn at {(front_row, col)}")
-            self.__board[front_row][col] = Pawn(colour, (front_row, col))
+            self.logger.debug("Setting up %s Pawn at %s", colour,
+                              (front_row, col))
+            self.__place_piece(Pawn(colour, (front_row, col)))
+
+    def __place_piece(self, piece: Piece) -> None:
+        """
+        Puts a piece on the square given by its position, keeping the board
+        list and the bitboards in step.
+
+        Args:
+            piece (Piece): The piece to place.
+        """
+        row, col = piece.position
+        square = square_index(row, col)
+        index = PIECE_INDEX[(piece.colour, piece.name)]
+        self.__board[row][col] = piece
+        self.__bitboards.add_piece(piece.colour, piece.name, square)
+        self.__key ^= PIECE_SQUARE_KEYS[index][square]
+        self.__piece_square_score += SIGNED_PIECE_SQUARE[index][square]
+
+    def __remove_piece(self, piece: Piece) -> None:
+        """
+        Takes a piece off the board.
+
+        Args:
+            piece (Piece): The piece to remove.
+        """
+        row, col = piece.position
+        square = square_index(row, col)
+        index = PIECE_INDEX[(piece.colour, piece.name)]
+        self.__board[row][col] = "-"
+        self.__bitboards.remove_piece(piece.colour, piece.name, square)
+        self.__key ^= PIECE_SQUARE_KEYS[index][square]
+        self.__piece_square_score -= SIGNED_PIECE_SQUARE[index][square]
+
+    def __relocate_piece(self, piece: Piece, new_position: tuple) -> None:
+        """
+        Moves a piece to an empty square and marks it as having moved.
+
+        Args:
+            piece (Piece): The piece to move.
+            new_position (tuple): The (row, col) to move the piece to.
+        """
+        row, col = piece.position
+        new_row, new_col = new_position
+        square = square_index(row, col)
+        new_square = square_index(new_row, new_col)
+        index = PIECE_INDEX[(piece.colour, piece.name)]
+        self.__board[new_row][new_col] = piece
+        self.__board[row][col] = "-"
+        self.__bitboards.move_piece(piece.colour, piece.name, square,
+                                    new_square)
+        keys = PIECE_SQUARE_KEYS[index]
+        self.__key ^= keys[square] ^ keys[new_square]
+        values = SIGNED_PIECE_SQUARE[index]
+        self.__piece_square_score += values[new_square] - values[square]
+        piece.position = new_position
+        piece.is_initial_position = False
 
     def __setup_pieces(self):
         """
@@ -40,15 +195,20 @@ class ChessBoard:
 
         # Ensure that your ChessBoard class has the necessary methods (get_piece_at_position and move_piece) implemented to support these operations. The move_piece method in ChessBoard should handle the logistics of updating the board's internal representation, such as setting the new position to the piece and the old position to a default empty state (like "-").
 
-    def move_piece(self, from_piece, to_piece) -> bool:
+    def move_piece(self, from_piece, to_piece, promotion: str = "Queen") -> bool:
         """
         Moves a piece from one position to another if the move is valid.
 
+        Castling moves the rook along with the king, en passant removes the
+        captured pawn and a pawn reaching the last row is promoted. A pawn
+        moving diagonally onto an empty square other than the en passant
+        square is refused.
+
         Args:
-            from_row: The row of the piece to be moved.
-            from_col: The column of the piece to be moved.
-            to_row: The row of the target position.
-            to_col: The column of the target position.
+            from_piece (tuple): The (row, col) of the piece to be moved.
+            to_piece (tuple): The (row, col) of the target position.
+            promotion (str): The piece a pawn reaching the last row turns
+                             into.
 
         Returns:
             True if the move is valid and completed, False otherwise.
@@ -62,13 +222,123 @@ class ChessBoard:
 
         if isinstance(from_piece, Piece):
             if not isinstance(to_piece, Piece) or to_piece.colour != from_piece.colour:
-                self.__board[to_row][to_col] = from_piece
-                self.__board[from_row][from_col] = "-"
-                from_piece.position = (to_row, to_col)  # Update piece's position
-                self.logger.info(f"Current board state: \n{self}")
+                try:
+                    move = MoveGenerator.create_move(
+                        self, (from_row, from_col), (to_row, to_col),
+                        promotion)
+                except ValueError as error:
+                    self.logger.warning("Refused move: %s", error)
+                    return False
+                self.make_move(move)
+                # Formatting the whole board is only worth it when shown
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info("Current board state: \n%s", self)
                 return True
         return False
-    
+
+    def make_move(self, move: Move) -> None:
+        """
+        Plays a move record in place and pushes an undo record, so that the
+        move can be taken back with unmake_move.
+
+        Args:
+            move (Move): The move to play.
+        """
+        board = self.__board
+        from_row, from_col = move.from_position
+        to_row, to_col = move.to_position
+        flags = move.flags
+        piece = board[from_row][from_col]
+
+        previous_key = self.__key
+
+        # Castling rights can only change when a king or rook moves or a
+        # rook is captured, so they are only recomputed for those moves
+        affects_castling = piece.name in ("King", "Rook") or \
+            (flags & CAPTURE and board[to_row][to_col].name == "Rook")
+        if affects_castling:
+            self.__key ^= CASTLING_KEYS[self.castling_rights]
+
+        captured = None
+        if flags & CAPTURE:
+            captured = board[to_row][to_col]
+            self.__remove_piece(captured)
+        elif flags & EN_PASSANT:
+            # The captured pawn sits beside the moving pawn, not on the target
+            captured = board[from_row][to_col]
+            self.__remove_piece(captured)
+
+        self.__history.append((move, piece, captured,
+                               piece.is_initial_position,
+                               self.__en_passant_position,
+                               self.__halfmove_clock, previous_key))
+        self.__key_history.append(previous_key)
+        if self.__en_passant_position is not None:
+            self.__key ^= EN_PASSANT_KEYS[self.__en_passant_position[1]]
+        self.__relocate_piece(piece, move.to_position)
+
+        self.__en_passant_position = None
+        if flags & DOUBLE_PAWN_PUSH:
+            self.__en_passant_position = ((from_row + to_row) // 2, from_col)
+            self.__key ^= EN_PASSANT_KEYS[from_col]
+        elif flags & CASTLING:
+            # The rook jumps to the square the king crossed
+            rook = board[from_row][7 if to_col > from_col else 0]
+            self.__relocate_piece(rook, (from_row, (from_col + to_col) // 2))
+        elif flags & PROMOTION:
+            self.__remove_piece(piece)
+            self.__place_piece(PROMOTION_CLASSES[move.promotion](
+                piece.colour, move.to_position))
+        if affects_castling:
+            self.__key ^= CASTLING_KEYS[self.castling_rights]
+
+        if piece.name == "Pawn" or captured is not None:
+            self.__halfmove_clock = 0
+        else:
+            self.__halfmove_clock += 1
+        if piece.colour == "Black":
+            self.__fullmove_number += 1
+        self.__side_to_move = "Black" if piece.colour == "White" else "White"
+        self.__key ^= SIDE_KEY
+
+    def unmake_move(self) -> Move:
+        """
+        Takes back the last move played with make_move, restoring captured
+        pieces, positions and is_initial_position flags.
+
+        Returns:
+            Move: The move that was taken back.
+        """
+        (move, piece, captured, was_initial, en_passant_position,
+         halfmove_clock, key) = self.__history.pop()
+        self.__key_history.pop()
+        board = self.__board
+        from_row, from_col = move.from_position
+        to_row, to_col = move.to_position
+        flags = move.flags
+
+        if flags & PROMOTION:
+            self.__remove_piece(board[to_row][to_col])
+            self.__place_piece(piece)
+        elif flags & CASTLING:
+            rook = board[from_row][(from_col + to_col) // 2]
+            self.__relocate_piece(rook, (from_row, 7 if to_col > from_col else 0))
+            rook.is_initial_position = True
+
+        self.__relocate_piece(piece, move.from_position)
+        piece.is_initial_position = was_initial
+        if captured is not None:
+            self.__place_piece(captured)
+        self.__en_passant_position = en_passant_position
+        self.__halfmove_clock = halfmove_clock
+        if piece.colour == "Black":
+            self.__fullmove_number -= 1
+        self.__side_to_move = piece.colour
+        # The pieces put back above have toggled the key on the way, so the
+        # saved key is restored last
+        self.__key = key
+        return move
+
     def get_piece_at_position(self, row: int, col: int) -> Piece:
         """
         Returns the piece at the specified position.
@@ -78,10 +348,104 @@ class ChessBoard:
             col (int): The column of the piece.
 
         Returns:
-            Piece: The piece at the specified position.
+            Piece: The piece at the specified position, or "-" if the
+                   square is empty.
         """
+        if not self.__bitboards.is_occupied(square_index(row, col)):
+            return "-"
         return self.__board[row][col]
 
+    @property
+    def en_passant_position(self):
+        """
+        Gets the (row, col) a pawn can capture en passant on, or None.
+        """
+        return self.__en_passant_position
+
+    @property
+    def side_to_move(self) -> str:
+        """
+        Gets the colour whose turn it is.
+        """
+        return self.__side_to_move
+
+    @property
+    def halfmove_clock(self) -> int:
+        """
+        Gets the number of moves since the last capture or pawn move.
+        """
+        return self.__halfmove_clock
+
+    @property
+    def fullmove_number(self) -> int:
+        """
+        Gets the number of the current full move, starting at 1.
+        """
+        return self.__fullmove_number
+
+    @property
+    def castling_rights(self) -> int:
+        """
+        Gets the castling rights as a bit mask of WHITE_KINGSIDE,
+        WHITE_QUEENSIDE, BLACK_KINGSIDE and BLACK_QUEENSIDE. A right is held
+        while the king and the rook on that side are both unmoved.
+        """
+        board = self.__board
+        rights = 0
+        for right, colour, row, rook_col in CASTLING_SQUARES:
+            king = board[row][4]
+            rook = board[row][rook_col]
+            if king != "-" and rook != "-" and king.name == "King" and \
+                    rook.name == "Rook" and king.colour == colour and \
+                    rook.colour == colour and king.is_initial_position and \
+                    rook.is_initial_position:
+                rights |= right
+        return rights
+
+    @property
+    def piece_square_score(self) -> int:
+        """
+        Gets the running piece-square score in centipawns, positive when the
+        pieces of Black stand on better squares.
+        """
+        return self.__piece_square_score
+
+    @property
+    def zobrist_key(self) -> int:
+        """
+        Gets the 64-bit Zobrist key of the current position.
+        """
+        return self.__key
+
+    def repetition_count(self) -> int:
+        """
+        Counts how many times the current position occurred earlier, looking
+        back only as far as the last capture or pawn move.
+
+        Returns:
+            int: The number of earlier occurrences of the position.
+        """
+        key = self.__key
+        history = self.__key_history
+        start = max(len(history) - self.__halfmove_clock, 0)
+        return sum(1 for index in range(len(history) - 2, start - 1, -2)
+                   if history[index] == key)
+
+    @property
+    def move_history(self) -> list:
+        """
+        Gets the moves made with make_move and not taken back, oldest
+        first, as a new list.
+        """
+        return [record[0] for record in self.__history]
+
+    @property
+    def bitboards(self) -> BitBoards:
+        """
+        Gets the bitboard representation of the board.
+        """
+        return self.__bitboards
+
     def get_board(self) -> list:
         """
         Returns the current state of the board.
@@ -97,14 +461,290 @@ class ChessBoard:
         """
         print(str(self))
 
-    def set_board(self, board: list) -> None:
+    def set_board(self, board: list, side_to_move: str = "White",
+                  en_passant_position: tuple = None, halfmove_clock: int = 0,
+                  fullmove_number: int = 1) -> None:
         """
-        Sets the board to a new state.
+        Sets the board to a new position. Nothing of the old position is
+        kept: the move history starts empty, the cached game status is
+        dropped and the Zobrist key is computed for the new state. Castling
+        rights follow from the is_initial_position flags of the kings and
+        rooks.
 
         Args:
             board (list): The new board state.
+            side_to_move (str): The colour to move.
+            en_passant_position (tuple): The (row, col) a pawn can capture
+                                         en passant on, or None.
+            halfmove_clock (int): The moves since the last capture or pawn
+                                  move.
+            fullmove_number (int): The number of the current full move.
         """
         self.__board = board
+        self.__bitboards.load(board)
+        self.__side_to_move = side_to_move
+        self.__en_passant_position = en_passant_position
+        self.__halfmove_clock = halfmove_clock
+        self.__fullmove_number = fullmove_number
+        self.__history = []
+        self.__key_history = []
+        self.__status_cache = None
+        self.__key = compute_key(self)
+        self.__piece_square_score = compute_piece_square_score(board)
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs the position into POSITION_SIZE bytes. The packed form holds
+        everything needed to play on from the position except the move
+        history, so it is cheap to pickle, send to another process or store.
+
+        Returns:
+            bytes: The packed position.
+        """
+        buffer = bytearray(POSITION_SIZE)
+        self.pack_into(buffer)
+        return bytes(buffer)
+
+    def pack_into(self, buffer, offset: int = 0) -> None:
+        """
+        Packs the position straight into a writable buffer, such as a
+        bytearray, mmap or shared memory block, without an extra copy.
+
+        Args:
+            buffer: The writable buffer.
+            offset (int): The byte offset to write at.
+        """
+        squares = bytearray(64)
+        for row in range(8):
+            for col in range(8):
+                piece = self.__board[row][col]
+                if piece != "-":
+                    code = PIECE_INDEX[(piece.colour, piece.name)] + 1
+                    if piece.is_initial_position:
+                        code |= UNMOVED_FLAG
+                    squares[row * 8 + col] = code
+        en_passant = NO_SQUARE if self.__en_passant_position is None \
+            else square_index(*self.__en_passant_position)
+        POSITION_STRUCT.pack_into(
+            buffer, offset, bytes(squares),
+            COLOURS.index(self.__side_to_move), en_passant,
+            self.__halfmove_clock, self.__fullmove_number)
+
+    def load_bytes(self, data, offset: int = 0) -> None:
+        """
+        Replaces the position with a packed one. The data is read in place,
+        so a memoryview over a larger buffer can be passed without slicing.
+        The move history starts empty.
+
+        Args:
+            data: A bytes-like object holding a packed position.
+            offset (int): The byte offset of the packed position.
+
+        Raises:
+            ValueError: If a square byte is not a valid piece code.
+        """
+        squares, side, en_passant, halfmove_clock, fullmove_number = \
+            POSITION_STRUCT.unpack_from(data, offset)
+        board = [["-" for _ in range(8)] for _ in range(8)]
+        for square, code in enumerate(squares):
+            if code:
+                if code & ~UNMOVED_FLAG not in PIECE_CODES:
+                    raise ValueError(f"Invalid piece code {code} on square "
+                                     f"{square}")
+                colour, piece_cls = PIECE_CODES[code & ~UNMOVED_FLAG]
+                piece = piece_cls(colour, divmod(square, 8))
+                piece.is_initial_position = bool(code & UNMOVED_FLAG)
+                board[square // 8][square % 8] = piece
+        self.set_board(board, COLOURS[side],
+                       None if en_passant == NO_SQUARE
+                       else divmod(en_passant, 8),
+                       halfmove_clock, fullmove_number)
+
+    @classmethod
+    def __empty(cls) -> "ChessBoard":
+        """
+        Creates a board with no position yet, for set_board to fill in.
+        __init__ is skipped, as it would set up, hash and score the
+        starting position only for it to be replaced.
+
+        Returns:
+            ChessBoard: The new board, unusable until set_board is called.
+        """
+        chess_board = cls.__new__(cls)
+        chess_board.__bitboards = BitBoards()
+        return chess_board
+
+    @classmethod
+    def from_bytes(cls, data, offset: int = 0) -> "ChessBoard":
+        """
+        Creates a board holding a packed position, without setting up the
+        starting position first.
+
+        Args:
+            data: A bytes-like object holding a packed position.
+            offset (int): The byte offset of the packed position.
+
+        Returns:
+            ChessBoard: The new board.
+
+        Raises:
+            ValueError: If a square byte is not a valid piece code.
+        """
+        chess_board = cls.__empty()
+        chess_board.load_bytes(data, offset)
+        return chess_board
+
+    def to_fen(self) -> str:
+        """
+        Writes the position in Forsyth-Edwards Notation: the placement, the
+        side to move, the castling rights, the en passant square and the
+        halfmove clock and fullmove number.
+
+        Returns:
+            str: The FEN of the position.
+        """
+        rows = []
+        for row in self.__board:
+            text = ""
+            empty = 0
+            for piece in row:
+                if piece == "-":
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                letter = FEN_LETTERS[piece.name]
+                text += letter.upper() if piece.colour == "White" else letter
+            if empty:
+                text += str(empty)
+            rows.append(text)
+        rights = self.castling_rights
+        castling = "".join(letter for right, letter in CASTLING_LETTERS
+                           if rights & right) or "-"
+        en_passant = "-" if self.__en_passant_position is None \
+            else square_name(self.__en_passant_position)
+        side = "w" if self.__side_to_move == "White" else "b"
+        return (f"{'/'.join(rows)} {side} {castling} {en_passant} "
+                f"{self.__halfmove_clock} {self.__fullmove_number}")
+
+    def load_fen(self, fen: str) -> None:
+        """
+        Replaces the position with one written in Forsyth-Edwards Notation.
+        The pieces are placed on a fresh grid in a single pass, and the board
+        is left unchanged if the FEN cannot be read. The move history starts
+        empty.
+
+        The clocks may be left out, as in EPD records, and then default to
+        0 and 1. Castling rights are kept by marking the king and rook as
+        unmoved, so a right whose king or rook is not on its square is
+        dropped. Pawns count as unmoved on their starting row only.
+
+        Args:
+            fen (str): The position, e.g. START_FEN.
+
+        Raises:
+            ValueError: If the FEN is malformed or either side does not have
+                        exactly one king.
+        """
+        fields = fen.split()
+        if len(fields) == 4:
+            fields += ["0", "1"]
+        if len(fields) != 6:
+            raise ValueError(f"Invalid FEN {fen!r}: expected 6 fields")
+        placement, side, castling, en_passant, halfmove, fullmove = fields
+
+        rows = placement.split("/")
+        if len(rows) != 8:
+            raise ValueError(f"Invalid FEN {fen!r}: expected 8 rows")
+        board = [["-" for _ in range(8)] for _ in range(8)]
+        kings = {"White": 0, "Black": 0}
+        for row, row_text in enumerate(rows):
+            col = 0
+            for char in row_text:
+                if char in "12345678":
+                    col += int(char)
+                    continue
+                piece_cls = FEN_PIECES.get(char.lower())
+                if piece_cls is None or col > 7:
+                    raise ValueError(f"Invalid FEN {fen!r}: bad row "
+                                     f"{row_text!r}")
+                colour = "White" if char.isupper() else "Black"
+                piece = piece_cls(colour, (row, col))
+                if piece_cls is Pawn:
+                    piece.is_initial_position = row == (6 if colour == "White"
+                                                        else 1)
+                elif piece_cls is King or piece_cls is Rook:
+                    piece.is_initial_position = False
+                    if piece_cls is King:
+                        kings[colour] += 1
+                board[row][col] = piece
+                col += 1
+            if col != 8:
+                raise ValueError(f"Invalid FEN {fen!r}: row {row_text!r} "
+                                 f"does not cover 8 squares")
+        for colour, count in kings.items():
+            if count != 1:
+                raise ValueError(f"Invalid FEN {fen!r}: {colour} has "
+                                 f"{count} kings")
+
+        if side not in FEN_SIDES:
+            raise ValueError(f"Invalid FEN {fen!r}: bad side to move {side!r}")
+        if castling != "-":
+            if len(set(castling)) != len(castling) or \
+                    any(letter not in "KQkq" for letter in castling):
+                raise ValueError(f"Invalid FEN {fen!r}: bad castling rights "
+                                 f"{castling!r}")
+            # CASTLING_SQUARES lists the rights in the order of "KQkq"
+            for letter, (_, colour, row, rook_col) in zip(
+                    "KQkq", CASTLING_SQUARES):
+                if letter not in castling:
+                    continue
+                king = board[row][4]
+                rook = board[row][rook_col]
+                if king != "-" and rook != "-" and king.name == "King" and \
+                        rook.name == "Rook" and king.colour == colour and \
+                        rook.colour == colour:
+                    king.is_initial_position = True
+                    rook.is_initial_position = True
+
+        en_passant_position = None
+        if en_passant != "-":
+            en_passant_position = parse_square(en_passant)
+            # The pawn that just moved two squares belongs to the other side
+            if en_passant_position[0] != (2 if side == "w" else 5):
+                raise ValueError(f"Invalid FEN {fen!r}: bad en passant "
+                                 f"square {en_passant!r}")
+        try:
+            halfmove_clock = int(halfmove)
+            fullmove_number = int(fullmove)
+        except ValueError:
+            raise ValueError(f"Invalid FEN {fen!r}: bad move clocks") from None
+        if not 0 <= halfmove_clock <= 0xFFFF or \
+                not 1 <= fullmove_number <= 0xFFFF:
+            raise ValueError(f"Invalid FEN {fen!r}: move clocks out of range")
+
+        self.set_board(board, FEN_SIDES[side], en_passant_position,
+                       halfmove_clock, fullmove_number)
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "ChessBoard":
+        """
+        Creates a board holding a position written in Forsyth-Edwards
+        Notation, without setting up the starting position first.
+
+        Args:
+            fen (str): The position.
+
+        Returns:
+            ChessBoard: The new board.
+
+        Raises:
+            ValueError: If the FEN cannot be read.
+        """
+        chess_board = cls.__empty()
+        chess_board.load_fen(fen)
+        return chess_board
 
     def move_puts_in_check(self, position, i, j, colour) -> bool:
         """
@@ -120,65 +760,129 @@ class ChessBoard:
             bool: True if the move puts the king in check, False otherwise.
         """
 
-        # Create a copy of the board
-        board_copy = [row[:] for row in self.__board]
-        # Move the piece to the target position
-        board_copy[i][j] = board_copy[position[0]][position[1]]
-        board_copy[position[0]][position[1]] = "-"
-        # Check if the move puts the king in check
-        return self.is_king_in_check(colour, board_copy)
+        # Play the move in place, test the king, then take the move back
+        self.make_move(MoveGenerator.create_move(self, position, (i, j)))
+        in_check = self.is_king_in_check(colour)
+        self.unmake_move()
+        return in_check
     
-    def is_king_in_check(self, colour: str, board: list) -> bool:
+    def is_king_in_check(self, colour: str, board: list = None) -> bool:
         """
-        Checks if the king of the specified colour is in check.
+        Checks if the king of the specified colour is in check, by looking
+        outwards from the tracked king square for enemy attackers.
 
         Args:
             colour (str): The colour of the king to check.
-            board (list): The current state of the board.
+            board (list): Unused, the board's own state is always checked.
+                          Kept for callers that still pass the board list.
 
         Returns:
             bool: True if the king is in check, False otherwise.
+
+        Raises:
+            ValueError: If the colour has no king on the board.
         """
-        king_position = None
-        for i, row in enumerate(board):
-            for j, piece in enumerate(row):
-                if isinstance(piece, King) and piece.colour == colour:
-                    king_position = (i, j)
-                    break
-            if king_position:
-                break
-        if not king_position:
+        king_square = self.__bitboards.king_square(colour)
+        if king_square is None:
             raise ValueError(f"No {colour} king found on the board")
-        for i, row in enumerate(board):
-            for j, piece in enumerate(row):
-                if isinstance(piece, Piece) and piece.colour != colour:
-                    if piece.is_valid_move(king_position, self):
-                        return True
-        return False
+        return self.__bitboards.is_square_attacked(
+            king_square, "Black" if colour == "White" else "White")
 
     def has_legal_moves(self, colour: str, in_check: bool) -> bool:
-        for row in self.__board:
-            for piece in row:
-                if isinstance(piece, Piece) and piece.colour == colour:
-                    for i in range(8):
-                        for j in range(8):
-                            if piece.is_valid_move((i, j), self) and not self.move_puts_in_check(piece.position, *(i, j), colour):
-                                return True
-        return False
+        """
+        Checks if a colour has at least one move that does not leave its king
+        in check.
+
+        Args:
+            colour (str): The colour to check.
+            in_check (bool): True if the king of the colour is in check. The
+                             legal move generator finds checks itself, so
+                             this is no longer needed.
+
+        Returns:
+            bool: True if a legal move exists, False otherwise.
+        """
+        return bool(MoveGenerator.generate_legal_moves(self, colour))
+
+    def legal_moves(self) -> list:
+        """
+        Gets the legal moves of the side to move. The list is generated once
+        per position and cached together with the game status.
+
+        Returns:
+            list: A list of Move records. Do not modify it.
+        """
+        return self.__get_status()[1]
+
+    @property
+    def game_status(self) -> str:
+        """
+        Gets the status of the game: ONGOING, CHECKMATE, STALEMATE or DRAW
+        (by the fifty-move rule, threefold repetition or insufficient
+        material). It is computed once per position and cached.
+        """
+        return self.__get_status()[2]
+
+    def __get_status(self) -> tuple:
+        """
+        Gets the cached status of the current position, computing it first
+        if a move has been made or unmade since the last call.
+
+        The cache is tagged rather than cleared on every move, so making and
+        unmaking moves costs nothing extra and a search that returns to the
+        same position keeps the cached status. The tag holds the Zobrist
+        key, which fixes the legal moves, checkmate, stalemate and material,
+        and the two draw rules that depend on how the position was reached:
+        the fifty-move rule and threefold repetition.
+
+        Returns:
+            tuple: The position tag, the legal moves and the game status.
+        """
+        tag = (self.__key, self.__halfmove_clock >= 100,
+               self.repetition_count() >= 2)
+        cache = self.__status_cache
+        if cache is not None and cache[0] == tag:
+            return cache
+
+        moves = MoveGenerator.generate_legal_moves(self, self.__side_to_move)
+        if not moves:
+            status = CHECKMATE if self.is_king_in_check(self.__side_to_move) \
+                else STALEMATE
+        elif tag[1] or tag[2] or self.has_insufficient_material():
+            status = DRAW
+        else:
+            status = ONGOING
+        self.__status_cache = (tag, moves, status)
+        return self.__status_cache
+
+    def has_insufficient_material(self) -> bool:
+        """
+        Checks if neither side has the material left to checkmate: only
+        kings, or kings and a single bishop or knight.
+
+        Returns:
+            bool: True if checkmate is impossible, False otherwise.
+        """
+        counts = self.__bitboards.counts
+        for colour in ("White", "Black"):
+            for name in ("Pawn", "Rook", "Queen"):
+                if counts[PIECE_INDEX[(colour, name)]]:
+                    return False
+        minors = sum(counts[PIECE_INDEX[(colour, name)]]
+                     for colour in ("White", "Black")
+                     for name in ("Knight", "Bishop"))
+        return minors <= 1
 
     def is_game_over(self) -> bool:
         """
-        Checks if the game is over by checking if either side has no legal moves.
+        Checks if the game is over: the side to move is checkmated or
+        stalemated, or the game is drawn. Cheap to call every frame, as the
+        status is cached until a move is made.
 
         Returns:
             bool: True if the game is over, False otherwise.
         """
-
-        for colour in ["White", "Black"]:
-            in_check = self.is_king_in_check(colour, self.__board)
-            if not self.has_legal_moves(colour, in_check):
-                return True
-        return False
+        return self.game_status != ONGOING
 
     def __str__(self) -> str:
         """
@@ -210,6 +914,26 @@ class ChessBoard:
 
         return board_str
 
+    def __eq__(self, other) -> bool:
+        """
+        Checks if two boards hold the same position by comparing their
+        Zobrist keys. Boards are mutable and unhashable; zobrist_key is the
+        hashable key of the current position.
+
+        Args:
+            other (ChessBoard): The board to compare with.
+
+        Returns:
+            bool: True if the positions are equal, False otherwise.
+        """
+        if not isinstance(other, ChessBoard):
+            return NotImplemented
+        return self.__key == other.zobrist_key
+
+    # Boards change with every move, so they cannot be set members or dict
+    # keys; use zobrist_key to index positions instead
+    __hash__ = None
+
     def __repr__(self) -> str:
         """
         Returns a string representation of the board.
@@ -0,0 +1,116 @@
+"""
+Piece-square tables for the static evaluation.
+
+Scores are in centipawns and, like the rest of the AI, positive values favour
+Black. The tables are written from White's point of view with row 0 (Black's
+back row) first, so a Black piece reads the table with its row mirrored.
+"""
+from bitboard import PIECE_INDEX, square_index
+
+# One pawn in piece_score units is worth this many centipawns
+CENTIPAWNS = 100
+
+PIECE_SQUARE_TABLES = {
+    "Pawn": (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ),
+    "Knight": (
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ),
+    "Bishop": (
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ),
+    "Rook": (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ),
+    "Queen": (
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ),
+    "King": (
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ),
+}
+
+
+def _build_signed_tables() -> tuple:
+    """
+    Builds the piece-square contribution of every (colour, piece) pair,
+    indexed like the bitboards and signed so that Black scores positive.
+
+    Returns:
+        tuple: ``table[PIECE_INDEX[(colour, name)]][square]`` in centipawns.
+    """
+    tables = [None] * 12
+    for (colour, name), index in PIECE_INDEX.items():
+        table = PIECE_SQUARE_TABLES[name]
+        if colour == "White":
+            tables[index] = tuple(-value for value in table)
+        else:
+            tables[index] = tuple(table[square_index(7 - row, col)]
+                                  for row in range(8) for col in range(8))
+    return tuple(tables)
+
+
+SIGNED_PIECE_SQUARE = _build_signed_tables()
+
+
+def compute_piece_square_score(board: list) -> int:
+    """
+    Sums the piece-square terms of a board from scratch.
+
+    Args:
+        board (list): The 8x8 board state holding pieces and "-" strings.
+
+    Returns:
+        int: The piece-square score in centipawns, positive for Black.
+    """
+    score = 0
+    for row in range(8):
+        for col in range(8):
+            piece = board[row][col]
+            if piece != "-":
+                score += SIGNED_PIECE_SQUARE[
+                    PIECE_INDEX[(piece.colour, piece.name)]][row * 8 + col]
+    return score
@@ -1,3 +1,5 @@
-from .logging_config import setup_logging
+from .logging_config import setup_logging, set_performance_mode, \
+    is_performance_mode, ClassLogger
 
-__all__ = ['setup_logging']
\ No newline at end of file
+__all__ = ['setup_logging', 'set_performance_mode', 'is_performance_mode',
+           'ClassLogger']
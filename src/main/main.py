@@ -1,20 +1,34 @@
+import sys
 from Game import Game
+from game_logger import setup_logging
 from board import ChessBoard
 import pygame as pg
 from ui import UI
 from players import UserPlayer, AIPlayer
 from ai import AI
+from opening_book import OpeningBook
 
 
 if __name__ == "__main__":
+    # Per-move INFO logging is only wanted when asked for with --verbose
+    setup_logging(performance_mode="--verbose" not in sys.argv)
     pg.init()
     board = ChessBoard()
     # ui = UI(400, 400)
     ui = UI(800, 800)
     algorithm = AI(board)
     user_player = UserPlayer("White")
-    ai_player = AIPlayer("Black", algorithm, depth=3)
+    # --book FILE lets the AI play its opening moves from a book
+    book = OpeningBook(sys.argv[sys.argv.index("--book") + 1]) \
+        if "--book" in sys.argv[:-1] else None
+    ai_player = AIPlayer("Black", algorithm, depth=3, book=book)
     # game = Game(board, ui, user_player, ai_player)
     # game = Game(board, ui)
-    game = Game(ui, user_player, ai_player, board)
-    game.play()
+    # --pgn FILE appends the finished game to FILE
+    pgn_path = sys.argv[sys.argv.index("--pgn") + 1] \
+        if "--pgn" in sys.argv[:-1] else None
+    game = Game(ui, user_player, ai_player, board, pgn_path)
+    try:
+        game.play()
+    finally:
+        ai_player.close()
@@ -0,0 +1,141 @@
+"""
+Move ordering for the alpha-beta search.
+
+Alpha-beta prunes the most when the best move is searched first, so moves are
+sorted before they are searched: the hash move from the transposition table,
+then captures by MVV-LVA (most valuable victim, least valuable attacker),
+then the killer moves of the ply, then the remaining quiet moves by their
+history score.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from bitboard import square_index
+from pieces.move_generator import CAPTURE, EN_PASSANT, PROMOTION
+
+if TYPE_CHECKING:
+    from board import ChessBoard
+    from pieces import Move
+
+HASH_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 28
+KILLER_SCORES = (1 << 27, (1 << 27) - 1)
+# History scores are halved once one of them passes this value, so they
+# always stay below the killer scores
+HISTORY_LIMIT = 1 << 26
+
+
+class MoveOrderer:
+    """
+    Sorts moves for the search and keeps the killer and history tables that
+    the sorting learns from.
+
+    Attributes:
+        piece_score (dict): The value of each piece type, by piece name.
+        killers (list): Two killer moves per ply, most recent first.
+        history (dict): Per colour, a 64x64 table of scores indexed by
+                        ``from square * 64 + to square``.
+    """
+
+    MAX_PLY = 128
+
+    def __init__(self, piece_score: dict):
+        """
+        Initializes empty killer and history tables.
+
+        Args:
+            piece_score (dict): The value of each piece type, by piece name.
+        """
+        self.piece_score = piece_score
+        self.killers = [[None, None] for _ in range(self.MAX_PLY)]
+        self.history = {"White": [0] * 4096, "Black": [0] * 4096}
+
+    def new_search(self) -> None:
+        """
+        Prepares the tables for a new search. Killers only make sense within
+        one search, while history scores are aged so that older results
+        count for less.
+        """
+        self.killers = [[None, None] for _ in range(self.MAX_PLY)]
+        for table in self.history.values():
+            for index, value in enumerate(table):
+                table[index] = value >> 1
+
+    def order_moves(self, moves: list, chess_board: ChessBoard, ply: int,
+                    hash_move: Move = None) -> list:
+        """
+        Sorts a list of moves, best candidates first.
+
+        Args:
+            moves (list): The Move records to sort, all of the same colour.
+            chess_board (ChessBoard): The position the moves are played from.
+            ply (int): The distance from the root of the search.
+            hash_move (Move): The best move from the transposition table.
+
+        Returns:
+            list: The sorted list.
+        """
+        if not moves:
+            return moves
+        board = chess_board.get_board()
+        piece_score = self.piece_score
+        killers = self.killers[ply] if ply < self.MAX_PLY else (None, None)
+        first_row, first_col = moves[0].from_position
+        history = self.history[board[first_row][first_col].colour]
+
+        def score(move: Move) -> int:
+            if move == hash_move:
+                return HASH_MOVE_SCORE
+            to_row, to_col = move.to_position
+            flags = move.flags
+            if flags & (CAPTURE | PROMOTION):
+                # Captures and promotions: MVV-LVA, where a promotion adds
+                # the value of the new piece to whatever it captures
+                from_row, from_col = move.from_position
+                victim = board[to_row][to_col]
+                victim_value = piece_score["Pawn"] if victim == "-" \
+                    else piece_score[victim.name]
+                attacker = board[from_row][from_col]
+                promotion = move.promotion
+                if promotion is not None:
+                    victim_value += piece_score[promotion]
+                return CAPTURE_SCORE + victim_value * 64 - \
+                    piece_score[attacker.name]
+            if flags & EN_PASSANT:
+                return CAPTURE_SCORE + piece_score["Pawn"] * 63
+            if move == killers[0]:
+                return KILLER_SCORES[0]
+            if move == killers[1]:
+                return KILLER_SCORES[1]
+            return history[square_index(*move.from_position) * 64 +
+                           square_index(to_row, to_col)]
+
+        moves.sort(key=score, reverse=True)
+        return moves
+
+    def record_cutoff(self, move: Move, colour: str, depth: int,
+                      ply: int) -> None:
+        """
+        Learns from a quiet move that caused a beta cutoff: it becomes a
+        killer move for the ply and its history score grows with the depth
+        of the search it refuted.
+
+        Args:
+            move (Move): The move that caused the cutoff.
+            colour (str): The colour that played the move.
+            depth (int): The remaining depth of the search.
+            ply (int): The distance from the root of the search.
+        """
+        if move.is_capture or move.promotion is not None:
+            return
+        if ply < self.MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        table = self.history[colour]
+        index = square_index(*move.from_position) * 64 + \
+            square_index(*move.to_position)
+        table[index] += depth * depth
+        if table[index] > HISTORY_LIMIT:
+            for slot, value in enumerate(table):
+                table[slot] = value >> 1
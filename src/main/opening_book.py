@@ -0,0 +1,249 @@
+"""
+Opening book: a sorted binary file of (position key, move, weight) entries.
+
+The file starts with BOOK_MAGIC and then holds ENTRY_STRUCT records sorted
+by Zobrist key, with the entries of one position ordered by falling weight.
+Keys are stored big-endian, so the records sort the same way as their raw
+bytes. A book is opened with mmap and searched by binary search, so opening
+it reads nothing up front, and processes that open the same book share its
+pages through the operating system's file cache.
+
+Books are built from PGN collections: every move played within the first
+plies of a game is counted, weighted by how the game went for the side that
+played it.
+
+Usage:
+    python src/main/opening_book.py games.pgn [more.pgn ...] -o book.bin
+"""
+import argparse
+import mmap
+import random
+import struct
+from board import ChessBoard
+from game_logger import ClassLogger, set_performance_mode
+from pgn import read_games, parse_san
+from pieces import Move
+
+BOOK_MAGIC = b"CHBOOK01"
+# Zobrist key, encoded move and weight
+ENTRY_STRUCT = struct.Struct(">QII")
+ENTRY_SIZE = ENTRY_STRUCT.size
+# Plies of each game added to a book by default
+BOOK_PLIES = 16
+# Weight added to a move for a win, draw or loss of the side that played it,
+# and for a game without a result
+RESULT_WEIGHTS = {"win": 2, "draw": 1, "loss": 0, "*": 1}
+MAX_WEIGHT = 0xFFFFFFFF
+
+
+class OpeningBook:
+    """
+    A read-only opening book mapped into memory.
+
+    Attributes:
+        path (str): The file the book was opened from.
+    """
+
+    logger = ClassLogger()
+
+    def __init__(self, path: str, seed: int = None):
+        """
+        Maps a book file into memory.
+
+        Args:
+            path (str): The book file.
+            seed (int): Seed of the random weighted choice of book moves,
+                        or None for an unseeded one.
+
+        Raises:
+            ValueError: If the file is not a book.
+        """
+        self.path = path
+        with open(path, "rb") as stream:
+            self.__data = mmap.mmap(stream.fileno(), 0,
+                                    access=mmap.ACCESS_READ)
+        if self.__data[:len(BOOK_MAGIC)] != BOOK_MAGIC or \
+                (len(self.__data) - len(BOOK_MAGIC)) % ENTRY_SIZE:
+            self.__data.close()
+            raise ValueError(f"{path} is not an opening book")
+        self.__count = (len(self.__data) - len(BOOK_MAGIC)) // ENTRY_SIZE
+        self.__random = random.Random(seed)
+        self.logger.info("Opened opening book %s with %d entries", path,
+                         self.__count)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of entries in the book.
+        """
+        return self.__count
+
+    def __enter__(self) -> "OpeningBook":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmaps the book file.
+        """
+        self.__data.close()
+
+    def __key_at(self, index: int) -> bytes:
+        """
+        Gets the raw big-endian key of an entry, which compares like the key.
+        """
+        offset = len(BOOK_MAGIC) + index * ENTRY_SIZE
+        return self.__data[offset:offset + 8]
+
+    def entries(self, key: int) -> list:
+        """
+        Looks up the entries of a position by binary search.
+
+        Args:
+            key (int): The Zobrist key of the position.
+
+        Returns:
+            list: (Move, weight) pairs, heaviest first, or an empty list if
+                  the position is not in the book.
+        """
+        target = key.to_bytes(8, "big")
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            if self.__key_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        entries = []
+        offset = len(BOOK_MAGIC) + low * ENTRY_SIZE
+        while low < self.__count:
+            entry_key, move, weight = ENTRY_STRUCT.unpack_from(self.__data,
+                                                               offset)
+            if entry_key != key:
+                break
+            entries.append((Move.decode(move), weight))
+            low += 1
+            offset += ENTRY_SIZE
+        return entries
+
+    def moves(self, chess_board: ChessBoard) -> list:
+        """
+        Gets the book moves of a position that are legal in it, which also
+        rules out entries of another position with the same key.
+
+        Args:
+            chess_board (ChessBoard): The position.
+
+        Returns:
+            list: (Move, weight) pairs with a weight above 0, heaviest first.
+        """
+        legal_moves = chess_board.legal_moves()
+        return [(move, weight) for move, weight
+                in self.entries(chess_board.zobrist_key)
+                if weight and move in legal_moves]
+
+    def choose(self, chess_board: ChessBoard, randomise: bool = True):
+        """
+        Picks a book move for the side to move.
+
+        Args:
+            chess_board (ChessBoard): The position.
+            randomise (bool): True to pick at random in proportion to the
+                              weights, False to always pick the heaviest.
+
+        Returns:
+            Move: The book move, or None if the position is not in the book.
+        """
+        moves = self.moves(chess_board)
+        if not moves:
+            return None
+        if not randomise:
+            return moves[0][0]
+        return self.__random.choices([move for move, _ in moves],
+                                     [weight for _, weight in moves])[0]
+
+
+def build_book(games, path: str, max_plies: int = BOOK_PLIES,
+               min_weight: int = 1) -> int:
+    """
+    Builds a book file from games. A game stops counting at its first move
+    that cannot be read.
+
+    Args:
+        games: An iterable of PGNGame records, such as read_games(stream).
+        path (str): The book file to write.
+        max_plies (int): The number of plies of each game to add.
+        min_weight (int): Moves with a lower total weight are left out.
+
+    Returns:
+        int: The number of entries written.
+    """
+    weights = {}
+    chess_board = ChessBoard()
+    for game in games:
+        try:
+            chess_board.load_fen(game.fen)
+        except ValueError as error:
+            OpeningBook.logger.warning("Skipping game: %s", error)
+            continue
+        for san in game.moves[:max_plies]:
+            try:
+                move = parse_san(chess_board, san)
+            except ValueError as error:
+                OpeningBook.logger.warning("Stopping game at %s", error)
+                break
+            if game.result == "1/2-1/2":
+                outcome = "draw"
+            elif game.result in ("1-0", "0-1"):
+                outcome = "win" if (game.result == "1-0") == \
+                    (chess_board.side_to_move == "White") else "loss"
+            else:
+                outcome = "*"
+            entry = (chess_board.zobrist_key, move.encode())
+            weights[entry] = weights.get(entry, 0) + RESULT_WEIGHTS[outcome]
+            chess_board.make_move(move)
+
+    entries = sorted(((key, move, min(weight, MAX_WEIGHT))
+                      for (key, move), weight in weights.items()
+                      if weight >= min_weight),
+                     key=lambda entry: (entry[0], -entry[2], entry[1]))
+    with open(path, "wb") as stream:
+        stream.write(BOOK_MAGIC)
+        for entry in entries:
+            stream.write(ENTRY_STRUCT.pack(*entry))
+    return len(entries)
+
+
+def main() -> int:
+    """
+    Builds a book from the command line.
+
+    Returns:
+        int: 0 once the book is written.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pgn", nargs="+", help="PGN files to read")
+    parser.add_argument("-o", "--output", default="book.bin",
+                        help="book file to write (default: book.bin)")
+    parser.add_argument("--plies", type=int, default=BOOK_PLIES,
+                        help=f"plies of each game to add (default: "
+                             f"{BOOK_PLIES})")
+    parser.add_argument("--min-weight", type=int, default=1,
+                        help="leave out moves with a lower total weight")
+    args = parser.parse_args()
+
+    set_performance_mode(True)
+
+    def all_games():
+        for path in args.pgn:
+            with open(path, encoding="utf-8", errors="replace") as stream:
+                yield from read_games(stream)
+
+    count = build_book(all_games(), args.output, args.plies, args.min_weight)
+    print(f"Wrote {count} entries to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,529 @@
+"""
+Parallel searches that spread the AI over several CPU cores.
+
+ParallelSearch is Lazy SMP: every CPU core searches the same root.
+
+The workers do not split the tree between them. Each one runs its own
+iterative deepening search of the whole position, and they cooperate only
+through a transposition table held in shared memory: a position one worker
+has searched is a table hit for the others. Helper workers start at
+different depths so that they run ahead of the main search and fill the
+table with results the main search can use. The main search in the calling
+process decides the move; the helpers are stopped as soon as it finishes.
+
+RootSplitSearch is simpler: the moves at the root are shared out between the
+processes of a pool, and each process searches the subtrees it is given.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from ai import AI, SearchTimeout
+from game_logger import ClassLogger, set_performance_mode
+from board import ChessBoard
+from transposition import TranspositionTable, UPPER_BOUND
+
+# Seconds between two checks of the stop event and deadline of a root split
+# search while it waits for its subtrees
+POLL_INTERVAL = 0.01
+# The stop event of the RootSplitSearch that owns a pool process, set by
+# _init_root_process
+_root_stop_event = None
+
+def _run_helper(memory_name: str, size_mb: float, generation: int,
+                position: bytes, max_depth: int, is_maximizing_player: bool,
+                start_depth: int, time_limit: float, stop_event, node_counts,
+                index: int) -> None:
+    """
+    Runs one helper search in a worker process, sharing the table of the
+    main search.
+
+    Args:
+        memory_name (str): The name of the shared memory block of the table.
+        size_mb (float): The size of the table in megabytes.
+        generation (int): The generation of the main search's table before
+                          the search, which the helper's search also starts
+                          a new generation from.
+        position (bytes): The packed position to search.
+        max_depth (int): The deepest iteration to run.
+        is_maximizing_player (bool): True if the side to move is the
+                                     maximizing player, False otherwise.
+        start_depth (int): The depth of the first iteration.
+        time_limit (float): The wall-clock budget in seconds, or None.
+        stop_event: The event the main process sets to stop the helpers.
+        node_counts: The shared array the helper reports its nodes in.
+        index (int): The slot of this helper in node_counts.
+    """
+    set_performance_mode(True)
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        table = TranspositionTable(size_mb, buffer=memory.buf,
+                                   generation=generation)
+        ai = AI(ChessBoard.from_bytes(position), transposition_table=table)
+        ai.stop_event = stop_event
+        try:
+            ai.search(max_depth, is_maximizing_player, time_limit=time_limit,
+                      start_depth=start_depth)
+        finally:
+            node_counts[index] = ai.nodes
+            # The table views the shared buffer and must go before it closes
+            del ai, table
+    finally:
+        memory.close()
+
+
+def _init_root_process(stop_event) -> None:
+    """
+    Keeps the stop event of a RootSplitSearch in each of its pool processes.
+    Events can only reach a process as it starts, not as task arguments.
+
+    Args:
+        stop_event: The event the search sets to stop the running subtrees.
+    """
+    global _root_stop_event
+    _root_stop_event = stop_event
+
+
+def _search_root_move(position: bytes, move, depth: int,
+                      is_maximizing_player: bool, alpha: float, beta: float,
+                      time_limit: float, hash_size_mb: float,
+                      can_stop: bool) -> tuple:
+    """
+    Searches the subtree of one root move in a pool process.
+
+    Every subtree gets a fresh AI and table, so its score only depends on
+    the move, depth and window and not on which process searched it.
+
+    Args:
+        position (bytes): The packed root position.
+        move (Move): The root move to search.
+        depth (int): The depth of the search, counting the root move.
+        is_maximizing_player (bool): True if the side to move is the
+                                     maximizing player, False otherwise.
+        alpha (float): The alpha value for alpha-beta pruning.
+        beta (float): The beta value for alpha-beta pruning.
+        time_limit (float): The wall-clock budget in seconds, or None.
+        hash_size_mb (float): The size of the table of the subtree.
+        can_stop (bool): True if the stop event of the pool may end the
+                         search early, False to always finish it.
+
+    Returns:
+        tuple: The score of the move, or None if the budget ran out or the
+               search was stopped, the number of nodes searched and the
+               principal variation that follows the move in the subtree.
+    """
+    set_performance_mode(True)
+    ai = AI(ChessBoard.from_bytes(position), hash_size_mb)
+    if can_stop:
+        ai.stop_event = _root_stop_event
+    try:
+        score = ai.search_move(move, depth, is_maximizing_player, alpha, beta,
+                               time_limit)
+    except SearchTimeout:
+        return None, ai.nodes, []
+    ai.chess_board.make_move(move)
+    line = ai.principal_variation()
+    ai.chess_board.unmake_move()
+    return score, ai.nodes, line
+
+
+class ParallelSearch:
+    """
+    Runs Lazy SMP searches for an AI, with the AI's transposition table moved
+    into shared memory.
+
+    The search has the same interface as AI.search, so a ParallelSearch can
+    be used wherever an AI searches.
+
+    Attributes:
+        ai (AI): The AI that runs the main search.
+        workers (int): The number of searches run at once, including the
+                       main search.
+        nodes (int): The nodes searched by all workers in the last search.
+    """
+
+    logger = ClassLogger()
+
+    def __init__(self, ai: AI, workers: int = None):
+        """
+        Initializes the parallel search and gives the AI a shared table of
+        the same size as its current one.
+
+        Args:
+            ai (AI): The AI that runs the main search.
+            workers (int): The number of searches to run at once. Defaults
+                           to the number of CPU cores.
+        """
+        self.ai = ai
+        self.workers = max(workers or os.cpu_count() or 1, 1)
+        self.nodes = 0
+        self.__size_mb = ai.transposition_table.size_mb
+        self.__memory = shared_memory.SharedMemory(
+            create=True, size=TranspositionTable.size_bytes(self.__size_mb))
+        ai.transposition_table = TranspositionTable(self.__size_mb,
+                                                    buffer=self.__memory.buf)
+
+    @property
+    def completed_depth(self) -> int:
+        """
+        Gets the depth of the last completed iteration of the main search.
+        """
+        return self.ai.completed_depth
+
+    def search(self, max_depth: int, is_maximizing_player: bool,
+               time_limit: float = None, node_limit: int = None) -> tuple:
+        """
+        Searches the AI's position with all workers.
+
+        Odd helpers start one ply deeper than even ones, so that the workers
+        are spread over neighbouring depths rather than all repeating the
+        same iteration.
+
+        Args:
+            max_depth (int): The deepest iteration of the main search.
+            is_maximizing_player (bool): True if the side to move is the
+                                         maximizing player, False otherwise.
+            time_limit (float): The wall-clock budget in seconds, or None.
+            node_limit (int): The node budget of the main search, or None.
+
+        Returns:
+            tuple: The score and best move found by the main search.
+        """
+        stop_event = multiprocessing.Event()
+        node_counts = multiprocessing.Array("Q", self.workers, lock=False)
+        position = self.ai.chess_board.to_bytes()
+        generation = self.ai.transposition_table.generation
+        helpers = []
+        for index in range(1, self.workers):
+            helper = multiprocessing.Process(
+                target=_run_helper, daemon=True,
+                args=(self.__memory.name, self.__size_mb, generation, position,
+                      max_depth + 1, is_maximizing_player, 1 + index % 2,
+                      time_limit, stop_event, node_counts, index))
+            helper.start()
+            helpers.append(helper)
+
+        try:
+            result = self.ai.search(max_depth, is_maximizing_player,
+                                    time_limit=time_limit,
+                                    node_limit=node_limit)
+        finally:
+            stop_event.set()
+            for helper in helpers:
+                helper.join(timeout=1)
+                if helper.is_alive():
+                    helper.terminate()
+                    helper.join()
+
+        self.nodes = self.ai.nodes + sum(node_counts)
+        self.logger.debug("Lazy SMP with %d workers searched %d nodes",
+                          self.workers, self.nodes)
+        return result
+
+    def set_budget(self, time_limit: float = None,
+                   node_limit: int = None) -> None:
+        """
+        Replaces the budget of the running search, as AI.set_budget does.
+        The helpers stop with the main search, so only its budget changes.
+
+        Args:
+            time_limit (float): The wall-clock budget in seconds, or None.
+            node_limit (int): The node budget, or None.
+        """
+        self.ai.set_budget(time_limit, node_limit)
+
+    def close(self) -> None:
+        """
+        Gives the AI a private table again and frees the shared memory.
+        """
+        if self.__memory is None:
+            return
+        self.ai.transposition_table = TranspositionTable(self.__size_mb)
+        self.__memory.close()
+        self.__memory.unlink()
+        self.__memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RootSplitSearch:
+    """
+    Runs iterative-deepening searches for an AI with the root moves split
+    over a process pool.
+
+    The first root move of each iteration is searched on its own so that its
+    score can bound the others. After that, the pool keeps one subtree per
+    worker running. Each new subtree is searched with the best score
+    finished so far as its alpha bound (beta for the minimizing player), so
+    later subtrees prune as much as a sequential search would.
+
+    The merge does not depend on the order in which subtrees finish: ties
+    go to the move that comes first in the root order, as in minimax. Moves
+    are submitted in root order, so a move before the current best was
+    submitted while an earlier, strictly lower score was the best, and a
+    tie with the current best is still scored exactly.
+
+    The pool processes have tables of their own, so at the end of each
+    iteration the best line is written into the AI's table as depth 0
+    entries. These never cut a search off but give principal_variation,
+    and so pondering, the line the pool found.
+
+    Once the first iteration is complete, the search stops when the AI's
+    stop event is set or the deadline passes. The subtrees still running
+    are then stopped through an event shared with the pool processes.
+
+    The search has the same interface as AI.search, so a RootSplitSearch can
+    be used wherever an AI searches.
+
+    Attributes:
+        ai (AI): The AI whose position is searched and whose move orderer
+                 sorts the first iteration.
+        workers (int): The number of processes in the pool.
+        hash_size_mb (float): The size of the table of each subtree search.
+        nodes (int): The nodes searched in the last search.
+        completed_depth (int): The last completed iteration.
+    """
+
+    logger = ClassLogger()
+
+    def __init__(self, ai: AI, workers: int = None, hash_size_mb: float = 4):
+        """
+        Initializes the search. The pool is started by the first search.
+
+        Args:
+            ai (AI): The AI whose position is searched.
+            workers (int): The number of processes in the pool. Defaults to
+                           the number of CPU cores.
+            hash_size_mb (float): The size of the table of each subtree.
+        """
+        self.ai = ai
+        self.workers = max(workers or os.cpu_count() or 1, 1)
+        self.hash_size_mb = hash_size_mb
+        self.nodes = 0
+        self.completed_depth = 0
+        self.__pool = None
+        self.__pool_stop_event = multiprocessing.Event()
+        self.__deadline = None
+        self.__node_limit = None
+
+    def search(self, max_depth: int, is_maximizing_player: bool,
+               time_limit: float = None, node_limit: int = None) -> tuple:
+        """
+        Runs the iterative-deepening search. Each iteration searches the root
+        moves best first by the scores of the previous one.
+
+        As with AI.search, the first iteration always completes. A later
+        iteration that runs out of time or is stopped by the AI's stop event
+        is thrown away. The node budget is checked between iterations only.
+
+        Args:
+            max_depth (int): The deepest iteration to run.
+            is_maximizing_player (bool): True if the side to move is the
+                                         maximizing player, False otherwise.
+            time_limit (float): The wall-clock budget in seconds, or None.
+            node_limit (int): The node budget, or None.
+
+        Returns:
+            tuple: The score and best move of the last completed iteration.
+        """
+        if self.__pool is None:
+            self.__pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_root_process,
+                initargs=(self.__pool_stop_event,))
+        self.__pool_stop_event.clear()
+        # Only the best lines are stored in the AI's table, but they age too
+        self.ai.transposition_table.new_search()
+        self.nodes = 0
+        self.completed_depth = 0
+        self.set_budget(time_limit, node_limit)
+        white_moves, black_moves = self.ai.all_moves()
+        moves = self.ai.move_orderer.order_moves(
+            black_moves if is_maximizing_player else white_moves,
+            self.ai.chess_board, 0)
+        result = (None, None)
+        if not moves:
+            return result
+
+        for depth in range(1, max_depth + 1):
+            try:
+                result, moves = self.__search_iteration(
+                    moves, depth, is_maximizing_player)
+            except SearchTimeout:
+                break
+            self.completed_depth = depth
+            try:
+                self.__check_budget()
+            except SearchTimeout:
+                break
+            if self.__node_limit is not None and \
+                    self.nodes >= self.__node_limit:
+                break
+
+        self.logger.debug("Root split over %d workers searched %d nodes",
+                          self.workers, self.nodes)
+        return result
+
+    def set_budget(self, time_limit: float = None,
+                   node_limit: int = None) -> None:
+        """
+        Replaces the budget of the running search, as AI.set_budget does.
+        Subtrees already running without a time limit are stopped once the
+        new deadline passes.
+
+        Args:
+            time_limit (float): The wall-clock budget in seconds, or None.
+            node_limit (int): The node budget, or None.
+        """
+        self.__deadline = None if time_limit is None \
+            else time.monotonic() + time_limit
+        self.__node_limit = node_limit
+
+    def __check_budget(self) -> None:
+        """
+        Raises SearchTimeout when the deadline has passed or the AI's stop
+        event is set, as AI.check_budget does. The first iteration is never
+        stopped.
+        """
+        if not self.completed_depth:
+            return
+        if self.__deadline is not None and \
+                time.monotonic() >= self.__deadline:
+            raise SearchTimeout()
+        if self.ai.stop_event is not None and self.ai.stop_event.is_set():
+            raise SearchTimeout()
+
+    def __search_iteration(self, moves: list, depth: int,
+                           is_maximizing_player: bool) -> tuple:
+        """
+        Searches every root move to one depth over the pool.
+
+        Scores are handled as gains for the side to move (negated for the
+        minimizing player) so that one comparison serves both sides.
+
+        Args:
+            moves (list): The root moves, best candidates first.
+            depth (int): The depth of the iteration.
+            is_maximizing_player (bool): True if the side to move is the
+                                         maximizing player, False otherwise.
+
+        Returns:
+            tuple: The (score, best move) of the iteration and the root moves
+                   sorted by their new scores.
+
+        Raises:
+            SearchTimeout: If the time runs out or the search is stopped
+                           before every root move is scored.
+        """
+        sign = 1 if is_maximizing_player else -1
+        infinity = float('inf')
+        position = self.ai.chess_board.to_bytes()
+        gains = [None] * len(moves)
+        lines = [None] * len(moves)
+        best_index = None
+        pending = {}
+        next_index = 0
+        can_stop = self.completed_depth > 0
+
+        while next_index < len(moves) or pending:
+            # Until the first move is scored there is no bound to share
+            while next_index < len(moves) and len(pending) < self.workers \
+                    and (best_index is not None or not pending):
+                bound = -infinity if best_index is None \
+                    else gains[best_index]
+                alpha, beta = (bound, infinity) if is_maximizing_player \
+                    else (-infinity, -bound)
+                time_limit = None
+                if can_stop and self.__deadline is not None:
+                    time_limit = max(self.__deadline - time.monotonic(), 0)
+                future = self.__pool.submit(
+                    _search_root_move, position, moves[next_index],
+                    depth, is_maximizing_player, alpha, beta, time_limit,
+                    self.hash_size_mb, can_stop)
+                pending[future] = (next_index, bound)
+                next_index += 1
+
+            done, _ = wait(pending, timeout=POLL_INTERVAL,
+                           return_when=FIRST_COMPLETED)
+            try:
+                self.__check_budget()
+            except SearchTimeout:
+                self.__stop_subtrees(pending)
+                raise
+            for future in sorted(done, key=lambda item: pending[item][0]):
+                index, bound = pending.pop(future)
+                score, nodes, lines[index] = future.result()
+                self.nodes += nodes
+                if score is None:
+                    self.__stop_subtrees(pending)
+                    raise SearchTimeout()
+                gains[index] = sign * score
+                # A score at or below its bound only caps the move's value,
+                # and the bound already rules the move out
+                if gains[index] > bound and (
+                        best_index is None or gains[index] > gains[best_index]
+                        or (gains[index] == gains[best_index]
+                            and index < best_index)):
+                    best_index = index
+
+        order = sorted(range(len(moves)), key=lambda index: -gains[index])
+        best_move = moves[best_index]
+        self.__store_line([best_move] + lines[best_index])
+        return (sign * gains[best_index], best_move), \
+            [moves[index] for index in order]
+
+    def __stop_subtrees(self, pending: dict) -> None:
+        """
+        Cancels the subtrees not started yet and stops the running ones
+        through the pool's stop event, waiting for them so that none is
+        still running when the next search starts.
+
+        Args:
+            pending (dict): The futures of the unfinished subtrees.
+        """
+        self.__pool_stop_event.set()
+        for future in pending:
+            future.cancel()
+        for future in wait(pending).done:
+            if not future.cancelled():
+                self.nodes += future.result()[1]
+
+    def __store_line(self, line: list) -> None:
+        """
+        Writes a line of moves from the root into the AI's table as depth 0
+        entries, which only supply best moves.
+
+        Args:
+            line (list): The Move records of the line, the root move first.
+        """
+        board = self.ai.chess_board
+        played = 0
+        try:
+            for move in line:
+                if move not in board.legal_moves():
+                    break
+                self.ai.transposition_table.store(board.zobrist_key, 0, 0,
+                                                  UPPER_BOUND, move)
+                board.make_move(move)
+                played += 1
+        finally:
+            for _ in range(played):
+                board.unmake_move()
+
+    def close(self) -> None:
+        """
+        Shuts the process pool down.
+        """
+        if self.__pool is not None:
+            self.__pool.shutdown(cancel_futures=True)
+            self.__pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
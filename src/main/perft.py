@@ -0,0 +1,121 @@
+"""
+Perft: move generator correctness and throughput benchmark.
+
+Perft counts the leaf nodes of the legal move tree to a fixed depth. The
+counts for the positions below are well known, so any difference points to a
+bug in move generation or in make/unmake, and the time taken gives a
+nodes-per-second figure that can be compared between versions.
+
+Usage:
+    python src/main/perft.py [--depth N] [--position NAME]
+"""
+import argparse
+import time
+from board import ChessBoard, START_FEN
+from game_logger import set_performance_mode
+from pieces import MoveGenerator
+
+# (name, FEN, expected leaf counts from depth 1 up)
+PERFT_POSITIONS = [
+    ("start", START_FEN, [20, 400, 8902, 197281, 4865609]),
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R "
+     "w KQkq - 0 1", [48, 2039, 97862, 4085603]),
+    ("endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     [14, 191, 2812, 43238, 674624]),
+    ("promotions", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 "
+     "w kq - 0 1", [6, 264, 9467, 422333]),
+    ("discovered", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R "
+     "w KQ - 1 8", [44, 1486, 62379, 2103487]),
+    ("middlegame", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/"
+     "R4RK1 w - - 0 10", [46, 2079, 89890, 3894594]),
+]
+
+
+def perft(chess_board: ChessBoard, colour: str, depth: int) -> int:
+    """
+    Counts the leaf nodes of the legal move tree. The legal move generator
+    is trusted at the last ply, where the moves are counted rather than
+    played.
+
+    Args:
+        chess_board (ChessBoard): The position to start from.
+        colour (str): The colour to move.
+        depth (int): The number of plies to search.
+
+    Returns:
+        int: The number of leaf nodes at the given depth.
+    """
+    if depth == 0:
+        return 1
+    moves = MoveGenerator.generate_legal_moves(chess_board, colour)
+    if depth == 1:
+        return len(moves)
+    opponent = "Black" if colour == "White" else "White"
+    nodes = 0
+    for move in moves:
+        chess_board.make_move(move)
+        nodes += perft(chess_board, opponent, depth - 1)
+        chess_board.unmake_move()
+    return nodes
+
+
+def run_position(name: str, fen: str, expected: list,
+                 max_depth: int) -> bool:
+    """
+    Runs perft on one position for every depth up to max_depth, printing
+    the node count, time and nodes per second of each depth.
+
+    Args:
+        name (str): The name of the position.
+        fen (str): The position.
+        expected (list): The known leaf counts, from depth 1 up.
+        max_depth (int): The deepest depth to run.
+
+    Returns:
+        bool: True if every count matched the known value, False otherwise.
+    """
+    chess_board = ChessBoard.from_fen(fen)
+    passed = True
+    print(f"{name}:")
+    for depth in range(1, min(max_depth, len(expected)) + 1):
+        started = time.perf_counter()
+        nodes = perft(chess_board, chess_board.side_to_move, depth)
+        elapsed = time.perf_counter() - started
+        ok = nodes == expected[depth - 1]
+        passed = passed and ok
+        print(f"  depth {depth}: {nodes:>10} nodes {elapsed:8.3f}s "
+              f"{nodes / max(elapsed, 1e-9):>10.0f} nps "
+              f"{'ok' if ok else f'FAIL (expected {expected[depth - 1]})'}")
+    return passed
+
+
+def main() -> int:
+    """
+    Runs the perft suite from the command line.
+
+    Returns:
+        int: 0 if every count matched, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--depth", type=int, default=3,
+                        help="deepest depth to run (default: 3)")
+    parser.add_argument("--position", choices=[position[0] for position
+                                               in PERFT_POSITIONS],
+                        help="run a single position")
+    args = parser.parse_args()
+
+    # Piece and board set-up logging would drown out the results
+    set_performance_mode(True)
+
+    passed = True
+    started = time.perf_counter()
+    for name, fen, expected in PERFT_POSITIONS:
+        if args.position in (None, name):
+            passed = run_position(name, fen, expected, args.depth) and passed
+    print(f"{'All counts match' if passed else 'MISMATCH'} "
+          f"({time.perf_counter() - started:.2f}s)")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,360 @@
+"""
+Reading and writing games in Portable Game Notation (PGN).
+
+read_games streams games out of a PGN file one at a time, reading it line by
+line, so memory use does not grow with the size of the file. Each game keeps
+its moves as Standard Algebraic Notation (SAN) text until it is replayed,
+when every move is resolved against the legal moves of the position. Games
+that are only filtered on their headers are never replayed at all.
+
+Usage:
+    with open("games.pgn") as stream:
+        for game in read_games(stream):
+            for chess_board, move in game.replay():
+                ...
+"""
+import re
+from board import ChessBoard, CHECKMATE, STALEMATE, DRAW, START_FEN, FILES, \
+    square_name, parse_square
+from pieces.move_generator import CASTLING
+
+# Piece name -> SAN letter, and back. Pawns have no letter.
+SAN_LETTERS = {"Knight": "N", "Bishop": "B", "Rook": "R", "Queen": "Q",
+               "King": "K"}
+SAN_PIECES = {letter: name for name, letter in SAN_LETTERS.items()}
+# Piece letter, origin file and rank, capture, target square and promotion
+SAN_PATTERN = re.compile(
+    r"([NBRQK])?([a-h])?([1-8])?(x)?([a-h][1-8])(?:=?([NBRQ]))?")
+KINGSIDE_CASTLING = ("O-O", "0-0")
+QUEENSIDE_CASTLING = ("O-O-O", "0-0-0")
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+# The tags every game carries, in the order they are written
+SEVEN_TAG_ROSTER = ("Event", "Site", "Date", "Round", "White", "Black",
+                    "Result")
+TAG_PATTERN = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Movetext tokens: comments, NAGs, variation brackets, results, move
+# numbers and moves. An unclosed "{" runs to the end of the line.
+TOKEN_PATTERN = re.compile(
+    r"\{[^}]*\}?|;.*|\$\d+|[()]|1-0|0-1|1/2-1/2|\*|\d+\.+|[^\s(){};$]+")
+LINE_LENGTH = 79
+
+
+def move_to_san(chess_board: ChessBoard, move) -> str:
+    """
+    Writes a legal move of the side to move in SAN, e.g. "Nbd7", "exd6",
+    "e8=Q+" or "O-O#". The move is played and taken back to find out whether
+    it gives check or mate.
+
+    Args:
+        chess_board (ChessBoard): The position the move is played in.
+        move (Move): The move.
+
+    Returns:
+        str: The move in SAN.
+    """
+    board = chess_board.get_board()
+    from_row, from_col = move.from_position
+    to_row, to_col = move.to_position
+    piece = board[from_row][from_col]
+
+    if move.flags & CASTLING:
+        san = KINGSIDE_CASTLING[0] if to_col > from_col \
+            else QUEENSIDE_CASTLING[0]
+    elif piece.name == "Pawn":
+        san = square_name(move.to_position)
+        if move.is_capture:
+            san = FILES[from_col] + "x" + san
+        if move.promotion is not None:
+            san += "=" + SAN_LETTERS[move.promotion]
+    else:
+        # Other pieces of the same kind that can reach the same square
+        rivals = [other.from_position for other in chess_board.legal_moves()
+                  if other.to_position == move.to_position and
+                  other.from_position != move.from_position and
+                  board[other.from_position[0]][other.from_position[1]].name
+                  == piece.name]
+        origin = ""
+        if rivals:
+            if all(col != from_col for _, col in rivals):
+                origin = FILES[from_col]
+            elif all(row != from_row for row, _ in rivals):
+                origin = str(8 - from_row)
+            else:
+                origin = square_name(move.from_position)
+        san = SAN_LETTERS[piece.name] + origin + \
+            ("x" if move.is_capture else "") + square_name(move.to_position)
+
+    chess_board.make_move(move)
+    if chess_board.game_status == CHECKMATE:
+        san += "#"
+    elif chess_board.is_king_in_check(chess_board.side_to_move):
+        san += "+"
+    chess_board.unmake_move()
+    return san
+
+
+def parse_san(chess_board: ChessBoard, san: str):
+    """
+    Finds the legal move of the side to move written in SAN. Check and mate
+    marks and annotations such as "!?" are ignored, and so is a missing or
+    superfluous "x".
+
+    Args:
+        chess_board (ChessBoard): The position the move is played in.
+        san (str): The move, e.g. "Nf3", "exd5", "e8=Q" or "O-O".
+
+    Returns:
+        Move: The matching legal move.
+
+    Raises:
+        ValueError: If the text is not SAN, or matches no legal move or more
+                    than one.
+    """
+    text = san.rstrip("+#!?")
+    moves = chess_board.legal_moves()
+    if text in KINGSIDE_CASTLING or text in QUEENSIDE_CASTLING:
+        kingside = text in KINGSIDE_CASTLING
+        matches = [move for move in moves if move.flags & CASTLING and
+                   (move.to_position[1] > move.from_position[1]) == kingside]
+    else:
+        match = SAN_PATTERN.fullmatch(text)
+        if match is None:
+            raise ValueError(f"Invalid SAN {san!r}")
+        letter, file, rank, _, target, promotion = match.groups()
+        name = SAN_PIECES[letter] if letter else "Pawn"
+        to_position = parse_square(target)
+        from_col = FILES.index(file) if file else None
+        from_row = 8 - int(rank) if rank else None
+        promotion = SAN_PIECES[promotion] if promotion else None
+        board = chess_board.get_board()
+        matches = []
+        for move in moves:
+            row, col = move.from_position
+            if move.to_position == to_position and \
+                    board[row][col].name == name and \
+                    from_col in (None, col) and from_row in (None, row) and \
+                    move.promotion == promotion:
+                matches.append(move)
+    if len(matches) != 1:
+        raise ValueError(f"{'Illegal' if not matches else 'Ambiguous'} move "
+                         f"{san!r}")
+    return matches[0]
+
+
+class PGNGame:
+    """
+    One game: its tags, its moves in SAN and its result.
+
+    Attributes:
+        headers (dict): The tag pairs, e.g. {"White": "...", "Result": "1-0"}.
+        moves (list): The moves in SAN, in the order they were played.
+        result (str): "1-0", "0-1", "1/2-1/2" or "*" for an unfinished game.
+    """
+
+    def __init__(self, headers: dict = None, moves: list = None,
+                 result: str = "*"):
+        """
+        Initializes a game record.
+
+        Args:
+            headers (dict): The tag pairs, or None for none.
+            moves (list): The moves in SAN, or None for none.
+            result (str): The result of the game.
+        """
+        self.headers = dict(headers or {})
+        self.moves = list(moves or [])
+        self.result = result
+
+    @property
+    def fen(self) -> str:
+        """
+        Gets the FEN of the starting position, from the FEN tag of games
+        that do not start from the initial position.
+        """
+        return self.headers.get("FEN", START_FEN)
+
+    @classmethod
+    def from_board(cls, chess_board: ChessBoard,
+                   headers: dict = None) -> "PGNGame":
+        """
+        Records the game played on a board so far. The moves are taken back
+        to reach the starting position and then replayed to write them in
+        SAN, so the board ends in the position it started in but must not
+        be used by another thread meanwhile.
+
+        Args:
+            chess_board (ChessBoard): The board the game was played on.
+            headers (dict): Tags to record, such as the player names.
+
+        Returns:
+            PGNGame: The game, with its result taken from the board's game
+                     status.
+        """
+        moves = chess_board.move_history
+        for _ in moves:
+            chess_board.unmake_move()
+        fen = chess_board.to_fen()
+        sans = []
+        for move in moves:
+            sans.append(move_to_san(chess_board, move))
+            chess_board.make_move(move)
+
+        status = chess_board.game_status
+        if status == CHECKMATE:
+            result = "0-1" if chess_board.side_to_move == "White" else "1-0"
+        elif status in (STALEMATE, DRAW):
+            result = "1/2-1/2"
+        else:
+            result = "*"
+        game = cls(headers, sans, result)
+        if fen != START_FEN:
+            game.headers["SetUp"] = "1"
+            game.headers["FEN"] = fen
+        return game
+
+    def replay(self, chess_board: ChessBoard = None):
+        """
+        Plays the moves of the game one by one from its starting position.
+        The same board is yielded every time, holding the position after
+        the move, so copy it to keep a position.
+
+        Args:
+            chess_board (ChessBoard): A board to reuse, which is reset to the
+                                      starting position, or None for a new
+                                      one.
+
+        Yields:
+            tuple: The board and the Move record just played.
+
+        Raises:
+            ValueError: If a move is not legal where it is played.
+        """
+        if chess_board is None:
+            chess_board = ChessBoard.from_fen(self.fen)
+        else:
+            chess_board.load_fen(self.fen)
+        for san in self.moves:
+            move = parse_san(chess_board, san)
+            chess_board.make_move(move)
+            yield chess_board, move
+
+    def to_pgn(self) -> str:
+        """
+        Writes the game as PGN text: the Seven Tag Roster first, then the
+        other tags, then the movetext wrapped to LINE_LENGTH characters.
+
+        Returns:
+            str: The game, ending with a newline.
+        """
+        headers = dict(self.headers)
+        headers["Result"] = self.result
+        lines = []
+        for name in SEVEN_TAG_ROSTER:
+            lines.append(_format_tag(name, headers.pop(name, "?")))
+        for name, value in headers.items():
+            lines.append(_format_tag(name, value))
+        lines.append("")
+
+        fields = self.fen.split()
+        number = int(fields[5]) if len(fields) == 6 else 1
+        white_to_move = fields[1] == "w"
+        tokens = []
+        for san in self.moves:
+            if white_to_move:
+                tokens.append(f"{number}.")
+            elif not tokens:
+                tokens.append(f"{number}...")
+            tokens.append(san)
+            if not white_to_move:
+                number += 1
+            white_to_move = not white_to_move
+        tokens.append(self.result)
+
+        line = ""
+        for token in tokens:
+            if line and len(line) + 1 + len(token) > LINE_LENGTH:
+                lines.append(line)
+                line = token
+            else:
+                line = f"{line} {token}" if line else token
+        lines.append(line)
+        return "\n".join(lines) + "\n"
+
+
+def _format_tag(name: str, value: str) -> str:
+    """
+    Writes one tag pair, escaping quotes and backslashes in the value.
+    """
+    value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'[{name} "{value}"]'
+
+
+def read_games(stream):
+    """
+    Reads the games of a PGN stream one at a time. Only the game being read
+    is held in memory. Comments, variations, numeric annotation glyphs and
+    move numbers are skipped; the moves are kept as SAN until replayed.
+
+    Args:
+        stream: A text stream or any iterable of lines, such as an open file.
+
+    Yields:
+        PGNGame: Each game in the stream, in order.
+    """
+    headers = {}
+    moves = []
+    in_comment = False
+    variation_depth = 0
+    for line in stream:
+        if in_comment:
+            end = line.find("}")
+            if end < 0:
+                continue
+            line = line[end + 1:]
+            in_comment = False
+        stripped = line.strip()
+        if stripped.startswith("%"):
+            continue
+        if stripped.startswith("[") and not variation_depth:
+            if moves:
+                # A new game started before the last one gave its result
+                yield PGNGame(headers, moves, headers.get("Result", "*"))
+                headers, moves = {}, []
+            tag = TAG_PATTERN.match(stripped)
+            if tag is not None:
+                headers[tag.group(1)] = re.sub(r"\\(.)", r"\1", tag.group(2))
+            continue
+
+        for token in TOKEN_PATTERN.findall(line):
+            first = token[0]
+            if first == "{":
+                in_comment = not token.endswith("}")
+            elif first == "(":
+                variation_depth += 1
+            elif first == ")":
+                variation_depth = max(variation_depth - 1, 0)
+            elif variation_depth or first in ";$" or token[-1] == ".":
+                # Variation moves, rest-of-line comments, NAGs and move
+                # numbers
+                continue
+            elif token in RESULTS:
+                yield PGNGame(headers, moves, token)
+                headers, moves = {}, []
+            else:
+                moves.append(token)
+
+    if headers or moves:
+        yield PGNGame(headers, moves, headers.get("Result", "*"))
+
+
+def write_game(stream, game: PGNGame) -> None:
+    """
+    Appends a game to a PGN stream, followed by a blank line.
+
+    Args:
+        stream: A writable text stream.
+        game (PGNGame): The game to write.
+    """
+    stream.write(game.to_pgn())
+    stream.write("\n")
@@ -8,6 +8,7 @@ from .bishop import Bishop
 from .queen import Queen
 from .king import King
 from .validator import MoveValidator
+from .move_generator import Move, MoveGenerator
 
 __all__ = ["Piece", "Pawn", "Rook", "Knight", "Bishop", "Queen", "King",
-           "MoveValidator"]
+           "MoveValidator", "Move", "MoveGenerator"]
@@ -0,0 +1,564 @@
+from __future__ import annotations
+from typing import NamedTuple, TYPE_CHECKING
+from bitboard import BETWEEN, SQUARE_BB, iter_squares, square_index, \
+    square_position
+
+if TYPE_CHECKING:
+    from board import ChessBoard
+    from .piece import Piece
+
+
+# Move flags. Promotion flags name the piece the pawn turns into and may be
+# combined with CAPTURE.
+QUIET = 0
+CAPTURE = 1
+DOUBLE_PAWN_PUSH = 2
+EN_PASSANT = 4
+CASTLING = 8
+PROMOTE_KNIGHT = 16
+PROMOTE_BISHOP = 32
+PROMOTE_ROOK = 64
+PROMOTE_QUEEN = 128
+PROMOTION = PROMOTE_KNIGHT | PROMOTE_BISHOP | PROMOTE_ROOK | PROMOTE_QUEEN
+
+PROMOTION_FLAGS = {"Knight": PROMOTE_KNIGHT, "Bishop": PROMOTE_BISHOP,
+                   "Rook": PROMOTE_ROOK, "Queen": PROMOTE_QUEEN}
+PROMOTION_PIECES = {flag: name for name, flag in PROMOTION_FLAGS.items()}
+
+# Direction and offset tables, as (row step, column step) pairs.
+KNIGHT_OFFSETS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                  (1, -2), (1, 2), (2, -1), (2, 1))
+KING_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1),
+                (0, 1), (1, -1), (1, 0), (1, 1))
+BISHOP_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+ROOK_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+QUEEN_DIRECTIONS = BISHOP_DIRECTIONS + ROOK_DIRECTIONS
+
+
+def _build_step_table(offsets: tuple) -> tuple:
+    """
+    Builds, for every square, the on-board targets of a set of offsets.
+
+    Args:
+        offsets (tuple): The (row step, column step) offsets.
+
+    Returns:
+        tuple: ``table[square]`` is a tuple of (row, col) targets.
+    """
+    table = []
+    for square in range(64):
+        row, col = square_position(square)
+        table.append(tuple((row + row_step, col + col_step)
+                           for row_step, col_step in offsets
+                           if 0 <= row + row_step < 8
+                           and 0 <= col + col_step < 8))
+    return tuple(table)
+
+
+def _build_ray_table(directions: tuple) -> tuple:
+    """
+    Builds, for every square, the rays a sliding piece walks along.
+
+    Args:
+        directions (tuple): The (row step, column step) directions.
+
+    Returns:
+        tuple: ``table[square]`` is a tuple of rays, each a tuple of (row, col)
+               squares ordered outwards from the square.
+    """
+    table = []
+    for square in range(64):
+        row, col = square_position(square)
+        rays = []
+        for row_step, col_step in directions:
+            ray = []
+            new_row, new_col = row + row_step, col + col_step
+            while 0 <= new_row < 8 and 0 <= new_col < 8:
+                ray.append((new_row, new_col))
+                new_row += row_step
+                new_col += col_step
+            if ray:
+                rays.append(tuple(ray))
+        table.append(tuple(rays))
+    return tuple(table)
+
+
+KNIGHT_TARGETS = _build_step_table(KNIGHT_OFFSETS)
+KING_TARGETS = _build_step_table(KING_OFFSETS)
+SLIDING_RAYS = {"Bishop": _build_ray_table(BISHOP_DIRECTIONS),
+                "Rook": _build_ray_table(ROOK_DIRECTIONS),
+                "Queen": _build_ray_table(QUEEN_DIRECTIONS)}
+STEP_TARGETS = {"Knight": KNIGHT_TARGETS, "King": KING_TARGETS}
+
+
+class Move(NamedTuple):
+    """
+    A move record produced by the move generator.
+
+    Attributes:
+        from_position (tuple): The (row, col) the piece moves from.
+        to_position (tuple): The (row, col) the piece moves to.
+        flags (int): A combination of the move flags defined in this module.
+    """
+
+    from_position: tuple
+    to_position: tuple
+    flags: int = QUIET
+
+    @property
+    def is_capture(self) -> bool:
+        """
+        Checks if the move captures a piece, including en passant.
+        """
+        return bool(self.flags & (CAPTURE | EN_PASSANT))
+
+    @property
+    def promotion(self):
+        """
+        Gets the name of the piece a pawn promotes to, or None.
+        """
+        return PROMOTION_PIECES.get(self.flags & PROMOTION)
+
+    def encode(self) -> int:
+        """
+        Packs the move into a 20-bit integer: the from square in bits 0-5,
+        the to square in bits 6-11 and the flags in bits 12-19.
+
+        Returns:
+            int: The encoded move, never 0.
+        """
+        return square_index(*self.from_position) | \
+            square_index(*self.to_position) << 6 | self.flags << 12
+
+    @classmethod
+    def decode(cls, value: int) -> Move:
+        """
+        Unpacks a move encoded with encode.
+
+        Args:
+            value (int): The encoded move.
+
+        Returns:
+            Move: The move record.
+        """
+        return cls(square_position(value & 63),
+                   square_position(value >> 6 & 63), value >> 12)
+
+
+class MoveGenerator:
+    """
+    Generates moves straight from the direction and offset tables, instead
+    of testing every square of the board with the validator.
+
+    Sliding pieces walk their rays until they hit a blocker. The
+    generate_moves family is pseudo-legal: moves that would leave the own
+    king in check are still produced, except castling, which is only
+    generated when the king does not start in, pass through or land on an
+    attacked square. The generate_legal_moves family then drops the illegal
+    moves using the pins and checks of the position, without playing them.
+    """
+
+    @staticmethod
+    def generate_moves(chess_board: ChessBoard, colour: str) -> list:
+        """
+        Generates all pseudo-legal moves for one colour.
+
+        Args:
+            chess_board (ChessBoard): The current state of the board.
+            colour (str): The colour to generate moves for.
+
+        Returns:
+            list: A list of Move records.
+        """
+        board = chess_board.get_board()
+        moves = []
+        for square in iter_squares(chess_board.bitboards.get_occupancy(colour)):
+            row, col = square_position(square)
+            MoveGenerator.__add_piece_moves(board[row][col], chess_board,
+                                            moves)
+        return moves
+
+    @staticmethod
+    def generate_captures(chess_board: ChessBoard, colour: str) -> list:
+        """
+        Generates the pseudo-legal captures and promotions of one colour, as
+        needed by the quiescence search.
+
+        Args:
+            chess_board (ChessBoard): The current state of the board.
+            colour (str): The colour to generate moves for.
+
+        Returns:
+            list: A list of Move records.
+        """
+        board = chess_board.get_board()
+        moves = []
+        for square in iter_squares(chess_board.bitboards.get_occupancy(colour)):
+            row, col = square_position(square)
+            MoveGenerator.__add_piece_moves(board[row][col], chess_board,
+                                            moves, True)
+        return moves
+
+    @staticmethod
+    def generate_legal_moves(chess_board: ChessBoard, colour: str,
+                             captures_only: bool = False) -> list:
+        """
+        Generates all legal moves for one colour.
+
+        Args:
+            chess_board (ChessBoard): The current state of the board.
+            colour (str): The colour to generate moves for.
+            captures_only (bool): True to generate only the legal captures
+                                  and promotions.
+
+        Returns:
+            list: A list of Move records.
+        """
+        if captures_only:
+            moves = MoveGenerator.generate_captures(chess_board, colour)
+        else:
+            moves = MoveGenerator.generate_moves(chess_board, colour)
+        return MoveGenerator.__filter_legal(chess_board, colour, moves)
+
+    @staticmethod
+    def generate_legal_piece_moves(piece: Piece,
+                                   chess_board: ChessBoard) -> list:
+        """
+        Generates the legal moves of a single piece.
+
+        Args:
+            piece (Piece): The piece to generate moves for.
+            chess_board (ChessBoard): The current state of the board.
+
+        Returns:
+            list: A list of Move records.
+        """
+        return MoveGenerator.__filter_legal(
+            chess_board, piece.colour,
+            MoveGenerator.generate_piece_moves(piece, chess_board))
+
+    @staticmethod
+    def __filter_legal(chess_board: ChessBoard, colour: str,
+                       moves: list) -> list:
+        """
+        Keeps the pseudo-legal moves that do not leave the king in check.
+
+        The king may not step onto an attacked square, judged with the king
+        itself taken off the board so that it cannot hide behind itself from
+        a slider. When the king is in check, other pieces must capture the
+        single checking piece or block its line; in double check only the
+        king may move. A pinned piece must stay on its pin line. En passant
+        takes two pawns off one row at once, which can uncover the king in
+        ways pin lines do not show, so those rare moves are played and
+        tested instead.
+
+        Args:
+            chess_board (ChessBoard): The current state of the board.
+            colour (str): The colour of the moves.
+            moves (list): Pseudo-legal Move records of that colour.
+
+        Returns:
+            list: The legal moves, in their original order.
+        """
+        bitboards = chess_board.bitboards
+        king_square = bitboards.king_square(colour)
+        if king_square is None:
+            # Without a king there is nothing to leave in check
+            return moves
+        opponent = "Black" if colour == "White" else "White"
+        checkers = bitboards.attackers_to(king_square, opponent)
+        if not checkers:
+            evasions = -1
+        elif checkers & (checkers - 1):
+            evasions = 0
+        else:
+            evasions = checkers | \
+                BETWEEN[king_square][checkers.bit_length() - 1]
+        pins = bitboards.pin_rays(colour)
+        without_king = bitboards.occupied & ~SQUARE_BB[king_square]
+        attacked = bitboards.is_square_attacked
+
+        legal = []
+        for move in moves:
+            from_row, from_col = move.from_position
+            to_row, to_col = move.to_position
+            to_square = to_row * 8 + to_col
+            if from_row * 8 + from_col == king_square:
+                # Castling was already checked for attacked squares
+                if move.flags & CASTLING or \
+                        not attacked(to_square, opponent, without_king):
+                    legal.append(move)
+                continue
+            if move.flags & EN_PASSANT:
+                chess_board.make_move(move)
+                try:
+                    if not attacked(king_square, opponent):
+                        legal.append(move)
+                finally:
+                    chess_board.unmake_move()
+                continue
+            to_bit = SQUARE_BB[to_square]
+            if not evasions & to_bit:
+                continue
+            pin = pins.get(from_row * 8 + from_col)
+            if pin is None or pin & to_bit:
+                legal.append(move)
+        return legal
+
+    @staticmethod
+    def generate_piece_moves(piece: Piece, chess_board: ChessBoard) -> list:
+        """
+        Generates the pseudo-legal moves of a single piece.
+
+        Args:
+            piece (Piece): The piece to generate moves for.
+            chess_board (ChessBoard): The current state of the board.
+
+        Returns:
+            list: A list of Move records.
+        """
+        moves = []
+        MoveGenerator.__add_piece_moves(piece, chess_board, moves)
+        return moves
+
+    @staticmethod
+    def create_move(chess_board: ChessBoard, from_position: tuple,
+                    to_position: tuple, promotion: str = "Queen") -> Move:
+        """
+        Builds the move record for a piece moving between two squares,
+        working out its flags from the board.
+
+        Args:
+            chess_board (ChessBoard): The current state of the board.
+            from_position (tuple): The (row, col) the piece moves from.
+            to_position (tuple): The (row, col) the piece moves to.
+            promotion (str): The piece a pawn reaching the last row turns
+                             into.
+
+        Returns:
+            Move: The move record.
+
+        Raises:
+            ValueError: If a pawn moves diagonally onto an empty square that
+                        is not the en passant square.
+        """
+        board = chess_board.get_board()
+        from_row, from_col = from_position
+        to_row, to_col = to_position
+        piece = board[from_row][from_col]
+        flags = QUIET if board[to_row][to_col] == "-" else CAPTURE
+        if piece.name == "Pawn":
+            if abs(to_row - from_row) == 2:
+                flags = DOUBLE_PAWN_PUSH
+            elif from_col != to_col and flags == QUIET:
+                if to_position != chess_board.en_passant_position:
+                    raise ValueError(f"Pawn cannot move from {from_position} "
+                                     f"to the empty square {to_position}")
+                flags = EN_PASSANT
+            elif to_row in (0, 7):
+                flags |= PROMOTION_FLAGS[promotion]
+        elif piece.name == "King" and abs(to_col - from_col) == 2:
+            flags = CASTLING
+        return Move(from_position, to_position, flags)
+
+    @staticmethod
+    def is_square_attacked(chess_board: ChessBoard, position: tuple,
+                           colour: str) -> bool:
+        """
+        Checks if any piece of a colour attacks a square, looking outwards
+        from the square along the precomputed attack tables.
+
+        Args:
+            chess_board (ChessBoard): The current state of the board.
+            position (tuple): The (row, col) of the square.
+            colour (str): The colour of the attacking side.
+
+        Returns:
+            bool: True if the square is attacked, False otherwise.
+        """
+        return chess_board.bitboards.is_square_attacked(
+            square_index(*position), colour)
+
+    @staticmethod
+    def __add_piece_moves(piece: Piece, chess_board: ChessBoard,
+                          moves: list, captures_only: bool = False) -> None:
+        """
+        Appends the pseudo-legal moves of a piece to a list.
+
+        Args:
+            piece (Piece): The piece to generate moves for.
+            chess_board (ChessBoard): The current state of the board.
+            moves (list): The list the Move records are appended to.
+            captures_only (bool): True to leave out quiet moves.
+        """
+        name = piece.name
+        if name == "Pawn":
+            MoveGenerator.__add_pawn_moves(piece, chess_board, moves,
+                                           captures_only)
+        elif name in SLIDING_RAYS:
+            MoveGenerator.__add_sliding_moves(piece, chess_board, moves,
+                                              captures_only)
+        else:
+            MoveGenerator.__add_step_moves(piece, chess_board, moves,
+                                           captures_only)
+            if name == "King" and piece.is_initial_position and \
+                    not captures_only:
+                MoveGenerator.__add_castling_moves(piece, chess_board, moves)
+
+    @staticmethod
+    def __add_step_moves(piece: Piece, chess_board: ChessBoard,
+                         moves: list, captures_only: bool) -> None:
+        """
+        Appends the moves of a knight or king to a list.
+
+        Args:
+            piece (Piece): The knight or king.
+            chess_board (ChessBoard): The current state of the board.
+            moves (list): The list the Move records are appended to.
+            captures_only (bool): True to leave out quiet moves.
+        """
+        board = chess_board.get_board()
+        position = piece.position
+        colour = piece.colour
+        for target in STEP_TARGETS[piece.name][square_index(*position)]:
+            occupant = board[target[0]][target[1]]
+            if occupant == "-":
+                if not captures_only:
+                    moves.append(Move(position, target, QUIET))
+            elif occupant.colour != colour:
+                moves.append(Move(position, target, CAPTURE))
+
+    @staticmethod
+    def __add_sliding_moves(piece: Piece, chess_board: ChessBoard,
+                            moves: list, captures_only: bool) -> None:
+        """
+        Appends the moves of a bishop, rook or queen to a list. Each ray
+        stops at the first occupied square, which is a capture when it holds
+        an opposing piece.
+
+        Args:
+            piece (Piece): The sliding piece.
+            chess_board (ChessBoard): The current state of the board.
+            moves (list): The list the Move records are appended to.
+            captures_only (bool): True to leave out quiet moves.
+        """
+        board = chess_board.get_board()
+        position = piece.position
+        colour = piece.colour
+        for ray in SLIDING_RAYS[piece.name][square_index(*position)]:
+            for target in ray:
+                occupant = board[target[0]][target[1]]
+                if occupant == "-":
+                    if not captures_only:
+                        moves.append(Move(position, target, QUIET))
+                    continue
+                if occupant.colour != colour:
+                    moves.append(Move(position, target, CAPTURE))
+                break
+
+    @staticmethod
+    def __add_pawn_moves(piece: Piece, chess_board: ChessBoard,
+                         moves: list, captures_only: bool) -> None:
+        """
+        Appends the pushes, captures, en passant captures and promotions of a
+        pawn to a list.
+
+        Args:
+            piece (Piece): The pawn.
+            chess_board (ChessBoard): The current state of the board.
+            moves (list): The list the Move records are appended to.
+            captures_only (bool): True to leave out pushes that do not
+                                  promote.
+        """
+        board = chess_board.get_board()
+        position = piece.position
+        row, col = position
+        colour = piece.colour
+        if colour == "White":
+            step, start_row, last_row = -1, 6, 0
+        else:
+            step, start_row, last_row = 1, 1, 7
+        new_row = row + step
+
+        if board[new_row][col] == "-" and \
+                (not captures_only or new_row == last_row):
+            MoveGenerator.__add_pawn_move(position, (new_row, col), QUIET,
+                                          new_row == last_row, moves)
+            if row == start_row and not captures_only and \
+                    board[new_row + step][col] == "-":
+                moves.append(Move(position, (new_row + step, col),
+                                  DOUBLE_PAWN_PUSH))
+
+        en_passant_position = chess_board.en_passant_position
+        for new_col in (col - 1, col + 1):
+            if not 0 <= new_col < 8:
+                continue
+            occupant = board[new_row][new_col]
+            if occupant != "-":
+                if occupant.colour != colour:
+                    MoveGenerator.__add_pawn_move(position, (new_row, new_col),
+                                                  CAPTURE, new_row == last_row,
+                                                  moves)
+            elif (new_row, new_col) == en_passant_position:
+                # The square only belongs to the side to move; the pawn that
+                # just passed it must stand beside this pawn
+                victim = board[row][new_col]
+                if victim != "-" and victim.colour != colour and \
+                        victim.name == "Pawn":
+                    moves.append(Move(position, (new_row, new_col),
+                                      EN_PASSANT))
+
+    @staticmethod
+    def __add_pawn_move(position: tuple, new_position: tuple, flags: int,
+                        is_promotion: bool, moves: list) -> None:
+        """
+        Appends a pawn move, expanded into one move per promotion piece when
+        the pawn reaches the last row.
+
+        Args:
+            position (tuple): The (row, col) the pawn moves from.
+            new_position (tuple): The (row, col) the pawn moves to.
+            flags (int): The flags of the move before promotion.
+            is_promotion (bool): True if the pawn reaches the last row.
+            moves (list): The list the Move records are appended to.
+        """
+        if not is_promotion:
+            moves.append(Move(position, new_position, flags))
+            return
+        for promotion_flag in (PROMOTE_QUEEN, PROMOTE_KNIGHT, PROMOTE_ROOK,
+                               PROMOTE_BISHOP):
+            moves.append(Move(position, new_position, flags | promotion_flag))
+
+    @staticmethod
+    def __add_castling_moves(king: Piece, chess_board: ChessBoard,
+                             moves: list) -> None:
+        """
+        Appends the castling moves of a king that has not moved yet.
+
+        Args:
+            king (Piece): The king.
+            chess_board (ChessBoard): The current state of the board.
+            moves (list): The list the Move records are appended to.
+        """
+        board = chess_board.get_board()
+        row, col = king.position
+        if col != 4 or row != (7 if king.colour == "White" else 0):
+            return
+        opponent = "Black" if king.colour == "White" else "White"
+        attacked = MoveGenerator.is_square_attacked
+
+        # (rook column, columns that must be empty, columns the king crosses)
+        for rook_col, empty_cols, king_cols in ((7, (5, 6), (5, 6)),
+                                                (0, (1, 2, 3), (3, 2))):
+            rook = board[row][rook_col]
+            if rook == "-" or rook.name != "Rook" or \
+                    rook.colour != king.colour or \
+                    not rook.is_initial_position:
+                continue
+            if any(board[row][empty_col] != "-" for empty_col in empty_cols):
+                continue
+            if attacked(chess_board, (row, col), opponent) or \
+                    any(attacked(chess_board, (row, king_col), opponent)
+                        for king_col in king_cols):
+                continue
+            moves.append(Move((row, col), (row, king_cols[-1]), CASTLING))
@@ -23,21 +23,21 @@ class Pawn(Piece):
             position (tuple): The starting position of the pawn.
         """
         super().__init__(colour, "Pawn", position)
-        self.__is_initial_move = True
 
     @property
     def is_initial_move(self):
         """
-        Gets the initial move of the pawn.
+        Gets the initial move of the pawn. This is the same flag as
+        is_initial_position, so that undoing a move restores both.
         """
-        return self.__is_initial_move
+        return self.is_initial_position
     
     @is_initial_move.setter
     def is_initial_move(self, value: bool):
         """
         Sets the initial move of the pawn.
         """
-        self.__is_initial_move = value
+        self.is_initial_position = value
 
     def is_valid_move(self, new_position: tuple,
                       chess_board: ChessBoard) -> bool:
@@ -1,7 +1,7 @@
 # chess_game/pieces/piece.py
 from __future__ import annotations
 import logging
-from game_logger import setup_logging
+from game_logger import setup_logging, ClassLogger
 from .validator import MoveValidator
 
 setup_logging()
@@ -19,6 +19,9 @@ class Piece:
 
     """
 
+    # One logger per piece class, shared by all its instances
+    logger = ClassLogger()
+
     def __init__(self, colour: str, name: str, position: tuple):
         """
         Initializes a new Piece.
@@ -29,13 +32,12 @@ class Piece:
             position (tuple): The starting position of the piece.
         """
 
-        self.logger = logging.getLogger(self.__class__.__name__)
         self.__colour = colour
         self.__name = name
         self.__position = position
         self.__is_initial_position = True
         self.__posible_moves = []
-        self.logger.info(f"Creating a new {colour} {name} at {position}")
+        self.logger.debug("Creating a new %s %s at %s", colour, name, position)
 
     @property
     def colour(self):
@@ -91,8 +93,9 @@ class Piece:
         Returns:
             bool: True if the move is valid, False otherwise.
         """
-        self.logger.info(f"Checking if move of {self} to {new_position} is"
-                         "valid")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Checking if move of %s to %s is valid", self,
+                              new_position)
 
         return MoveValidator.is_basically_valid_move(self.position,
                                                      new_position,
@@ -109,7 +112,9 @@ class Piece:
             list: A list of possible moves for the piece.
         """
         self.__posible_moves = MoveValidator.get_possible_moves(self, chess_board)
-        self.logger.info(f"Possible moves for {self} at {self.position}: {self.__posible_moves}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Possible moves for %s at %s: %s", self,
+                              self.position, self.__posible_moves)
 
         return self.__posible_moves
 
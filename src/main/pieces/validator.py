@@ -1,5 +1,10 @@
 from __future__ import annotations
-from board import ChessBoard
+from typing import TYPE_CHECKING
+from bitboard import square_index
+from .move_generator import MoveGenerator
+
+if TYPE_CHECKING:
+    from board import ChessBoard
 
 
 class MoveValidator:
@@ -34,9 +39,8 @@ class MoveValidator:
         Returns:
             bool: True if the new position is empty, False otherwise.
         """
-        board = chess_board
-        row, col = new_position
-        return board[row][col] == "-"
+        square = square_index(*new_position)
+        return not chess_board.bitboards.is_occupied(square)
 
     @staticmethod
     def is_opposite_colour(position: tuple, new_position: tuple,
@@ -53,18 +57,16 @@ class MoveValidator:
             bool: True if the piece at the new position is the opposite
                   colour, False otherwise.
         """
-        row, col = new_position
-        board = chess_board
-        current_piece = board[position[0]][position[1]]
-        target_piece = board[row][col]
+        bitboards = chess_board.bitboards
+        target_colour = bitboards.colour_at(square_index(*new_position))
 
-        # Ensure there is a piece at the new position and it's of the 
+        # Ensure there is a piece at the new position and it's of the
         # opposite colour
 
-        if isinstance(target_piece, str):
+        if target_colour is None:
             return False
 
-        return target_piece.colour != current_piece.colour
+        return target_colour != bitboards.colour_at(square_index(*position))
 
     @staticmethod
     def is_basically_valid_move(position: tuple, new_position: tuple,
@@ -82,10 +84,10 @@ class MoveValidator:
         """
 
         return MoveValidator.is_move_within_bounds(new_position) and \
-            MoveValidator.is_new_cell_empty(new_position, chess_board) or \
-            MoveValidator.is_opposite_colour(position,
-                                             new_position,
-                                             chess_board)
+            (MoveValidator.is_new_cell_empty(new_position, chess_board) or
+             MoveValidator.is_opposite_colour(position,
+                                              new_position,
+                                              chess_board))
 
     @staticmethod
     def is_vertical_move(position: tuple, new_position: tuple) -> bool:
@@ -150,28 +152,10 @@ class MoveValidator:
             bool: True if the path to the new position is empty, False
                   otherwise.
         """
-        row, col = position
-        new_row, new_col = new_position
-        row_diff = new_row - row
-        col_diff = new_col - col
-        
-        # Determine direction of movement
-
-        # Horizontal step
-        row_step = (row_diff // abs(row_diff)) if row_diff != 0 else 0
-        
-        # Vertical step
-        col_step = (col_diff // abs(col_diff)) if col_diff != 0 else 0
-
-        steps = max(abs(row_diff), abs(col_diff)) - 1  # Exclude the final cell
-
-        for step in range(1, steps + 1):
-            current_row = row + step * row_step
-            current_col = col + step * col_step
-            if chess_board.get_board()[current_row][current_col] != "-": 
-                return False  # Path is blocked
-
-        return True  # Path is clear
+        # The bitboards know which squares lie between two aligned squares,
+        # so the whole path is tested with a single mask.
+        return chess_board.bitboards.is_path_clear(square_index(*position),
+                                                   square_index(*new_position))
 
     @staticmethod
     def is_L_shape_move(position: tuple, new_position: tuple) -> bool:
@@ -283,15 +267,15 @@ class MoveValidator:
         """
         row, col = position
         new_row, new_col = new_position
-        board = chess_board
-
-        # Check if the new cell is empty
-        if not MoveValidator.is_new_cell_empty(new_position, chess_board):
-            return False
+        piece = chess_board.get_piece_at_position(row, col)
 
         # Check if the move is within the bounds of the board
         if not MoveValidator.is_move_within_bounds(new_position):
             return False
+
+        # Check if the new cell is empty
+        if not MoveValidator.is_new_cell_empty(new_position, chess_board):
+            return False
         
         # Check for the pawn's initial two-square move
         if MoveValidator.is_initial_pawn_move_valid(position, new_position, 
@@ -299,7 +283,7 @@ class MoveValidator:
             return True
 
         # Check if the move is a one-square forward move
-        if board[row][col].colour == "White":
+        if piece.colour == "White":
             return new_col == col and new_row == row - 1
         else:
             return new_col == col and new_row == row + 1
@@ -320,18 +304,18 @@ class MoveValidator:
         """
         row, col = position
         new_row, new_col = new_position
-        board = chess_board
 
         # Check if the move is within the bounds of the board
         if not MoveValidator.is_move_within_bounds(new_position):
             return False
 
         # Check if the new cell is occupied by an opponent's piece
-        if MoveValidator.is_new_cell_empty(new_position, chess_board):
+        if not MoveValidator.is_opposite_colour(position, new_position,
+                                                chess_board):
             return False
 
         # Check if the pawn is capturing diagonally
-        if board[row][col].colour == "White":
+        if chess_board.get_piece_at_position(row, col).colour == "White":
             return abs(new_col - col) == 1 and new_row == row - 1
         else:
             return abs(new_col - col) == 1 and new_row == row + 1
@@ -385,19 +369,19 @@ class MoveValidator:
         """
         row, col = position
         new_row, new_col = new_position
-        board = chess_board
+        colour = chess_board.get_piece_at_position(row, col).colour
 
         if col != new_col:
             return False  # The move must be in the same column
 
-        if board[row][col].colour == "White" and \
+        if colour == "White" and \
            row == 6 and new_row == row - 2:
             # White pawn initial two-square move
             return MoveValidator.is_new_cell_empty((row-1, col),
                                                    chess_board) and \
                 MoveValidator.is_new_cell_empty(new_position, chess_board)
         
-        if board[row][col].colour == "Black" and \
+        if colour == "Black" and \
            row == 1 and new_row == row + 2:
             # Black pawn initial two-square move
             return MoveValidator.is_new_cell_empty((row+1, col),
@@ -466,9 +450,8 @@ class MoveValidator:
             list: A list of possible moves for the piece.
         """
         possible_moves = []
-        for row in range(8):
-            for col in range(8):
-                new_position = (row, col)
-                if piece.is_valid_move(new_position, chess_board):
-                    possible_moves.append(new_position)
+        for move in MoveGenerator.generate_legal_piece_moves(piece,
+                                                             chess_board):
+            if move.to_position not in possible_moves:
+                possible_moves.append(move.to_position)
         return possible_moves
@@ -1,19 +1,238 @@
 from .player import Player
+from board import ChessBoard
+from parallel_search import ParallelSearch, RootSplitSearch
+from search_worker import SearchWorker
 
 
 class AIPlayer(Player):
-    def __init__(self, colour, algorithm, depth=3):
+    def __init__(self, colour, algorithm, depth=3, time_limit=None,
+                 node_limit=None, workers=1, parallel="smp", ponder=False,
+                 book=None):
         super().__init__(colour)
         self.algorithm = algorithm  # AI algorithm, e.g., minimax
-        self.depth = depth
+        self.depth = depth  # Deepest iteration of the search
+        self.time_limit = time_limit  # Seconds per move, or None
+        self.node_limit = node_limit  # Nodes per move, or None
+        # Several workers search in parallel, either all of them on the whole
+        # tree through a shared table ("smp") or on split root moves ("root")
+        if workers <= 1:
+            self.search = algorithm
+        elif parallel == "root":
+            self.search = RootSplitSearch(algorithm, workers)
+        else:
+            self.search = ParallelSearch(algorithm, workers)
+        # Runs the search in the background for start_thinking/poll_move
+        self.worker = SearchWorker(self.search, algorithm)
+        self.__thinking = False
+        # Search on the opponent's time, from its expected reply
+        self.ponder = ponder
+        self.__predicted_reply = None
+        self.__pondering = False
+        self.__ponder_key = None
+        # Opening book (an OpeningBook) tried before any search, or None
+        self.book = book
+        self.__book_move = None
 
     def make_move(self, board):
-        _, best_move = self.algorithm.minimax(depth=self.depth, 
-                                              is_maximizing_player=True)
+        """
+        Plays a book move, or else searches the board and plays the best
+        move, blocking until done.
+
+        Args:
+            board (ChessBoard): The board to move on.
+
+        Returns:
+            bool: True if a move was made, False otherwise.
+        """
+        book_move = self.__choose_book_move(board)
+        if book_move is not None:
+            return self.__play(board, book_move, from_book=True)
+        self.algorithm.chess_board = board
+        # The evaluation scores positions from Black's point of view
+        _, best_move = self.search.search(
+            max_depth=self.depth, is_maximizing_player=self.colour == "Black",
+            time_limit=self.time_limit, node_limit=self.node_limit)
+        return self.__play(board, best_move)
+
+    @property
+    def is_thinking(self):
+        """
+        Checks whether a background search was started and its move has not
+        been collected by poll_move yet.
+        """
+        return self.__thinking
+
+    @property
+    def is_pondering(self):
+        """
+        Checks whether a search of the expected reply is running while the
+        opponent thinks.
+        """
+        return self.__pondering
+
+    def start_pondering(self, board):
+        """
+        Starts searching, without limits, the position after the reply the
+        last search expects from the opponent (the second move of its
+        principal variation). Call it once the AI's move has been played.
+
+        Args:
+            board (ChessBoard): The board the opponent is about to move on.
+
+        Returns:
+            bool: True if pondering started, False if there is no expected
+                  reply or pondering is off.
+        """
+        if not self.ponder or self.__thinking or self.__pondering or \
+                self.__predicted_reply is None:
+            return False
+        position = ChessBoard.from_bytes(board.to_bytes())
+        if self.__predicted_reply not in position.legal_moves():
+            return False
+        position.make_move(self.__predicted_reply)
+        self.__ponder_key = position.zobrist_key
+        self.worker.start(position, self.depth, self.colour == "Black")
+        self.__pondering = True
+        return True
+
+    def start_thinking(self, board):
+        """
+        Starts searching the board in the background and returns at once.
+        The move is played by a later poll_move call. A book move needs no
+        search and is played by the next poll_move call.
+
+        If the AI is pondering and the opponent played the expected reply
+        (a ponder hit), the running search simply carries on with the normal
+        budget, counted from now. Otherwise the ponder search is thrown away,
+        keeping its transposition table entries, and a new search starts.
+
+        Args:
+            board (ChessBoard): The board to move on.
+        """
+        book_move = self.__choose_book_move(board)
+        if book_move is not None:
+            if self.__pondering:
+                self.__pondering = False
+                self.worker.cancel()
+            self.__book_move = book_move
+            self.__thinking = True
+            return
+        if self.__pondering:
+            self.__pondering = False
+            if board.zobrist_key == self.__ponder_key:
+                self.logger.info("Ponder hit")
+                self.search.set_budget(self.time_limit, self.node_limit)
+                self.__thinking = True
+                return
+            self.logger.info("Ponder miss")
+            self.worker.cancel()
+        self.worker.start(board, self.depth, self.colour == "Black",
+                          time_limit=self.time_limit,
+                          node_limit=self.node_limit)
+        self.__thinking = True
+
+    def poll_move(self, board):
+        """
+        Plays the move of the background search if it has finished.
+
+        Args:
+            board (ChessBoard): The board the search was started on.
+
+        Returns:
+            bool: None while still thinking, otherwise True if a move was
+                  made and False if there was no move to make.
+        """
+        if not self.__thinking:
+            return False
+        if self.__book_move is not None:
+            book_move, self.__book_move = self.__book_move, None
+            self.__thinking = False
+            return self.__play(board, book_move, from_book=True)
+        result = self.worker.poll()
+        if result is None:
+            return None
+        self.__thinking = False
+        return self.__play(board, result[1])
+
+    def stop_thinking(self):
+        """
+        Asks the background search to finish early. Its move is still
+        collected by poll_move. A ponder search is thrown away instead.
+        """
+        if self.__pondering:
+            self.__pondering = False
+            self.worker.cancel()
+        else:
+            self.worker.stop()
+
+    def close(self):
+        """
+        Stops any background search and frees what the search holds: the
+        shared memory of a ParallelSearch or the process pool of a
+        RootSplitSearch. Call it once the player's game is over.
+        """
+        self.worker.cancel()
+        self.__thinking = False
+        self.__pondering = False
+        self.__book_move = None
+        if self.search is not self.algorithm:
+            self.search.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def progress(self):
+        """
+        Gets the (completed depth, nodes, seconds) of the current search.
+        """
+        return self.worker.progress()
+
+    def __choose_book_move(self, board):
+        """
+        Looks the board up in the opening book.
+
+        Args:
+            board (ChessBoard): The board to move on.
+
+        Returns:
+            Move: A book move, or None if there is no book or the position
+                  is not in it.
+        """
+        if self.book is None:
+            return None
+        return self.book.choose(board)
+
+    def __play(self, board, best_move, from_book=False):
+        """
+        Plays a search result or book move on the board.
+
+        Args:
+            board (ChessBoard): The board to move on.
+            best_move (Move): The move found, or None.
+            from_book (bool): True if the move came from the opening book
+                              rather than a search.
+
+        Returns:
+            bool: True if a move was made, False otherwise.
+        """
+        if from_book:
+            self.logger.info("Book move %s", best_move)
+            # No search ran, so there is no expected reply to ponder on
+            self.__predicted_reply = None
+        else:
+            self.logger.info("Searched %d nodes to depth %d",
+                             self.search.nodes, self.search.completed_depth)
+            # The search's board still holds the position before the move
+            line = self.algorithm.principal_variation(2)
+            self.__predicted_reply = line[1] \
+                if len(line) == 2 and line[0] == best_move else None
         if best_move:
-            from_pos = (best_move[0], best_move[1])
-            to_pos = (best_move[2], best_move[3])
-            # Now use from_pos and to_pos to make the move on the board
-            board.move_piece(from_pos, to_pos)  # Assuming this method exists on the board
+            # Now use the move record to make the move on the board
+            board.move_piece(best_move.from_position, best_move.to_position,
+                             best_move.promotion or "Queen")
             return True  # Indicate that a move was made
         return False  # Indicate that no move was made
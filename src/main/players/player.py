@@ -1,11 +1,12 @@
 from abc import ABC, abstractmethod
-import logging
-from game_logger import setup_logging
+from game_logger import setup_logging, ClassLogger
 
 setup_logging()
 
 
 class Player(ABC):
+    logger = ClassLogger()
+
     def __init__(self, colour):
         self.__colour = colour
         self.__taken_pieces = []
@@ -13,8 +14,7 @@ class Player(ABC):
         self.__chosen_square = None
         self.__last_move = None
         self.__all_moves = []
-        self.logger = logging.getLogger(self.__class__.__name__)
-        self.logger.info(f"Player {colour} created")
+        self.logger.info("Player %s created", colour)
 
     @property
     def colour(self):
@@ -59,7 +59,7 @@ class Player(ABC):
 
     @abstractmethod
     def make_move(self, board: list):
-        self.logger.info(f"Player {self.__colour} made a move")
+        self.logger.info("Player %s made a move", self.__colour)
     
     def move_piece(self, from_pos, to_pos):
         """
@@ -74,13 +74,14 @@ class Player(ABC):
         if piece and to_pos in piece:
             # Move the piece on the board
             self.__board.move_piece(*from_pos, *to_pos)
-            self.logger.info(f"Moved {piece} from {from_pos} to {to_pos}")
+            self.logger.info("Moved %s from %s to %s", piece, from_pos, to_pos)
             
             # Reset selected piece and possible moves
             self.selected_piece = None
             self.possible_moves = []
         else:
-            self.logger.warning(f"Invalid move attempted from {from_pos} to {to_pos}")
+            self.logger.warning("Invalid move attempted from %s to %s",
+                                from_pos, to_pos)
 
     def take_piece(self, piece):
         self.__taken_pieces.append(piece)
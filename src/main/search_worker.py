@@ -0,0 +1,156 @@
+"""
+Background searches, so that the game window keeps handling events while
+the AI thinks.
+
+The search runs on a worker thread against a copy of the position, made
+through the packed position format, so the game board is never changed
+under the user interface. The result comes back through a queue that the
+event loop polls once per frame.
+"""
+import queue
+import threading
+import time
+from ai import AI
+from board import ChessBoard
+from game_logger import ClassLogger
+
+
+class SearchWorker:
+    """
+    Runs one search at a time on a background thread.
+
+    Attributes:
+        search: The object that searches, an AI or one of the parallel
+                searches; anything with AI's search method.
+        ai (AI): The AI the search runs on. Its board is replaced by the
+                 copy of each position searched, and its node and depth
+                 counters are read for progress reports.
+        results (queue.Queue): The (score, best move) of each finished
+                               search.
+    """
+
+    logger = ClassLogger()
+
+    def __init__(self, search, ai: AI):
+        """
+        Initializes an idle worker.
+
+        Args:
+            search: The object that searches.
+            ai (AI): The AI the search runs on.
+        """
+        self.search = search
+        self.ai = ai
+        self.results = queue.Queue()
+        self.__thread = None
+        self.__stop_event = threading.Event()
+        self.__started = None
+
+    @property
+    def is_running(self) -> bool:
+        """
+        Checks whether a search is still running.
+        """
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def start(self, chess_board: ChessBoard, max_depth: int,
+              is_maximizing_player: bool, time_limit: float = None,
+              node_limit: int = None, on_finish=None) -> None:
+        """
+        Starts searching a copy of a position and returns at once.
+
+        Args:
+            chess_board (ChessBoard): The position to search.
+            max_depth (int): The deepest iteration to run.
+            is_maximizing_player (bool): True if the side to move is the
+                                         maximizing player, False otherwise.
+            time_limit (float): The wall-clock budget in seconds, or None.
+            node_limit (int): The node budget, or None.
+            on_finish: Called on the worker thread with the (score, best
+                       move) of the search instead of queueing it, for
+                       callers that cannot poll, or None to queue it.
+
+        Raises:
+            RuntimeError: If a search is already running.
+        """
+        if self.is_running:
+            raise RuntimeError("A search is already running")
+        self.ai.chess_board = ChessBoard.from_bytes(chess_board.to_bytes())
+        # A new event for every search, so stopping one cannot reach the
+        # next or a blocking search on the same AI
+        self.__stop_event = threading.Event()
+        self.ai.stop_event = self.__stop_event
+        self.ai.nodes = 0
+        self.ai.completed_depth = 0
+        self.__started = time.monotonic()
+        self.__thread = threading.Thread(
+            target=self.__run, name="SearchWorker", daemon=True,
+            args=(max_depth, is_maximizing_player, time_limit, node_limit,
+                  on_finish))
+        self.__thread.start()
+
+    def __run(self, max_depth: int, is_maximizing_player: bool,
+              time_limit: float, node_limit: int, on_finish) -> None:
+        """
+        Runs the search on the worker thread and queues or hands over its
+        result. A failed search gives (None, None) so that the caller is
+        never left waiting. The AI's stop event is taken away again before
+        the result is handed over.
+        """
+        try:
+            result = self.search.search(max_depth, is_maximizing_player,
+                                        time_limit=time_limit,
+                                        node_limit=node_limit)
+        except Exception:
+            self.logger.exception("Background search failed")
+            result = (None, None)
+        finally:
+            self.ai.stop_event = None
+        if on_finish is not None:
+            on_finish(result)
+        else:
+            self.results.put(result)
+
+    def poll(self):
+        """
+        Gets the result of the finished search without waiting.
+
+        Returns:
+            tuple: The (score, best move) of the search, or None if no
+                   result is ready yet.
+        """
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def stop(self) -> None:
+        """
+        Asks the running search to finish. As with any budget, the search
+        stops once its first iteration is complete and still queues the
+        best move found so far.
+        """
+        self.__stop_event.set()
+
+    def cancel(self) -> None:
+        """
+        Stops the running search, waits for it to finish and throws its
+        result away. The transposition table keeps what the search stored.
+        """
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join()
+        while self.poll() is not None:
+            pass
+
+    def progress(self) -> tuple:
+        """
+        Gets the progress of the running or last search.
+
+        Returns:
+            tuple: The deepest completed iteration, the nodes searched by
+                   the AI so far and the seconds since the search started.
+        """
+        elapsed = 0.0 if self.__started is None \
+            else time.monotonic() - self.__started
+        return self.ai.completed_depth, self.ai.nodes, elapsed
@@ -0,0 +1,419 @@
+"""
+Headless self-play tournament between two AIPlayer configurations.
+
+Games run in parallel over a process pool, one game per process at a time,
+without pygame. Every opening is played twice with the colours swapped, so
+that neither engine profits from a lopsided opening. Each result is written
+to disk as soon as its game finishes, as one JSON line in the results file
+and, if asked for, as a game in a PGN file. At the end the score is reported
+as an Elo difference with a 95% error margin, with the games played per hour
+and the average nodes per second of the searches.
+
+An engine is given as comma-separated key=value pairs: name, the AIPlayer
+options depth, time_limit, node_limit, workers and parallel, hash (the
+transposition table size in MB), book (an opening book file) and piece values
+such as Queen=9 that replace the AI's material weights.
+
+Usage:
+    python src/main/tournament.py --engine depth=3 --engine depth=2 \\
+        --games 20 --results results.jsonl --pgn games.pgn
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ai import AI
+from board import ChessBoard, ONGOING
+from game_logger import ClassLogger, set_performance_mode
+from opening_book import OpeningBook
+from pgn import PGNGame
+from players import AIPlayer
+
+# Short, balanced openings, all with White to move after two moves each
+OPENINGS = [
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "rnbqkbnr/pp2pppp/3p4/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 0 3",
+    "rnbqkbnr/ppp2ppp/4p3/3p4/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3",
+    "rnbqkb1r/pppppp1p/5np1/8/2PP4/8/PP2PPPP/RNBQKBNR w KQkq - 0 3",
+    "rnbqkbnr/ppp2ppp/4p3/3p4/3PP3/8/PPP2PPP/RNBQKBNR w KQkq d6 0 3",
+    "rnbqkbnr/pp2pppp/2p5/3p4/3PP3/8/PPP2PPP/RNBQKBNR w KQkq d6 0 3",
+    "rnbqkb1r/pppp1ppp/5n2/4p3/2P5/2N5/PP1PPPPP/R1BQKBNR w KQkq - 2 3",
+    "rnbqkb1r/ppp1pppp/5n2/3p4/8/5NP1/PPPPPP1P/RNBQKB1R w KQkq - 1 3",
+]
+# Games still going after this many plies are scored as draws
+MAX_PLIES = 300
+# Options of an engine that are passed on to AIPlayer, with their types
+PLAYER_OPTIONS = {"depth": int, "time_limit": float, "node_limit": int,
+                  "workers": int, "parallel": str}
+PIECE_NAMES = ("Pawn", "Knight", "Bishop", "Rook", "Queen")
+# Two-sided 95% confidence
+Z_95 = 1.96
+
+
+def parse_engine(spec: str) -> dict:
+    """
+    Reads an engine configuration such as "name=deep,depth=4,Queen=9".
+
+    Args:
+        spec (str): Comma-separated key=value pairs.
+
+    Returns:
+        dict: The configuration, with "name", "player" (AIPlayer keyword
+              arguments), "hash", "book" (the book file or None) and
+              "piece_score" (material weights to replace) keys.
+
+    Raises:
+        ValueError: If a key is unknown or a value has the wrong type.
+    """
+    config = {"name": spec, "player": {}, "hash": 16, "book": None,
+              "piece_score": {}}
+    for pair in filter(None, spec.split(",")):
+        key, _, value = pair.partition("=")
+        key = key.strip()
+        value = value.strip()
+        if key == "name":
+            config["name"] = value
+        elif key == "hash":
+            config["hash"] = float(value)
+        elif key == "book":
+            config["book"] = value
+        elif key in PLAYER_OPTIONS:
+            config["player"][key] = PLAYER_OPTIONS[key](value)
+        elif key in PIECE_NAMES:
+            config["piece_score"][key] = float(value)
+        else:
+            raise ValueError(f"Unknown engine option {key!r}")
+    return config
+
+
+def build_player(colour: str, config: dict) -> AIPlayer:
+    """
+    Creates the AIPlayer an engine configuration describes.
+
+    Args:
+        colour (str): The colour the player plays.
+        config (dict): The configuration made by parse_engine.
+
+    Returns:
+        AIPlayer: The player, with its own AI and transposition table.
+    """
+    algorithm = AI(ChessBoard(), hash_size_mb=config["hash"])
+    # Updated in place, as the move orderer shares the same dictionary
+    algorithm.piece_score.update(config["piece_score"])
+    # Each process maps the book itself; the pages are shared through the
+    # file cache
+    book = OpeningBook(config["book"]) if config["book"] else None
+    return AIPlayer(colour, algorithm, book=book, **config["player"])
+
+
+def play_game(index: int, white: dict, black: dict, fen: str,
+              max_plies: int = MAX_PLIES) -> dict:
+    """
+    Plays one game between two engines. Runs in a pool process.
+
+    Args:
+        index (int): The number of the game in the tournament.
+        white (dict): The configuration of the engine playing White.
+        black (dict): The configuration of the engine playing Black.
+        fen (str): The starting position.
+        max_plies (int): The number of plies after which the game is
+                         scored as a draw.
+
+    Returns:
+        dict: The game number, the engine names, the result, the number of
+              plies, the nodes searched and seconds spent searching by each
+              colour, and the game as PGN.
+    """
+    set_performance_mode(True)
+    chess_board = ChessBoard.from_fen(fen)
+    nodes = {"White": 0, "Black": 0}
+    search_time = {"White": 0.0, "Black": 0.0}
+    plies = 0
+    players = {}
+    try:
+        players["White"] = build_player("White", white)
+        players["Black"] = build_player("Black", black)
+        while chess_board.game_status == ONGOING and plies < max_plies:
+            colour = chess_board.side_to_move
+            player = players[colour]
+            # Book moves are not searched, so they do not count towards the
+            # speed
+            searched = player.book is None or \
+                not player.book.moves(chess_board)
+            started = time.perf_counter()
+            moved = player.make_move(chess_board)
+            if searched:
+                search_time[colour] += time.perf_counter() - started
+                nodes[colour] += player.search.nodes
+            if not moved:
+                break
+            plies += 1
+    finally:
+        # Parallel searches hold shared memory or a process pool
+        for player in players.values():
+            player.close()
+            if player.book is not None:
+                player.book.close()
+
+    game = PGNGame.from_board(chess_board, {
+        "Event": "Self-play tournament", "Date": time.strftime("%Y.%m.%d"),
+        "Round": str(index + 1), "White": white["name"],
+        "Black": black["name"]})
+    if game.result == "*":
+        game.result = "1/2-1/2"
+        game.headers["Termination"] = f"adjudicated after {plies} plies"
+    return {"game": index, "white": white["name"], "black": black["name"],
+            "result": game.result, "plies": plies, "nodes": nodes,
+            "search_time": search_time, "fen": fen, "pgn": game.to_pgn()}
+
+
+def elo_difference(wins: int, draws: int, losses: int) -> tuple:
+    """
+    Estimates the Elo difference a score implies, with the margin of its
+    95% confidence interval from the spread of the game results.
+
+    Args:
+        wins (int): Games won by the first engine.
+        draws (int): Games drawn.
+        losses (int): Games lost by the first engine.
+
+    Returns:
+        tuple: The Elo difference and its margin. A score of 0% or 100% has
+               an infinite difference. The margin is infinite with fewer
+               than two games, or when every game had the same result,
+               as the results then give no estimate of their spread.
+    """
+    games = wins + draws + losses
+    if not games:
+        return 0.0, math.inf
+    score = (wins + draws / 2) / games
+    deviation = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 +
+                 losses * score ** 2) / games
+    elo = _score_to_elo(score)
+    if games < 2 or math.isinf(elo) or deviation == 0:
+        return elo, math.inf
+    error = math.sqrt(deviation / games)
+    low = _score_to_elo(score - Z_95 * error)
+    high = _score_to_elo(score + Z_95 * error)
+    return elo, (high - low) / 2
+
+
+def _score_to_elo(score: float) -> float:
+    """
+    Converts an expected score to an Elo difference.
+    """
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    # Adding 0.0 turns -0.0 into 0.0 for an even score
+    return -400 * math.log10(1 / score - 1) + 0.0
+
+
+class Tournament:
+    """
+    Plays a match between two engines over a process pool.
+
+    Attributes:
+        engines (tuple): The configurations of the two engines.
+        openings (list): The starting positions, as FEN.
+        games (int): The number of games to play.
+        workers (int): The number of games played at once.
+        max_plies (int): The length at which a game is scored as a draw.
+        wins, draws, losses (int): The score of the first engine so far.
+        nodes (int): The nodes searched by both engines so far.
+        search_time (float): The seconds both engines spent searching.
+    """
+
+    logger = ClassLogger()
+
+    def __init__(self, first: dict, second: dict, games: int,
+                 openings: list = None, workers: int = None,
+                 max_plies: int = MAX_PLIES):
+        """
+        Initializes a match.
+
+        Args:
+            first (dict): The configuration of the first engine.
+            second (dict): The configuration of the second engine.
+            games (int): The number of games to play.
+            openings (list): The starting positions, or None for OPENINGS.
+            workers (int): The number of processes, or None for one per
+                           CPU.
+            max_plies (int): The length at which a game is scored as a draw.
+        """
+        self.engines = (first, second)
+        self.openings = openings or OPENINGS
+        self.games = games
+        self.workers = workers or os.cpu_count() or 1
+        self.max_plies = max_plies
+        self.wins = self.draws = self.losses = 0
+        self.nodes = 0
+        self.search_time = 0.0
+        self.__started = None
+
+    def schedule(self):
+        """
+        Lists the games to play. Game 2k and 2k+1 share an opening with the
+        colours swapped, and the openings repeat once they run out.
+
+        Yields:
+            tuple: The game number, White's and Black's configurations and
+                   the starting position.
+        """
+        first, second = self.engines
+        for index in range(self.games):
+            fen = self.openings[(index // 2) % len(self.openings)]
+            if index % 2:
+                yield index, second, first, fen
+            else:
+                yield index, first, second, fen
+
+    def run(self, results_path: str, pgn_path: str = None,
+            on_result=None) -> None:
+        """
+        Plays every game, appending each result to the results file (and
+        each game to the PGN file) as soon as it finishes.
+
+        Args:
+            results_path (str): The JSON lines file for the results.
+            pgn_path (str): The PGN file for the games, or None.
+            on_result: Called with each game record once it is counted, or
+                       None.
+        """
+        self.__started = time.monotonic()
+        pgn_file = open(pgn_path, "a", encoding="utf-8") \
+            if pgn_path is not None else None
+        try:
+            with open(results_path, "a", encoding="utf-8") as results, \
+                    ProcessPoolExecutor(self.workers) as pool:
+                futures = [pool.submit(play_game, *game, self.max_plies)
+                           for game in self.schedule()]
+                for future in as_completed(futures):
+                    record = future.result()
+                    pgn = record.pop("pgn")
+                    results.write(json.dumps(record) + "\n")
+                    results.flush()
+                    if pgn_file is not None:
+                        pgn_file.write(pgn + "\n")
+                        pgn_file.flush()
+                    self.add_result(record)
+                    self.logger.info("Game %d: %s - %s %s (%d plies)",
+                                     record["game"] + 1, record["white"],
+                                     record["black"], record["result"],
+                                     record["plies"])
+                    if on_result is not None:
+                        on_result(record)
+        finally:
+            if pgn_file is not None:
+                pgn_file.close()
+
+    def add_result(self, record: dict) -> None:
+        """
+        Counts a finished game towards the score of the first engine and
+        the speed figures.
+
+        Args:
+            record (dict): The game record made by play_game.
+        """
+        first_is_white = record["white"] == self.engines[0]["name"]
+        if record["result"] == "1/2-1/2":
+            self.draws += 1
+        elif (record["result"] == "1-0") == first_is_white:
+            self.wins += 1
+        else:
+            self.losses += 1
+        self.nodes += sum(record["nodes"].values())
+        self.search_time += sum(record["search_time"].values())
+
+    def report(self) -> str:
+        """
+        Summarises the match so far.
+
+        Returns:
+            str: The score, Elo difference, games per hour and nodes per
+                 second.
+        """
+        played = self.wins + self.draws + self.losses
+        elo, margin = elo_difference(self.wins, self.draws, self.losses)
+        elapsed = time.monotonic() - self.__started if self.__started \
+            else 0.0
+        games_per_hour = played * 3600 / elapsed if elapsed else 0.0
+        nps = self.nodes / self.search_time if self.search_time else 0.0
+        first, second = (engine["name"] for engine in self.engines)
+        return (f"{first} vs {second}: +{self.wins} ={self.draws} "
+                f"-{self.losses} ({played} games)\n"
+                f"Elo difference: {elo:+.1f} +/- {margin:.1f} (95%)\n"
+                f"{games_per_hour:.1f} games/hour, {nps:.0f} nodes/s "
+                f"average over {self.workers} workers")
+
+
+def read_openings(path: str) -> list:
+    """
+    Reads starting positions from a file of FEN or EPD lines. Blank lines
+    and lines starting with "#" are skipped.
+
+    Args:
+        path (str): The file to read.
+
+    Returns:
+        list: The positions, as FEN.
+
+    Raises:
+        ValueError: If a line is not a valid position.
+    """
+    openings = []
+    with open(path, encoding="utf-8") as stream:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                # Only the four position fields and the clocks are kept
+                fen = " ".join(line.split()[:6])
+                ChessBoard.from_fen(fen)
+                openings.append(fen)
+    return openings
+
+
+def main() -> int:
+    """
+    Runs a tournament from the command line.
+
+    Returns:
+        int: 0 once the tournament has finished.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--engine", action="append", required=True,
+                        help="engine options, given twice")
+    parser.add_argument("--games", type=int, default=2 * len(OPENINGS),
+                        help="number of games (default: two per opening)")
+    parser.add_argument("--workers", type=int,
+                        help="games played at once (default: one per CPU)")
+    parser.add_argument("--openings", help="file of FEN starting positions")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES,
+                        help="plies after which a game is drawn")
+    parser.add_argument("--results", default="results.jsonl",
+                        help="JSON lines file for the results")
+    parser.add_argument("--pgn", help="PGN file for the games")
+    args = parser.parse_args()
+    if len(args.engine) != 2:
+        parser.error("--engine must be given exactly twice")
+
+    set_performance_mode(True)
+    first, second = (parse_engine(spec) for spec in args.engine)
+    if first["name"] == second["name"]:
+        first["name"] += " (1)"
+        second["name"] += " (2)"
+    openings = read_openings(args.openings) if args.openings else None
+    tournament = Tournament(first, second, args.games, openings,
+                            args.workers, args.max_plies)
+    tournament.run(args.results, args.pgn, on_result=lambda record: print(
+        f"Game {record['game'] + 1}: {record['white']} - {record['black']} "
+        f"{record['result']}", flush=True))
+    print(tournament.report())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
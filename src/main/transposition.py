@@ -0,0 +1,178 @@
+"""
+Fixed-size transposition table for the minimax search.
+
+Entries live in a flat array of unsigned 64-bit integers instead of a dict of
+tuples, so the memory used is fixed up front and never grows during a search.
+The array can also be laid over an existing buffer, such as a block of
+shared memory, so that several processes search with one table.
+"""
+from array import array
+from pieces import Move
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+SCORE_OFFSET = 1 << 31
+# Searches are numbered modulo GENERATIONS in the top two bits of an entry
+GENERATIONS = 4
+
+
+class TranspositionTable:
+    """
+    A hash table of search results keyed by Zobrist key.
+
+    The table is split into buckets of two entries. The first entry keeps the
+    deepest search seen for the bucket and is only replaced by an equal or
+    deeper one, or by any entry once it is left over from an earlier search;
+    the second entry is replaced on every store that does not go into the
+    first. Each entry takes two array slots: the full key and a packed data
+    word holding the score (bits 0-31), depth (bits 32-39), bound type (bits
+    40-41), encoded best move (bits 42-61) and the generation of the search
+    that stored it (bits 62-63). An entry found by a later search is moved
+    into that search's generation, so a deep entry stays as long as it is
+    still used.
+
+    The key slot actually holds ``key ^ data``. When processes share the
+    table, two of them may write the same entry at once and leave the key of
+    one with the data of the other; such a torn entry no longer matches its
+    key and is simply treated as missing, so no locking is needed.
+    """
+
+    ENTRY_SLOTS = 2
+    BUCKET_ENTRIES = 2
+    BUCKET_BYTES = ENTRY_SLOTS * BUCKET_ENTRIES * 8
+
+    def __init__(self, size_mb: float = 16, buffer=None,
+                 generation: int = 0):
+        """
+        Initializes an empty table, or a table over an existing buffer.
+
+        Args:
+            size_mb (float): The memory budget of the table in megabytes.
+            buffer: A writable buffer of at least size_bytes(size_mb) bytes
+                    to keep the entries in, e.g. SharedMemory.buf. Its
+                    contents are used as they are, so a buffer another
+                    table has filled shares that table's entries.
+            generation (int): The generation to start from. Tables sharing
+                              a buffer must be in the same generation.
+        """
+        nbytes = self.size_bytes(size_mb)
+        self.__mask = nbytes // self.BUCKET_BYTES - 1
+        self.__generation = generation % GENERATIONS
+        if buffer is None:
+            self.__table = array("Q", bytes(nbytes))
+        else:
+            self.__table = memoryview(buffer)[:nbytes].cast("Q")
+
+    @classmethod
+    def size_bytes(cls, size_mb: float) -> int:
+        """
+        Gets the number of bytes a table with a given budget uses.
+
+        Args:
+            size_mb (float): The memory budget of the table in megabytes.
+
+        Returns:
+            int: The size of the entries in bytes.
+        """
+        buckets = max(int(size_mb * 1024 * 1024) // cls.BUCKET_BYTES, 1)
+        # A power-of-two bucket count lets a key be mapped with a bit mask
+        return (1 << (buckets.bit_length() - 1)) * cls.BUCKET_BYTES
+
+    @property
+    def size_mb(self) -> float:
+        """
+        Gets the memory used by the entries in megabytes.
+        """
+        return len(self.__table) * 8 / (1024 * 1024)
+
+    @property
+    def generation(self) -> int:
+        """
+        Gets the generation stored with new entries.
+        """
+        return self.__generation
+
+    def new_search(self) -> None:
+        """
+        Starts a new generation, so that entries the searches so far stored
+        in the depth-preferred slot no longer hold on to it.
+        """
+        self.__generation = (self.__generation + 1) % GENERATIONS
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the table. The entries are zeroed in place
+        so that a shared buffer is cleared for every process using it.
+        """
+        memoryview(self.__table).cast("B")[:] = bytes(len(self.__table) * 8)
+
+    def probe(self, key: int):
+        """
+        Looks up the entry stored for a position. An entry stored by an
+        earlier search is moved into the current generation.
+
+        Args:
+            key (int): The Zobrist key of the position.
+
+        Returns:
+            tuple: A (depth, score, bound, best move) tuple, or None if the
+                   position is not in the table. The best move is None when
+                   no move was stored.
+        """
+        table = self.__table
+        index = (key & self.__mask) * 4
+        for slot in (index, index + 2):
+            data = table[slot + 1]
+            if table[slot] ^ data == key:
+                if data >> 62 != self.__generation:
+                    data = data & ~(3 << 62) | self.__generation << 62
+                    table[slot] = key ^ data
+                    table[slot + 1] = data
+                move = data >> 42 & 0xFFFFF
+                return (data >> 32 & 0xFF, (data & 0xFFFFFFFF) - SCORE_OFFSET,
+                        data >> 40 & 3, Move.decode(move) if move else None)
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int,
+              best_move: Move = None) -> None:
+        """
+        Stores a search result in the current generation, following the
+        bucket replacement policy.
+
+        Args:
+            key (int): The Zobrist key of the position.
+            depth (int): The depth the position was searched to.
+            score (int): The score found by the search, rounded to an
+                         integer if it is not one.
+            bound (int): EXACT, LOWER_BOUND or UPPER_BOUND.
+            best_move (Move): The best move found, if any.
+        """
+        table = self.__table
+        index = (key & self.__mask) * 4
+        data = (round(score) + SCORE_OFFSET) | depth << 32 | bound << 40 | \
+            (best_move.encode() if best_move else 0) << 42 | \
+            self.__generation << 62
+        first_data = table[index + 1]
+        if table[index] ^ first_data == key or \
+                depth >= (first_data >> 32 & 0xFF) or \
+                first_data >> 62 != self.__generation:
+            table[index] = key ^ data
+            table[index + 1] = data
+        else:
+            table[index + 2] = key ^ data
+            table[index + 3] = data
+
+    def usage(self) -> float:
+        """
+        Gets the fraction of the first 1000 buckets that hold an entry.
+
+        Returns:
+            float: The fill rate, between 0 and 1.
+        """
+        table = self.__table
+        sample = min(len(table) // 4, 1000)
+        used = sum(1 for index in range(0, sample * 4, 4)
+                   if table[index + 1])
+        return used / sample
@@ -0,0 +1,408 @@
+"""
+Headless UCI (Universal Chess Interface) front end for the engine.
+
+Reads UCI commands from stdin and writes replies to stdout, so the engine can
+be run by tournament managers and benchmark harnesses without pygame or a
+window. Searches run on a background thread, so "stop" and "isready" are
+answered while the engine thinks, and each completed iteration is reported
+with an "info" line giving the depth, score, nodes, nps and principal
+variation.
+
+Supported commands: uci, isready, ucinewgame, setoption (Hash, Threads),
+position startpos | fen <fen> [moves ...], go [depth | movetime | wtime |
+btime | winc | binc | movestogo | nodes | infinite | ponder], ponderhit,
+stop and quit.
+
+Usage:
+    python src/main/uci.py
+"""
+import sys
+import threading
+import time
+from ai import AI
+from board import ChessBoard, square_name
+from game_logger import set_performance_mode
+from parallel_search import ParallelSearch
+from search_worker import SearchWorker
+
+ENGINE_NAME = "ChessAI"
+ENGINE_AUTHOR = "ChessAI developers"
+PROMOTION_LETTERS = {"Queen": "q", "Rook": "r", "Bishop": "b", "Knight": "n"}
+# Deepest iteration of a search that is only limited by time or "stop"
+MAX_DEPTH = 64
+# Moves left to plan the clock for when the GUI does not say
+DEFAULT_MOVES_TO_GO = 30
+# Seconds kept back from every move for the GUI and the interpreter
+MOVE_OVERHEAD = 0.05
+# Scores this close to AI.MATE_SCORE are reported as mates
+MATE_RANGE = 1000
+
+
+def move_to_uci(move) -> str:
+    """
+    Writes a move in UCI coordinate notation, e.g. "e2e4" or "e7e8q".
+
+    Args:
+        move (Move): The move.
+
+    Returns:
+        str: The move in coordinate notation.
+    """
+    text = square_name(move.from_position) + square_name(move.to_position)
+    if move.promotion is not None:
+        text += PROMOTION_LETTERS[move.promotion]
+    return text
+
+
+def parse_move(chess_board: ChessBoard, text: str):
+    """
+    Finds the legal move of the side to move written in coordinate notation.
+
+    Args:
+        chess_board (ChessBoard): The position the move is played in.
+        text (str): The move, e.g. "e2e4" or "e7e8q".
+
+    Returns:
+        Move: The matching legal move.
+
+    Raises:
+        ValueError: If the text is not a legal move in the position.
+    """
+    text = text.strip().lower()
+    for move in chess_board.legal_moves():
+        if move_to_uci(move) == text:
+            return move
+    raise ValueError(f"Illegal move {text!r}")
+
+
+class UCIEngine:
+    """
+    Answers UCI commands for one engine instance.
+
+    Attributes:
+        chess_board (ChessBoard): The position set by the last "position".
+        ai (AI): The AI that searches.
+        worker (SearchWorker): Runs the searches in the background.
+    """
+
+    def __init__(self, output=None):
+        """
+        Initializes the engine with the starting position.
+
+        Args:
+            output: The text stream replies are written to. Defaults to
+                    sys.stdout.
+        """
+        self.__output = output or sys.stdout
+        self.__output_lock = threading.Lock()
+        self.__hash_size_mb = 16
+        self.__threads = 1
+        self.__parallel = None
+        self.__pondering = False
+        self.__ponder_budget = (None, None)
+        self.__started = time.monotonic()
+        self.chess_board = ChessBoard()
+        self.ai = None
+        self.worker = None
+        self.__new_ai()
+
+    def __new_ai(self) -> None:
+        """
+        Creates the AI, and the parallel search if several threads were
+        asked for, with the current options.
+        """
+        if self.__parallel is not None:
+            self.__parallel.close()
+            self.__parallel = None
+        self.ai = AI(self.chess_board, self.__hash_size_mb)
+        self.ai.on_iteration = self.__report_iteration
+        search = self.ai
+        if self.__threads > 1:
+            self.__parallel = search = ParallelSearch(self.ai, self.__threads)
+        self.worker = SearchWorker(search, self.ai)
+
+    def send(self, line: str) -> None:
+        """
+        Writes one reply line. Replies come from both the command thread and
+        the search thread, so writes are serialised.
+
+        Args:
+            line (str): The line to write, without a newline.
+        """
+        with self.__output_lock:
+            self.__output.write(line + "\n")
+            self.__output.flush()
+
+    def run(self, stream=None) -> None:
+        """
+        Reads and answers commands until "quit" or the end of the input.
+
+        Args:
+            stream: The text stream commands are read from. Defaults to
+                    sys.stdin.
+        """
+        for line in stream or sys.stdin:
+            if not self.handle(line):
+                break
+        self.__stop_search()
+        if self.__parallel is not None:
+            self.__parallel.close()
+
+    def handle(self, line: str) -> bool:
+        """
+        Answers one command. Unknown commands are ignored, as the protocol
+        asks.
+
+        Args:
+            line (str): The command line.
+
+        Returns:
+            bool: False if the command was "quit", True otherwise.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == "quit":
+            return False
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send("option name Hash type spin default 16 min 1 max 1024")
+            self.send("option name Threads type spin default 1 min 1 max 64")
+            self.send("option name Ponder type check default false")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.__stop_search()
+            self.ai.transposition_table.clear()
+        elif command == "setoption":
+            self.__set_option(arguments)
+        elif command == "position":
+            self.__stop_search()
+            try:
+                self.__set_position(arguments)
+            except ValueError as error:
+                self.send(f"info string {error}")
+        elif command == "go":
+            self.__go(arguments)
+        elif command == "ponderhit":
+            self.__ponder_hit()
+        elif command == "stop":
+            self.__pondering = False
+            self.worker.stop()
+        return True
+
+    def __set_option(self, arguments: list) -> None:
+        """
+        Handles "setoption name <name> value <value>".
+
+        Args:
+            arguments (list): The tokens after "setoption".
+        """
+        text = " ".join(arguments)
+        if not text.startswith("name ") or " value " not in text:
+            return
+        name, value = text[5:].split(" value ", 1)
+        name = name.strip().lower()
+        try:
+            if name == "hash":
+                self.__hash_size_mb = max(int(value), 1)
+            elif name == "threads":
+                self.__threads = max(int(value), 1)
+            else:
+                return
+        except ValueError:
+            self.send(f"info string Invalid value {value!r} for {name}")
+            return
+        self.__stop_search()
+        self.__new_ai()
+
+    def __set_position(self, arguments: list) -> None:
+        """
+        Handles "position startpos [moves <move> ...]" and
+        "position fen <fen> [moves <move> ...]".
+
+        Args:
+            arguments (list): The tokens after "position".
+
+        Raises:
+            ValueError: If the position or a move cannot be read.
+        """
+        if "moves" in arguments:
+            split = arguments.index("moves")
+            setup, moves = arguments[:split], arguments[split + 1:]
+        else:
+            setup, moves = arguments, []
+        if setup[:1] == ["startpos"]:
+            chess_board = ChessBoard()
+        elif setup[:1] == ["fen"]:
+            chess_board = ChessBoard.from_fen(" ".join(setup[1:]))
+        else:
+            raise ValueError(f"Unsupported position {' '.join(setup)!r}")
+        for text in moves:
+            chess_board.make_move(parse_move(chess_board, text))
+        self.chess_board = chess_board
+        self.ai.chess_board = chess_board
+
+    def __go(self, arguments: list) -> None:
+        """
+        Handles "go" by starting a background search with the limits given.
+
+        Args:
+            arguments (list): The tokens after "go".
+        """
+        self.__stop_search()
+        options = {}
+        flags = set()
+        index = 0
+        while index < len(arguments):
+            token = arguments[index]
+            if token in ("infinite", "ponder"):
+                flags.add(token)
+                index += 1
+                continue
+            if index + 1 < len(arguments):
+                try:
+                    options[token] = int(arguments[index + 1])
+                except ValueError:
+                    pass
+            index += 2
+
+        max_depth = options.get("depth", MAX_DEPTH)
+        node_limit = options.get("nodes")
+        time_limit = self.__time_for_move(options)
+        if "infinite" in flags:
+            time_limit = node_limit = None
+        self.__pondering = "ponder" in flags
+        if self.__pondering:
+            # The clock only starts on "ponderhit"
+            self.__ponder_budget = (time_limit, node_limit)
+            time_limit = node_limit = None
+
+        self.__started = time.monotonic()
+        self.worker.start(self.chess_board, max_depth,
+                          self.chess_board.side_to_move == "Black",
+                          time_limit=time_limit, node_limit=node_limit,
+                          on_finish=self.__report_best_move)
+
+    def __time_for_move(self, options: dict):
+        """
+        Works out the time budget of a move from the "go" options.
+
+        Args:
+            options (dict): The numeric "go" options, times in milliseconds.
+
+        Returns:
+            float: The budget in seconds, or None for no time limit.
+        """
+        if "movetime" in options:
+            return max(options["movetime"] / 1000 - MOVE_OVERHEAD, 0.001)
+        prefix = "w" if self.chess_board.side_to_move == "White" else "b"
+        remaining = options.get(f"{prefix}time")
+        if remaining is None:
+            return None
+        remaining /= 1000
+        increment = options.get(f"{prefix}inc", 0) / 1000
+        moves_to_go = options.get("movestogo", DEFAULT_MOVES_TO_GO)
+        budget = remaining / max(moves_to_go, 1) + increment * 0.75
+        # Never plan to spend more than half of what is left
+        return max(min(budget, remaining / 2) - MOVE_OVERHEAD, 0.001)
+
+    def __ponder_hit(self) -> None:
+        """
+        Handles "ponderhit": the ponder search becomes the normal search and
+        its budget starts counting now.
+        """
+        if not self.__pondering:
+            return
+        self.__pondering = False
+        self.worker.search.set_budget(*self.__ponder_budget)
+
+    def __stop_search(self) -> None:
+        """
+        Stops a running search and waits for its "bestmove" line.
+        """
+        self.__pondering = False
+        if self.worker.is_running:
+            self.worker.cancel()
+
+    def __report_iteration(self, depth: int, score, best_move) -> None:
+        """
+        Sends the "info" line of a completed iteration. Runs on the search
+        thread, between iterations, while the board is at the root.
+
+        Args:
+            depth (int): The depth of the iteration.
+            score: The score of the iteration, positive for Black.
+            best_move (Move): The best move of the iteration.
+        """
+        elapsed = max(time.monotonic() - self.__started, 1e-6)
+        nodes = self.ai.nodes
+        line = [move_to_uci(move)
+                for move in self.ai.principal_variation(depth)]
+        if not line and best_move is not None:
+            line = [move_to_uci(best_move)]
+        self.send(f"info depth {depth} score {self.__format_score(score)} "
+                  f"nodes {nodes} nps {int(nodes / elapsed)} "
+                  f"time {int(elapsed * 1000)} pv {' '.join(line)}".rstrip())
+
+    def __format_score(self, score) -> str:
+        """
+        Writes a score from the side to move's point of view, as UCI wants:
+        "cp <centipawns>" or "mate <moves>", negative when losing.
+
+        Args:
+            score: The score, positive for Black.
+
+        Returns:
+            str: The UCI score.
+        """
+        if score is None:
+            return "cp 0"
+        if self.ai.chess_board.side_to_move == "White":
+            score = -score
+        if abs(score) >= AI.MATE_SCORE - MATE_RANGE:
+            plies = AI.MATE_SCORE - abs(score)
+            moves = (plies + 1) // 2
+            return f"mate {moves if score > 0 else -moves}"
+        return f"cp {int(score)}"
+
+    def __report_best_move(self, result: tuple) -> None:
+        """
+        Sends the "bestmove" line once a search finishes. A ponder search
+        that runs out of work waits for "ponderhit" or "stop" first, as the
+        protocol forbids answering before then.
+
+        Args:
+            result (tuple): The (score, best move) of the search.
+        """
+        while self.__pondering:
+            time.sleep(0.01)
+        best_move = result[1]
+        if best_move is None:
+            # No legal move, or the search failed
+            self.send("bestmove 0000")
+            return
+        line = self.ai.principal_variation(2)
+        text = f"bestmove {move_to_uci(best_move)}"
+        if len(line) == 2 and line[0] == best_move:
+            text += f" ponder {move_to_uci(line[1])}"
+        self.send(text)
+
+
+def main() -> int:
+    """
+    Runs the engine on stdin and stdout.
+
+    Returns:
+        int: The exit status.
+    """
+    set_performance_mode(True)
+    UCIEngine().run()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
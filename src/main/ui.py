@@ -1,7 +1,6 @@
 import pygame
 from pieces import Piece
-from game_logger import setup_logging
-import logging
+from game_logger import setup_logging, ClassLogger
 
 setup_logging()
 
@@ -9,9 +8,24 @@ setup_logging()
 
 
 class UI:
+    """
+    Draws the board with pygame.
+
+    Piece images are scaled to the square size and converted to the display
+    format once, then reused. The UI remembers what each square shows (its
+    piece and highlight), so a redraw only paints the squares that changed
+    and only those areas of the screen are updated.
+    """
+    logger = ClassLogger()
 
     WHITE = (255, 242, 227)
     GREEN = (175, 183, 170)
+    HIGHLIGHT_COLOURS = {
+        "BLUE": (0, 0, 255),
+        "GREEN": (0, 255, 0),
+        "RED": (255, 0, 0),
+        "YELLOW": (255, 255, 0)
+    }
     IMAGES = {
         "WhitePawn": pygame.image.load("src/main/images/wP.png"),
         "BlackPawn": pygame.image.load("src/main/images/bP.png"),
@@ -32,29 +46,121 @@ class UI:
         self.HEIGHT = height
         self.SIZE = self.WIDTH // 8
         self.window = None
-        self.logger = logging.getLogger(self.__class__.__name__)
+        # Scaled, display-format piece images by (piece key, square size)
+        self.__sprites = {}
+        # What each square currently shows on screen, None if unknown
+        self.__drawn = [[None] * 8 for _ in range(8)]
+        # Highlight colour names by (row, col)
+        self.__highlights = {}
+        # Screen areas painted since the last update_display call
+        self.__dirty_rects = []
+        self.__caption = None
         self.setup_window()
 
     def setup_window(self):
         self.window = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
         pygame.display.set_caption("ChessAI")
+        self.__caption = "ChessAI"
+        self.invalidate()
+
+    def show_status(self, text):
+        """
+        Shows a short status, such as the AI's search progress, in the
+        window title. The title is only set when the text changes.
+
+        Args:
+            text (str): The status to show, or None to show the plain title.
+        """
+        caption = "ChessAI" if not text else f"ChessAI - {text}"
+        if caption != self.__caption:
+            pygame.display.set_caption(caption)
+            self.__caption = caption
+
+    def invalidate(self):
+        """
+        Forgets what is on screen so that the next display_board call paints
+        every square, e.g. after the window was covered or resized.
+        """
+        self.__drawn = [[None] * 8 for _ in range(8)]
+
+    def get_sprite(self, piece_key):
+        """
+        Gets the image of a piece scaled to the square size. Scaling and
+        conversion to the display format happen on first use only.
+
+        Args:
+            piece_key (str): The colour and class name, e.g. "WhiteQueen".
+
+        Returns:
+            pygame.Surface: The scaled image.
+        """
+        cache_key = (piece_key, self.SIZE)
+        sprite = self.__sprites.get(cache_key)
+        if sprite is None:
+            sprite = pygame.transform.smoothscale(
+                self.IMAGES[piece_key].convert_alpha(), (self.SIZE, self.SIZE))
+            self.__sprites[cache_key] = sprite
+        return sprite
 
     def display_board(self, board):
-        for i in range(8):
-            for j in range(8):
-                piece = board[j][i]
-                colour = self.WHITE if (i + j) % 2 == 0 else self.GREEN
-                # Draw the square
-                pygame.draw.rect(self.window, colour, (i * self.SIZE, j * self.SIZE, self.SIZE, self.SIZE))
-                if isinstance(piece, Piece):
-                    piece_key = f'{piece.colour}{type(piece).__name__}'
-                    image = self.IMAGES[piece_key]
-                    # Scale the image to fit the square size
-                    image = pygame.transform.scale(image, (self.SIZE, self.SIZE))
-                    # Calculate the position to center the image in the square
-                    image_pos = (i * self.SIZE + (self.SIZE - image.get_width()) // 2, 
-                                j * self.SIZE + (self.SIZE - image.get_height()) // 2)
-                    self.window.blit(image, image_pos)
+        """
+        Paints the squares whose piece or highlight changed since they were
+        last painted, and records their areas for update_display.
+
+        Args:
+            board (list): The 8x8 board state holding pieces and "-" strings.
+
+        Returns:
+            list: The rectangles painted by this call.
+        """
+        painted = []
+        for row in range(8):
+            for col in range(8):
+                piece = board[row][col]
+                piece_key = f'{piece.colour}{type(piece).__name__}' \
+                    if isinstance(piece, Piece) else None
+                content = (piece_key, self.__highlights.get((row, col)))
+                if self.__drawn[row][col] == content:
+                    continue
+                painted.append(self.__draw_square(row, col, *content))
+                self.__drawn[row][col] = content
+        self.__dirty_rects.extend(painted)
+        return painted
+
+    def __draw_square(self, row, col, piece_key, highlight):
+        """
+        Paints one square with its piece and highlight.
+
+        Args:
+            row (int): The row of the square.
+            col (int): The column of the square.
+            piece_key (str): The piece on the square, or None.
+            highlight (str): The highlight colour name, or None.
+
+        Returns:
+            pygame.Rect: The area painted.
+        """
+        rect = pygame.Rect(col * self.SIZE, row * self.SIZE, self.SIZE,
+                           self.SIZE)
+        colour = self.WHITE if (row + col) % 2 == 0 else self.GREEN
+        pygame.draw.rect(self.window, colour, rect)
+        if piece_key is not None:
+            self.window.blit(self.get_sprite(piece_key), rect.topleft)
+        if highlight is not None:
+            # Unknown colour names fall back to red
+            outline = self.HIGHLIGHT_COLOURS.get(
+                highlight, self.HIGHLIGHT_COLOURS["RED"])
+            pygame.draw.rect(self.window, outline, rect, 5)
+        return rect
+
+    def update_display(self):
+        """
+        Pushes the areas painted since the last call to the screen. Does
+        nothing when no square changed.
+        """
+        if self.__dirty_rects:
+            pygame.display.update(self.__dirty_rects)
+            self.__dirty_rects = []
 
     def get_square_from_mouse(self, pos):
         x, y = pos
@@ -64,23 +170,23 @@ class UI:
 
     def highlight_square(self, row, col, colour="YELLOW"):
         """
-        Highlights a square on the board.
+        Highlights a square on the board. The highlight is drawn by the next
+        display_board call and stays until clear_highlights is called.
 
         Args:
             row (int): The row of the square to highlight.
             col (int): The column of the square to highlight.
             colour (str): The colour to use for the highlight ("BLUE", "GREEN", "RED", or "YELLOW").
         """
-        self.logger.info(f"Highlighting square at {row, col}")
-        colour_map = {
-            "BLUE": (0, 0, 255),
-            "GREEN": (0, 255, 0),
-            "RED": (255, 0, 0),
-            "YELLOW": (255, 255, 0)
-        }
+        self.logger.info("Highlighting square at %s", (row, col))
+        self.__highlights[(row, col)] = colour
 
-        highlight_colour = colour_map.get(colour, "RED")  # Default to yellow if colour not found
-        pygame.draw.rect(self.window, highlight_colour, (col * self.SIZE, row * self.SIZE, self.SIZE, self.SIZE), 5)
+    def clear_highlights(self):
+        """
+        Removes every highlight. The squares are repainted by the next
+        display_board call.
+        """
+        self.__highlights.clear()
 
     def highlight_available_moves(self, available_moves):
         for move in available_moves:
@@ -0,0 +1,62 @@
+"""
+Zobrist hashing of chess positions.
+
+A position key is the XOR of one random 64-bit number per (piece, square)
+pair on the board, plus numbers for the side to move, the castling rights
+and the en passant column. Moving a piece only XORs a few numbers in and out,
+so ChessBoard keeps its key up to date incrementally.
+"""
+from __future__ import annotations
+import random
+from typing import TYPE_CHECKING
+from bitboard import PIECE_INDEX, iter_squares
+
+if TYPE_CHECKING:
+    from board import ChessBoard
+
+# A fixed seed keeps keys identical between runs and between processes
+_random = random.Random(20240301)
+
+PIECE_SQUARE_KEYS = tuple(tuple(_random.getrandbits(64) for _ in range(64))
+                          for _ in range(12))
+SIDE_KEY = _random.getrandbits(64)
+CASTLING_KEYS = tuple(_random.getrandbits(64) for _ in range(16))
+EN_PASSANT_KEYS = tuple(_random.getrandbits(64) for _ in range(8))
+
+
+def piece_key(colour: str, name: str, square: int) -> int:
+    """
+    Gets the key of a piece standing on a square.
+
+    Args:
+        colour (str): The colour of the piece.
+        name (str): The name of the piece.
+        square (int): The square index of the piece.
+
+    Returns:
+        int: The 64-bit key.
+    """
+    return PIECE_SQUARE_KEYS[PIECE_INDEX[(colour, name)]][square]
+
+
+def compute_key(chess_board: ChessBoard) -> int:
+    """
+    Computes the key of a position from scratch.
+
+    Args:
+        chess_board (ChessBoard): The position to hash.
+
+    Returns:
+        int: The 64-bit Zobrist key.
+    """
+    bitboards = chess_board.bitboards
+    key = 0
+    for (colour, name), index in PIECE_INDEX.items():
+        for square in iter_squares(bitboards.get_pieces(colour, name)):
+            key ^= PIECE_SQUARE_KEYS[index][square]
+    if chess_board.side_to_move == "Black":
+        key ^= SIDE_KEY
+    key ^= CASTLING_KEYS[chess_board.castling_rights]
+    if chess_board.en_passant_position is not None:
+        key ^= EN_PASSANT_KEYS[chess_board.en_passant_position[1]]
+    return key
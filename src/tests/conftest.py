@@ -0,0 +1,13 @@
+"""
+Test set-up. The game modules import each other by their flat names, as
+they do when run from src/main, so that directory is put on the path.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "main"))
+
+from game_logger import set_performance_mode  # noqa: E402
+
+# Per-piece and per-board INFO logging would only slow the tests down
+set_performance_mode(True)
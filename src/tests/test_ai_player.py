@@ -0,0 +1,72 @@
+"""
+AIPlayer background thinking and pondering in every search mode.
+"""
+import time
+import pytest
+from ai import AI
+from board import ChessBoard
+from players import AIPlayer
+
+TIME_LIMIT = 0.3
+# Time allowed on top of the budget for the first iteration, starting and
+# stopping processes and polling
+SLACK = 1.0
+MODES = {"single": {}, "smp": {"workers": 2, "parallel": "smp"},
+         "root": {"workers": 2, "parallel": "root"}}
+
+
+@pytest.fixture(params=sorted(MODES))
+def player(request):
+    player = AIPlayer("White", AI(ChessBoard()), depth=30,
+                      time_limit=TIME_LIMIT, ponder=True,
+                      **MODES[request.param])
+    yield player
+    player.close()
+
+
+def think(player, board) -> float:
+    """
+    Lets the player find and play its move, and returns how long it took.
+    """
+    started = time.monotonic()
+    player.start_thinking(board)
+    while player.poll_move(board) is None:
+        assert time.monotonic() - started < TIME_LIMIT + 5, "still thinking"
+        time.sleep(0.005)
+    return time.monotonic() - started
+
+
+def ponder(player, board):
+    """
+    Plays the player's first move and starts pondering on the reply it
+    expects.
+
+    Returns:
+        Move: The expected reply.
+    """
+    think(player, board)
+    # The search's board still holds the position before the move
+    line = player.algorithm.principal_variation(2)
+    assert len(line) == 2
+    assert player.start_pondering(board)
+    assert player.is_pondering
+    time.sleep(TIME_LIMIT)
+    return line[1]
+
+
+def test_ponder_hit_keeps_the_budget(player):
+    board = ChessBoard()
+    board.make_move(ponder(player, board))
+    assert think(player, board) < TIME_LIMIT + SLACK
+    assert not player.is_pondering and not player.is_thinking
+    assert len(board.move_history) == 3
+
+
+def test_ponder_miss_starts_a_new_search(player):
+    board = ChessBoard()
+    reply = ponder(player, board)
+    board.make_move(next(move for move in board.legal_moves()
+                         if move != reply))
+    assert think(player, board) < TIME_LIMIT + SLACK
+    assert not player.is_pondering
+    assert len(board.move_history) == 3
@@ -0,0 +1,108 @@
+"""
+ChessBoard position state: make/unmake, set_board and the game status.
+"""
+import pytest
+from board import ChessBoard, START_FEN, ONGOING, CHECKMATE, STALEMATE, \
+    DRAW
+from zobrist import compute_key
+from pgn import parse_san
+from pieces import MoveGenerator
+from pieces.move_generator import EN_PASSANT
+
+
+def play(chess_board, *sans):
+    for san in sans:
+        chess_board.make_move(parse_san(chess_board, san))
+    return chess_board
+
+
+def test_unmake_restores_the_position():
+    chess_board = ChessBoard()
+    play(chess_board, "e4", "d5", "exd5", "Qxd5", "Nc3")
+    for _ in range(5):
+        chess_board.unmake_move()
+    assert chess_board.to_fen() == START_FEN
+    assert chess_board.zobrist_key == ChessBoard().zobrist_key
+
+
+def test_set_board_resets_the_position_state():
+    chess_board = ChessBoard()
+    play(chess_board, "e4")
+    chess_board.legal_moves()
+    chess_board.set_board(ChessBoard().get_board())
+    assert chess_board.side_to_move == "White"
+    assert chess_board.en_passant_position is None
+    assert chess_board.move_history == []
+    assert chess_board.zobrist_key == compute_key(chess_board) == \
+        ChessBoard().zobrist_key
+    assert len(chess_board.legal_moves()) == 20
+
+
+def test_set_board_takes_the_side_to_move_and_clocks():
+    grid = ChessBoard().get_board()
+    chess_board = ChessBoard()
+    chess_board.set_board(grid, "Black", None, 3, 7)
+    assert chess_board.to_fen() == \
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR b KQkq - 3 7"
+    assert chess_board.zobrist_key == compute_key(chess_board)
+    assert {move.from_position[0] for move in chess_board.legal_moves()} \
+        <= {0, 1}
+
+
+def test_boards_compare_by_position_but_are_unhashable():
+    chess_board = ChessBoard()
+    other = ChessBoard()
+    assert chess_board == other
+    play(other, "Nf3", "Nf6", "Ng1", "Ng8")
+    assert chess_board == other
+    play(other, "e4")
+    assert chess_board != other
+    with pytest.raises(TypeError):
+        {chess_board}
+
+
+def test_game_status_follows_the_position():
+    chess_board = ChessBoard()
+    play(chess_board, "f3", "e5", "g4")
+    assert chess_board.game_status == ONGOING
+    play(chess_board, "Qh4#")
+    assert chess_board.game_status == CHECKMATE
+    chess_board.unmake_move()
+    assert chess_board.game_status == ONGOING
+    assert ChessBoard.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1"
+                               ).game_status == STALEMATE
+
+
+def test_game_status_follows_the_history():
+    # Both lines are eight plies long and end in the starting position,
+    # but only the first repeats it three times
+    repeated = ("Nf3", "Nf6", "Ng1", "Ng8") * 2
+    once = ("Nf3", "Nc6", "Ng1", "Nf6", "Nc3", "Nb8", "Nb1", "Ng8")
+    # Resolved beforehand, as parse_san would ask for the status on the way
+    lines = {sans: play(ChessBoard(), *sans).move_history
+             for sans in (repeated, once)}
+    chess_board = ChessBoard()
+    for first, second, statuses in ((repeated, once, (DRAW, ONGOING)),
+                                    (once, repeated, (ONGOING, DRAW))):
+        for line, status in zip((first, second), statuses):
+            for move in lines[line]:
+                chess_board.make_move(move)
+            assert chess_board.game_status == status
+            for _ in line:
+                chess_board.unmake_move()
+
+
+def test_only_the_en_passant_square_takes_a_pawn_in_passing():
+    chess_board = play(ChessBoard(), "e4", "Nf6", "e5", "d5")
+    capture = MoveGenerator.create_move(chess_board, (3, 4), (2, 3))
+    assert capture.flags == EN_PASSANT
+    assert capture in chess_board.legal_moves()
+
+    chess_board = play(ChessBoard(), "e4", "d5", "e5", "Nf6")
+    fen = chess_board.to_fen()
+    # d5 did not just move two squares, so e5-d6 is no capture at all
+    with pytest.raises(ValueError):
+        MoveGenerator.create_move(chess_board, (3, 4), (2, 3))
+    assert not chess_board.move_piece((3, 4), (2, 3))
+    assert chess_board.to_fen() == fen
+    assert chess_board.get_piece_at_position(3, 3).name == "Pawn"
@@ -0,0 +1,76 @@
+"""
+The running evaluation totals against a full recompute, through every kind
+of move and its take-back.
+"""
+import random
+import pytest
+from ai import AI
+from board import ChessBoard
+from evaluation import compute_piece_square_score
+from perft import PERFT_POSITIONS
+from pieces.move_generator import CAPTURE, CASTLING, EN_PASSANT, PROMOTION
+
+# Kiwipete and the promotion position have every kind of move within two
+# plies; the endgame has en passant captures
+FENS = [fen for name, fen, _ in PERFT_POSITIONS
+        if name in ("kiwipete", "promotions", "endgame")]
+
+
+def assert_totals_match(ai):
+    chess_board = ai.chess_board
+    assert chess_board.piece_square_score == \
+        compute_piece_square_score(chess_board.get_board())
+    assert ai.evaluate()[0] == ai.evaluate(full=True)[0]
+
+
+def walk(ai, depth, seen):
+    """
+    Plays out every line to the given depth, checking the totals after each
+    move and each take-back, and collects the flags of the moves played.
+    """
+    assert_totals_match(ai)
+    if depth == 0:
+        return
+    chess_board = ai.chess_board
+    for move in chess_board.legal_moves():
+        seen.add(move.flags & (CAPTURE | CASTLING | EN_PASSANT | PROMOTION))
+        before = chess_board.piece_square_score, ai.evaluate()[0]
+        chess_board.make_move(move)
+        walk(ai, depth - 1, seen)
+        chess_board.unmake_move()
+        assert (chess_board.piece_square_score, ai.evaluate()[0]) == before
+        assert_totals_match(ai)
+
+
+def test_every_kind_of_move_and_take_back():
+    seen = set()
+    for fen in FENS:
+        walk(AI(ChessBoard.from_fen(fen), 1), 2, seen)
+    for flag in (CAPTURE, CASTLING, EN_PASSANT):
+        assert any(flags & flag for flags in seen)
+    assert any(flags & PROMOTION and flags & CAPTURE for flags in seen)
+    assert any(flags & PROMOTION and not flags & CAPTURE for flags in seen)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_games(seed):
+    generator = random.Random(seed)
+    ai = AI(ChessBoard(), 1)
+    ai.piece_score["Queen"] = 9.5
+    chess_board = ai.chess_board
+    start = ai.evaluate()[0]
+    played = 0
+    for _ in range(120):
+        moves = chess_board.legal_moves()
+        if not moves:
+            break
+        # Captures and promotions are preferred so that material changes
+        forcing = [move for move in moves if move.flags & (CAPTURE |
+                                                           PROMOTION)]
+        chess_board.make_move(generator.choice(forcing or moves))
+        played += 1
+        assert_totals_match(ai)
+    for _ in range(played):
+        chess_board.unmake_move()
+        assert_totals_match(ai)
+    assert ai.evaluate()[0] == start
@@ -0,0 +1,77 @@
+"""
+FEN import and export on ChessBoard.
+"""
+import pytest
+from board import ChessBoard, START_FEN, WHITE_KINGSIDE, BLACK_QUEENSIDE
+from perft import PERFT_POSITIONS
+from pgn import parse_san
+
+
+@pytest.mark.parametrize("fen", [START_FEN] +
+                         [fen for _, fen, _ in PERFT_POSITIONS])
+def test_round_trip(fen):
+    assert ChessBoard.from_fen(fen).to_fen() == fen
+
+
+def test_start_position():
+    chess_board = ChessBoard.from_fen(START_FEN)
+    assert chess_board.zobrist_key == ChessBoard().zobrist_key
+    assert ChessBoard().to_fen() == START_FEN
+
+
+def test_matches_the_played_position():
+    chess_board = ChessBoard()
+    for san in ("e4", "c5", "Nf3", "d5"):
+        chess_board.make_move(parse_san(chess_board, san))
+    fen = chess_board.to_fen()
+    assert fen == \
+        "rnbqkbnr/pp2pppp/8/2pp4/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq d6 0 3"
+    loaded = ChessBoard.from_fen(fen)
+    assert loaded.zobrist_key == chess_board.zobrist_key
+    assert sorted(loaded.legal_moves()) == sorted(chess_board.legal_moves())
+
+
+def test_clocks_may_be_left_out():
+    chess_board = ChessBoard.from_fen("4k3/8/8/8/8/8/8/4K3 b - -")
+    assert chess_board.side_to_move == "Black"
+    assert (chess_board.halfmove_clock, chess_board.fullmove_number) == \
+        (0, 1)
+
+
+def test_castling_rights_without_their_rook_are_dropped():
+    chess_board = ChessBoard.from_fen("r3k3/8/8/8/8/8/8/4K2R w KQkq - 0 1")
+    assert chess_board.castling_rights == WHITE_KINGSIDE | BLACK_QUEENSIDE
+    assert chess_board.to_fen() == "r3k3/8/8/8/8/8/8/4K2R w Kq - 0 1"
+
+
+@pytest.mark.parametrize("fen", [
+    "",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1",
+    "rnbqkbnr/ppppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1",
+    "8/8/8/8/8/8/8/8 w - - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkqK - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e4 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - -1 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 x",
+])
+def test_invalid_fen_leaves_the_board_unchanged(fen):
+    chess_board = ChessBoard()
+    with pytest.raises(ValueError):
+        chess_board.load_fen(fen)
+    assert chess_board.to_fen() == START_FEN
+
+
+def test_from_fen_skips_the_starting_position(monkeypatch):
+    fen = "r3k2r/8/8/3pP3/8/8/8/R3K2R w KQkq d6 0 1"
+
+    def fail(self):
+        raise AssertionError("the starting position was set up")
+
+    monkeypatch.setattr(ChessBoard, "__init__", fail)
+    chess_board = ChessBoard.from_fen(fen)
+    assert chess_board.to_fen() == fen
+    assert parse_san(chess_board, "exd6").is_capture
+    with pytest.raises(ValueError):
+        ChessBoard.from_fen("8/8/8/8/8/8/8/8 w - - 0 1")
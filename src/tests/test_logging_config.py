@@ -0,0 +1,28 @@
+"""
+Performance mode silences the engine's loggers and nothing else.
+"""
+import logging
+
+from board import ChessBoard
+from game_logger import set_performance_mode, is_performance_mode
+
+
+def test_performance_mode_only_quietens_the_engine():
+    foreign = logging.getLogger("embedding_program")
+    foreign.setLevel(logging.INFO)
+    try:
+        set_performance_mode(True)
+        assert is_performance_mode()
+        assert ChessBoard.logger.name == "chess.ChessBoard"
+        assert not ChessBoard.logger.isEnabledFor(logging.INFO)
+        assert ChessBoard.logger.isEnabledFor(logging.WARNING)
+        assert foreign.isEnabledFor(logging.INFO)
+
+        set_performance_mode(False)
+        # Back to whatever level the root logger was configured with
+        assert ChessBoard.logger.getEffectiveLevel() == \
+            logging.getLogger().getEffectiveLevel()
+    finally:
+        foreign.setLevel(logging.NOTSET)
+        # The other tests run in performance mode
+        set_performance_mode(True)
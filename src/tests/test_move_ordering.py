@@ -0,0 +1,68 @@
+"""
+Move ordering: the hash move, MVV-LVA captures, killers and history.
+"""
+from ai import AI
+from board import ChessBoard
+from move_ordering import MoveOrderer
+from pgn import move_to_san, parse_san
+
+# The rook on d5 can be taken by a pawn, a knight and the queen, and the
+# pawn on b3 by the queen
+FEN = "3qk3/8/8/3r4/2P2N2/1p6/8/3QK3 w - - 0 1"
+
+
+def ordered(orderer, chess_board, ply=0, hash_move=None):
+    moves = orderer.order_moves(chess_board.legal_moves(), chess_board, ply,
+                                hash_move)
+    return [move_to_san(chess_board, move) for move in moves]
+
+
+def orderer():
+    return MoveOrderer(dict(AI(ChessBoard(), 1).piece_score))
+
+
+def test_captures_by_most_valuable_victim_then_least_valuable_attacker():
+    chess_board = ChessBoard.from_fen(FEN)
+    sans = ordered(orderer(), chess_board)
+    assert sans[:4] == ["cxd5", "Nxd5", "Qxd5", "Qxb3"]
+    assert not any("x" in san for san in sans[4:])
+
+
+def test_hash_move_comes_first():
+    chess_board = ChessBoard.from_fen(FEN)
+    hash_move = parse_san(chess_board, "Kf1")
+    assert ordered(orderer(), chess_board, hash_move=hash_move)[:2] == \
+        ["Kf1", "cxd5"]
+
+
+def test_killers_then_history_before_other_quiet_moves():
+    chess_board = ChessBoard.from_fen(FEN)
+    move_orderer = orderer()
+    # Nh5 refuted something deep at another ply, so only its history counts
+    move_orderer.record_cutoff(parse_san(chess_board, "Nh5"), "White", 6, 5)
+    move_orderer.record_cutoff(parse_san(chess_board, "Kf2"), "White", 1, 0)
+    move_orderer.record_cutoff(parse_san(chess_board, "Ne6"), "White", 1, 0)
+    sans = ordered(move_orderer, chess_board)
+    assert sans[4:7] == ["Ne6", "Kf2", "Nh5"]
+    # At another ply only the history scores are left, deepest first
+    sans = ordered(move_orderer, chess_board, ply=3)
+    assert sans[4] == "Nh5"
+    assert set(sans[5:7]) == {"Kf2", "Ne6"}
+
+
+def test_captures_do_not_become_killers():
+    chess_board = ChessBoard.from_fen(FEN)
+    move_orderer = orderer()
+    move_orderer.record_cutoff(parse_san(chess_board, "Qxb3"), "White", 4, 0)
+    assert move_orderer.killers[0] == [None, None]
+    assert not any(move_orderer.history["White"])
+
+
+def test_new_search_forgets_killers_and_ages_history():
+    chess_board = ChessBoard.from_fen(FEN)
+    move_orderer = orderer()
+    move_orderer.record_cutoff(parse_san(chess_board, "Kf2"), "White", 4, 0)
+    assert max(move_orderer.history["White"]) == 16
+    move_orderer.new_search()
+    assert move_orderer.killers[0] == [None, None]
+    assert max(move_orderer.history["White"]) == 8
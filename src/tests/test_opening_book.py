@@ -0,0 +1,105 @@
+"""
+Building opening books from PGN and looking moves up in them.
+"""
+import io
+import pytest
+from ai import AI
+from board import ChessBoard
+from opening_book import BOOK_MAGIC, ENTRY_SIZE, OpeningBook, build_book
+from pgn import parse_san, read_games
+from players import AIPlayer
+
+GAMES = """[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+
+[Result "1-0"]
+
+1. e4 c5 2. Nf3 1-0
+
+[Result "0-1"]
+
+1. d4 d5 0-1
+
+[Result "1/2-1/2"]
+
+1. e4 e5 2. Bc4 1/2-1/2
+"""
+
+
+def move(chess_board, san):
+    return parse_san(chess_board, san)
+
+
+@pytest.fixture
+def book_path(tmp_path):
+    path = str(tmp_path / "book.bin")
+    build_book(read_games(io.StringIO(GAMES)), path)
+    return path
+
+
+def test_file_layout(book_path):
+    with open(book_path, "rb") as stream:
+        data = stream.read()
+    assert data.startswith(BOOK_MAGIC)
+    # Moves of the losing side have no weight, so d4, c5 and Nc6 are left
+    # out
+    assert (len(data) - len(BOOK_MAGIC)) // ENTRY_SIZE == 6
+    with OpeningBook(book_path) as book:
+        assert len(book) == 6
+
+
+def test_weights(book_path):
+    chess_board = ChessBoard()
+    with OpeningBook(book_path) as book:
+        # Two wins and a draw for e4, a loss for d4
+        assert book.moves(chess_board) == [(move(chess_board, "e4"), 5)]
+        chess_board.make_move(move(chess_board, "e4"))
+        # A draw for e5 and a loss each for e5 and c5
+        assert book.moves(chess_board) == [(move(chess_board, "e5"), 1)]
+        chess_board.make_move(move(chess_board, "e5"))
+        assert book.moves(chess_board) == [(move(chess_board, "Nf3"), 2),
+                                           (move(chess_board, "Bc4"), 1)]
+        assert book.choose(chess_board, randomise=False) == \
+            move(chess_board, "Nf3")
+
+
+def test_positions_out_of_book(book_path):
+    chess_board = ChessBoard()
+    chess_board.make_move(move(chess_board, "a3"))
+    with OpeningBook(book_path) as book:
+        assert book.entries(chess_board.zobrist_key) == []
+        assert book.moves(chess_board) == []
+        assert book.choose(chess_board) is None
+
+
+def test_weighted_choice_stays_in_book(book_path):
+    chess_board = ChessBoard()
+    for san in ("e4", "e5"):
+        chess_board.make_move(move(chess_board, san))
+    with OpeningBook(book_path, seed=1) as book:
+        choices = {book.choose(chess_board) for _ in range(50)}
+    assert choices == {move(chess_board, "Nf3"), move(chess_board, "Bc4")}
+
+
+def test_min_weight_and_plies(tmp_path):
+    path = str(tmp_path / "book.bin")
+    assert build_book(read_games(io.StringIO(GAMES)), path,
+                      max_plies=1, min_weight=3) == 1
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_book.bin"
+    path.write_bytes(b"PGN? no")
+    with pytest.raises(ValueError):
+        OpeningBook(str(path))
+
+
+def test_ai_player_plays_the_book_move(book_path):
+    chess_board = ChessBoard()
+    chess_board.make_move(move(chess_board, "e4"))
+    book_move = move(chess_board, "e5")
+    with OpeningBook(book_path, seed=1) as book, \
+            AIPlayer("Black", AI(chess_board), depth=1, book=book) as player:
+        assert player.make_move(chess_board)
+    assert chess_board.move_history[-1] == book_move
@@ -0,0 +1,67 @@
+"""
+The parallel searches against a single-process search of the same depth.
+"""
+import weakref
+import pytest
+from ai import AI
+from board import ChessBoard
+from parallel_search import ParallelSearch, RootSplitSearch
+from perft import PERFT_POSITIONS
+
+DEPTH = 3
+POSITIONS = [pytest.param(fen, id=name) for name, fen, _ in PERFT_POSITIONS]
+
+
+def single_process(fen: str) -> tuple:
+    chess_board = ChessBoard.from_fen(fen)
+    return AI(chess_board, 1).search(DEPTH,
+                                     chess_board.side_to_move == "Black")
+
+
+@pytest.mark.parametrize("fen", POSITIONS)
+def test_lazy_smp_matches_a_single_search(fen):
+    chess_board = ChessBoard.from_fen(fen)
+    ai = AI(chess_board, 1)
+    with ParallelSearch(ai, 3) as search:
+        score, move = search.search(DEPTH,
+                                    chess_board.side_to_move == "Black")
+        assert search.completed_depth == DEPTH
+        # The helpers' nodes are counted too
+        assert search.nodes > ai.nodes
+    assert score == single_process(fen)[0]
+    assert move in chess_board.legal_moves()
+    assert chess_board.to_fen() == fen
+
+
+@pytest.mark.parametrize("fen", POSITIONS)
+def test_root_split_matches_a_single_search(fen):
+    chess_board = ChessBoard.from_fen(fen)
+    with RootSplitSearch(AI(chess_board, 1), 3) as search:
+        result = search.search(DEPTH, chess_board.side_to_move == "Black")
+        assert search.completed_depth == DEPTH
+    # Ties go to the first move in root order, as in minimax
+    assert result == single_process(fen)
+    assert chess_board.to_fen() == fen
+
+
+def test_root_split_keeps_the_principal_variation():
+    chess_board = ChessBoard()
+    ai = AI(chess_board, 1)
+    with RootSplitSearch(ai, 2) as search:
+        _, move = search.search(DEPTH, False)
+    line = ai.principal_variation()
+    assert len(line) >= 2
+    assert line[0] == move
+
+
+def test_lazy_smp_table_goes_back_to_private_memory():
+    ai = AI(ChessBoard(), 1)
+    search = ParallelSearch(ai, 2)
+    # A strong reference would keep the shared buffer from being closed
+    shared = weakref.ref(ai.transposition_table)
+    search.search(2, False)
+    search.close()
+    assert ai.transposition_table is not shared()
+    # The private table still works and closing twice is harmless
+    ai.search(2, False)
+    search.close()
@@ -0,0 +1,37 @@
+"""
+Perft counts of well-known positions, which pin down move generation and
+make/unmake: any bug in either changes a count.
+"""
+import pytest
+from board import ChessBoard
+from perft import PERFT_POSITIONS, perft
+
+POSITIONS = {name: (fen, expected)
+             for name, fen, expected in PERFT_POSITIONS}
+
+
+@pytest.mark.parametrize("name, depth", [
+    ("start", 3),
+    ("kiwipete", 2),
+    # En passant captures, including one that would expose the king
+    ("endgame", 3),
+    # Promotions, including under-promotions and capture-promotions
+    ("promotions", 3),
+    ("discovered", 2),
+    ("middlegame", 2),
+])
+def test_perft_counts(name, depth):
+    fen, expected = POSITIONS[name]
+    chess_board = ChessBoard.from_fen(fen)
+    assert perft(chess_board, chess_board.side_to_move, depth) == \
+        expected[depth - 1]
+
+
+def test_perft_leaves_the_board_unchanged():
+    fen, _ = POSITIONS["kiwipete"]
+    chess_board = ChessBoard.from_fen(fen)
+    key = chess_board.zobrist_key
+    perft(chess_board, "White", 2)
+    assert chess_board.zobrist_key == key
+    assert chess_board.to_fen() == fen
+    assert chess_board.move_history == []
@@ -0,0 +1,109 @@
+"""
+SAN and PGN reading and writing.
+"""
+import io
+import pytest
+from board import ChessBoard
+from pgn import PGNGame, move_to_san, parse_san, read_games, write_game
+
+
+def sans(chess_board):
+    return sorted(move_to_san(chess_board, move)
+                  for move in chess_board.legal_moves())
+
+
+def test_san_round_trip_from_the_start():
+    chess_board = ChessBoard()
+    for move in chess_board.legal_moves():
+        assert parse_san(chess_board, move_to_san(chess_board, move)) == move
+    assert "Nf3" in sans(chess_board) and "e4" in sans(chess_board)
+
+
+def test_disambiguation():
+    chess_board = ChessBoard.from_fen("4k3/8/8/8/8/8/R6R/4K3 w - - 0 1")
+    assert {"Rad2", "Rhd2"} <= set(sans(chess_board))
+    chess_board = ChessBoard.from_fen("4k3/8/8/R7/8/8/8/R3K3 w - - 0 1")
+    assert {"R5a3", "R1a3"} <= set(sans(chess_board))
+    with pytest.raises(ValueError, match="Ambiguous"):
+        parse_san(chess_board, "Ra3")
+
+
+def test_promotion_and_check():
+    chess_board = ChessBoard.from_fen("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+    moves = sans(chess_board)
+    assert {"b8=Q+", "b8=R+", "b8=N", "b8=B"} <= set(moves)
+    move = parse_san(chess_board, "b8=N")
+    assert move.promotion == "Knight"
+
+
+def test_castling_and_mate():
+    chess_board = ChessBoard.from_fen(
+        "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    assert {"O-O", "O-O-O"} <= set(sans(chess_board))
+    assert parse_san(chess_board, "0-0") == parse_san(chess_board, "O-O")
+    chess_board = ChessBoard()
+    for san in ("f3", "e5", "g4"):
+        chess_board.make_move(parse_san(chess_board, san))
+    assert move_to_san(chess_board, parse_san(chess_board, "Qh4")) == "Qh4#"
+
+
+@pytest.mark.parametrize("san", ["Nf6", "e5", "Ke2", "xyz", "", "e9"])
+def test_parse_san_rejects(san):
+    with pytest.raises(ValueError):
+        parse_san(ChessBoard(), san)
+
+
+def test_read_games_skips_annotations():
+    text = """[Event "Test"]
+[White "A"]
+[Black "B"]
+[Result "1/2-1/2"]
+
+1. e4 {best by test} e5 (1... c5 2. Nf3) 2. Nf3 $1 Nc6 ; a comment
+3. Bc4 Bc5 4. 0-0 Nf6 1/2-1/2
+
+[Event "Second"]
+
+1. d4 {an unclosed
+comment} d5 *
+"""
+    games = list(read_games(io.StringIO(text)))
+    assert len(games) == 2
+    first, second = games
+    assert first.headers["Event"] == "Test"
+    assert first.result == "1/2-1/2"
+    assert first.moves == ["e4", "e5", "Nf3", "Nc6", "Bc4", "Bc5", "0-0",
+                           "Nf6"]
+    assert second.moves == ["d4", "d5"] and second.result == "*"
+    chess_board, _ = list(first.replay())[-1]
+    assert chess_board.side_to_move == "White"
+
+
+def test_round_trip_through_text():
+    chess_board = ChessBoard()
+    for san in ("e4", "e5", "Qh5", "Nc6", "Bc4", "Nf6", "Qxf7#"):
+        chess_board.make_move(parse_san(chess_board, san))
+    game = PGNGame.from_board(chess_board, {"White": "A", "Black": "B"})
+    assert game.result == "1-0"
+    assert game.moves[-1] == "Qxf7#"
+    assert "FEN" not in game.headers
+
+    stream = io.StringIO()
+    write_game(stream, game)
+    text = stream.getvalue()
+    assert text.startswith('[Event "?"]\n')
+    assert "1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0" in text
+
+    read, = read_games(io.StringIO(text))
+    assert read.moves == game.moves and read.result == "1-0"
+    replayed = [move for _, move in read.replay()]
+    assert replayed == chess_board.move_history
+
+
+def test_game_from_a_fen():
+    fen = "4k3/8/8/8/8/8/4P3/4K3 b - - 0 12"
+    chess_board = ChessBoard.from_fen(fen)
+    chess_board.make_move(parse_san(chess_board, "Kd7"))
+    game = PGNGame.from_board(chess_board)
+    assert game.headers["FEN"] == fen and game.headers["SetUp"] == "1"
+    assert "12... Kd7 *" in game.to_pgn()
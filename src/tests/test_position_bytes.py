@@ -0,0 +1,113 @@
+"""
+The packed binary position format that searches pass between threads and
+processes.
+"""
+import pytest
+from ai import AI
+from board import ChessBoard, POSITION_SIZE, WHITE_KINGSIDE, \
+    BLACK_KINGSIDE, BLACK_QUEENSIDE
+from pgn import parse_san
+from perft import perft
+
+
+def play(chess_board, *sans):
+    for san in sans:
+        chess_board.make_move(parse_san(chess_board, san))
+    return chess_board
+
+
+def assert_same_position(copy, chess_board):
+    assert copy.to_fen() == chess_board.to_fen()
+    assert copy.zobrist_key == chess_board.zobrist_key
+    assert copy.piece_square_score == chess_board.piece_square_score
+    assert copy.castling_rights == chess_board.castling_rights
+    assert sorted(copy.legal_moves()) == sorted(chess_board.legal_moves())
+    assert AI(copy, 1).evaluate()[0] == AI(chess_board, 1).evaluate()[0]
+
+
+def test_size():
+    assert len(ChessBoard().to_bytes()) == POSITION_SIZE
+
+
+@pytest.mark.parametrize("sans", [
+    (),
+    ("e4",),
+    ("e4", "Nf6", "e5", "d5"),
+    ("e4", "e5", "Nf3", "Nc6", "Bc4", "Bc5", "O-O", "Nf6"),
+    ("Nf3", "Nf6", "Ng1", "Ng8", "Nf3"),
+])
+def test_round_trip_after_play(sans):
+    chess_board = play(ChessBoard(), *sans)
+    copy = ChessBoard.from_bytes(chess_board.to_bytes())
+    assert_same_position(copy, chess_board)
+    assert copy.move_history == []
+
+
+def test_en_passant_square_survives():
+    chess_board = play(ChessBoard(), "e4", "Nf6", "e5", "d5")
+    copy = ChessBoard.from_bytes(chess_board.to_bytes())
+    assert copy.en_passant_position == (2, 3)
+    assert parse_san(copy, "exd6").to_position == (2, 3)
+
+
+def test_unmoved_flags_survive():
+    # The rooks go out and back: on their squares but without their rights
+    chess_board = play(ChessBoard(), "a4", "h5", "Ra3", "Rh6", "Ra1", "Rh8")
+    copy = ChessBoard.from_bytes(chess_board.to_bytes())
+    assert copy.castling_rights == WHITE_KINGSIDE | BLACK_QUEENSIDE
+    assert not copy.get_piece_at_position(7, 0).is_initial_position
+    assert not copy.get_piece_at_position(0, 7).is_initial_position
+    assert copy.get_piece_at_position(7, 7).is_initial_position
+    assert copy.get_piece_at_position(6, 1).is_initial_position
+    assert not copy.get_piece_at_position(4, 0).is_initial_position
+
+
+def test_side_to_move_and_clocks_survive():
+    fen = "r3k2r/8/8/8/8/8/8/R3K2R b kq - 37 52"
+    copy = ChessBoard.from_bytes(ChessBoard.from_fen(fen).to_bytes())
+    assert copy.to_fen() == fen
+    assert copy.side_to_move == "Black"
+    assert copy.castling_rights == BLACK_KINGSIDE | BLACK_QUEENSIDE
+
+
+def test_pack_into_a_memoryview_at_an_offset():
+    chess_board = play(ChessBoard(), "d4", "c5", "d5", "e5")
+    buffer = bytearray(b"\xAA" * (3 + 2 * POSITION_SIZE))
+    view = memoryview(buffer)
+    ChessBoard().pack_into(view, 3)
+    chess_board.pack_into(view, 3 + POSITION_SIZE)
+    # Nothing outside the two records is touched
+    assert buffer[:3] == b"\xAA" * 3
+    assert_same_position(ChessBoard.from_bytes(view, 3), ChessBoard())
+    assert_same_position(
+        ChessBoard.from_bytes(view, 3 + POSITION_SIZE), chess_board)
+
+
+def test_load_bytes_replaces_the_position():
+    chess_board = play(ChessBoard(), "e4", "e5")
+    packed = chess_board.to_bytes()
+    other = play(ChessBoard(), "d4")
+    other.load_bytes(packed)
+    assert_same_position(other, chess_board)
+    assert other.move_history == []
+    assert perft(other, "White", 2) == perft(chess_board, "White", 2)
+
+
+def test_invalid_piece_code():
+    data = bytearray(ChessBoard().to_bytes())
+    data[20] = 0x3F
+    with pytest.raises(ValueError):
+        ChessBoard.from_bytes(bytes(data))
+
+
+def test_from_bytes_skips_the_starting_position(monkeypatch):
+    packed = play(ChessBoard(), "e4", "c5").to_bytes()
+
+    def fail(self):
+        raise AssertionError("the starting position was set up")
+
+    monkeypatch.setattr(ChessBoard, "__init__", fail)
+    copy = ChessBoard.from_bytes(packed)
+    copy.make_move(parse_san(copy, "Nf3"))
+    assert copy.unmake_move() is not None
+    assert copy.to_bytes() == packed
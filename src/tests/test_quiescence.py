@@ -0,0 +1,62 @@
+"""
+The quiescence search at the leaves of minimax.
+"""
+import math
+from ai import AI
+from board import ChessBoard
+from pgn import parse_san
+
+# White's queen can take a pawn on d5 that the c6 pawn defends
+DEFENDED_PAWN = "4k3/8/2p5/3p4/8/8/8/3QK3 w - - 0 1"
+# White's rook can take Black's undefended queen
+HANGING_QUEEN = "4k3/8/8/3q4/8/8/8/3RK3 w - - 0 1"
+
+
+def static_after(fen, *sans):
+    chess_board = ChessBoard.from_fen(fen)
+    for san in sans:
+        chess_board.make_move(parse_san(chess_board, san))
+    return AI(chess_board, 1).evaluate()[0]
+
+
+def test_stands_pat_rather_than_lose_the_queen():
+    ai = AI(ChessBoard.from_fen(DEFENDED_PAWN), 1)
+    score, move = ai.quiescence(False, -math.inf, math.inf, 0)
+    assert move is None
+    assert score == ai.evaluate()[0]
+    # Taking would have looked good to a static evaluation
+    assert static_after(DEFENDED_PAWN, "Qxd5") < score
+    assert static_after(DEFENDED_PAWN, "Qxd5", "cxd5") > score
+
+
+def test_wins_a_hanging_piece():
+    ai = AI(ChessBoard.from_fen(HANGING_QUEEN), 1)
+    score, _ = ai.quiescence(False, -math.inf, math.inf, 0)
+    assert score == static_after(HANGING_QUEEN, "Rxd5")
+    assert score < ai.evaluate()[0] - 800
+
+
+def test_black_side_and_the_board_is_restored():
+    fen = "3rk3/8/8/3Q4/8/8/8/4K3 b - - 0 1"
+    chess_board = ChessBoard.from_fen(fen)
+    ai = AI(chess_board, 1)
+    score, _ = ai.quiescence(True, -math.inf, math.inf, 0)
+    assert score == static_after(fen, "Rxd5")
+    assert chess_board.to_fen() == fen
+
+
+def test_fail_high_on_stand_pat():
+    ai = AI(ChessBoard.from_fen("3rk3/8/8/3Q4/8/8/8/4K3 b - - 0 1"), 1)
+    static = ai.evaluate()[0]
+    # Already at beta, Black stands pat without looking at Rxd5
+    score, _ = ai.quiescence(True, -math.inf, static - 1, 0)
+    assert score == static
+    assert ai.nodes == 1
+
+
+def test_search_sees_past_the_horizon():
+    chess_board = ChessBoard.from_fen(DEFENDED_PAWN)
+    _, move = AI(chess_board, 1).search(1, False)
+    assert move != parse_san(chess_board, "Qxd5")
+    _, move = AI(ChessBoard.from_fen(HANGING_QUEEN), 1).search(1, False)
+    assert move == parse_san(ChessBoard.from_fen(HANGING_QUEEN), "Rxd5")
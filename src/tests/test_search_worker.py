@@ -0,0 +1,58 @@
+"""
+Background searches: stopping and cancelling them in every search mode.
+"""
+import time
+import pytest
+from ai import AI
+from board import ChessBoard
+from parallel_search import ParallelSearch, RootSplitSearch
+from search_worker import SearchWorker
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w " \
+    "KQkq - 0 1"
+SEARCHES = {
+    "single": lambda ai: ai,
+    "smp": lambda ai: ParallelSearch(ai, 2),
+    "root": lambda ai: RootSplitSearch(ai, 2),
+}
+
+
+@pytest.fixture(params=sorted(SEARCHES))
+def worker(request):
+    ai = AI(ChessBoard.from_fen(KIWIPETE))
+    search = SEARCHES[request.param](ai)
+    yield SearchWorker(search, ai)
+    if search is not ai:
+        search.close()
+
+
+def test_cancel_returns_at_once(worker):
+    worker.start(worker.ai.chess_board, 20, False)
+    # Let the first iteration finish, as it is never stopped
+    time.sleep(0.5)
+    started = time.monotonic()
+    worker.cancel()
+    assert time.monotonic() - started < 1
+    assert not worker.is_running
+    assert worker.poll() is None
+
+
+def test_stop_hands_over_a_move(worker):
+    board = worker.ai.chess_board
+    worker.start(board, 20, False)
+    time.sleep(0.5)
+    started = time.monotonic()
+    worker.stop()
+    while (result := worker.poll()) is None:
+        assert time.monotonic() - started < 1
+        time.sleep(0.005)
+    assert result[1] in board.legal_moves()
+
+
+def test_stop_does_not_reach_the_next_search(worker):
+    worker.start(worker.ai.chess_board, 20, False)
+    time.sleep(0.2)
+    worker.cancel()
+    assert worker.ai.stop_event is None
+    worker.search.search(2, False)
+    assert worker.search.completed_depth == 2
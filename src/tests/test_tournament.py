@@ -0,0 +1,83 @@
+"""
+Match scoring and single games of the self-play tournament runner.
+"""
+import math
+import pytest
+from pgn import read_games
+from tournament import Tournament, elo_difference, parse_engine, play_game
+
+
+def test_even_score():
+    elo, margin = elo_difference(5, 10, 5)
+    assert elo == 0.0
+    assert 0 < margin < math.inf
+
+
+def test_winning_score():
+    elo, margin = elo_difference(10, 5, 5)
+    # A 62.5% score
+    assert elo == pytest.approx(88.7, abs=0.1)
+    assert 0 < margin < math.inf
+
+
+@pytest.mark.parametrize("wins, draws, losses", [
+    (0, 0, 0), (1, 0, 0), (0, 12, 0), (3, 0, 0)])
+def test_unknown_margin(wins, draws, losses):
+    _, margin = elo_difference(wins, draws, losses)
+    assert margin == math.inf
+
+
+def test_perfect_scores():
+    assert elo_difference(4, 0, 0)[0] == math.inf
+    assert elo_difference(0, 0, 4)[0] == -math.inf
+
+
+def test_parse_engine():
+    config = parse_engine("name=deep,depth=4,hash=32,Queen=9.5")
+    assert config["name"] == "deep"
+    assert config["player"] == {"depth": 4}
+    assert config["hash"] == 32
+    assert config["piece_score"] == {"Queen": 9.5}
+    assert parse_engine("depth=2")["name"] == "depth=2"
+    with pytest.raises(ValueError):
+        parse_engine("colour=red")
+    with pytest.raises(ValueError):
+        parse_engine("depth=deep")
+
+
+def test_schedule_swaps_colours():
+    first, second = parse_engine("name=a"), parse_engine("name=b")
+    tournament = Tournament(first, second, 4, openings=["x", "y"],
+                            workers=1)
+    assert [(white["name"], fen) for _, white, _, fen
+            in tournament.schedule()] == \
+        [("a", "x"), ("b", "x"), ("a", "y"), ("b", "y")]
+
+
+def test_add_result():
+    first, second = parse_engine("name=a"), parse_engine("name=b")
+    tournament = Tournament(first, second, 4, workers=1)
+    for white, black, result in (("a", "b", "1-0"), ("b", "a", "1-0"),
+                                 ("b", "a", "0-1"), ("a", "b", "1/2-1/2")):
+        tournament.add_result({
+            "white": white, "black": black, "result": result,
+            "nodes": {"White": 10, "Black": 5},
+            "search_time": {"White": 0.5, "Black": 0.25}})
+    assert (tournament.wins, tournament.draws, tournament.losses) == \
+        (2, 1, 1)
+    assert tournament.nodes == 60
+    assert tournament.search_time == 3.0
+
+
+def test_play_game():
+    white = parse_engine("name=a,depth=1")
+    black = parse_engine("name=b,depth=1")
+    fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+    record = play_game(0, white, black, fen, max_plies=4)
+    assert record["plies"] == 4
+    assert record["result"] == "1/2-1/2"
+    assert (record["white"], record["black"]) == ("a", "b")
+    game, = read_games(record["pgn"].splitlines())
+    assert game.headers["Termination"] == "adjudicated after 4 plies"
+    assert len(game.moves) == 4
+    assert len([move for _, move in game.replay()]) == 4
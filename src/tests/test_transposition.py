@@ -0,0 +1,128 @@
+"""
+Transposition table entry packing and the storing of mate scores.
+"""
+from ai import AI
+from board import ChessBoard
+from pieces import Move
+from pieces.move_generator import CAPTURE, PROMOTION_FLAGS
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, \
+    UPPER_BOUND
+
+
+def test_entry_round_trip():
+    table = TranspositionTable(1)
+    move = Move((1, 4), (0, 5), CAPTURE | PROMOTION_FLAGS["Knight"])
+    table.store(0x123456789ABCDEF0, 12, -98765, LOWER_BOUND, move)
+    assert table.probe(0x123456789ABCDEF0) == (12, -98765, LOWER_BOUND,
+                                               move)
+
+
+def test_entry_without_move():
+    table = TranspositionTable(1)
+    table.store(42, 3, 0, UPPER_BOUND)
+    assert table.probe(42) == (3, 0, UPPER_BOUND, None)
+
+
+def test_missing_key():
+    table = TranspositionTable(1)
+    table.store(42, 3, 10, EXACT)
+    assert table.probe(43) is None
+
+
+def test_bucket_keeps_the_deeper_entry():
+    table = TranspositionTable(1)
+    buckets = TranspositionTable.size_bytes(1) // \
+        TranspositionTable.BUCKET_BYTES
+    # Three keys of the same bucket
+    deep, shallow, newer = 5, 5 + buckets, 5 + 2 * buckets
+    table.store(deep, 8, 1, EXACT)
+    table.store(shallow, 2, 2, EXACT)
+    table.store(newer, 1, 3, EXACT)
+    assert table.probe(deep) == (8, 1, EXACT, None)
+    assert table.probe(shallow) is None
+    assert table.probe(newer) == (1, 3, EXACT, None)
+
+
+def test_older_generations_give_up_the_deep_slot():
+    table = TranspositionTable(1)
+    buckets = TranspositionTable.size_bytes(1) // \
+        TranspositionTable.BUCKET_BYTES
+    deep, used, shallow, newer = (7 + n * buckets for n in range(4))
+    table.store(deep, 9, 1, EXACT)
+    table.new_search()
+    table.store(shallow, 1, 2, EXACT)
+    assert table.probe(deep) is None
+    assert table.probe(shallow) == (1, 2, EXACT, None)
+
+    # A deep entry the new search looks up is kept
+    table.store(used, 9, 3, EXACT)
+    table.new_search()
+    assert table.probe(used) == (9, 3, EXACT, None)
+    table.store(newer, 1, 4, EXACT)
+    assert table.probe(used) == (9, 3, EXACT, None)
+    assert table.probe(newer) == (1, 4, EXACT, None)
+
+
+def test_generations_wrap_around():
+    table = TranspositionTable(1, generation=3)
+    assert table.generation == 3
+    table.new_search()
+    assert table.generation == 0
+    table.store(42, 3, 10, EXACT)
+    assert table.probe(42) == (3, 10, EXACT, None)
+
+
+def test_fractional_scores_are_rounded():
+    table = TranspositionTable(1)
+    table.store(42, 3, 950.6, LOWER_BOUND)
+    table.store(43, 3, -950.6, UPPER_BOUND)
+    assert table.probe(42)[1] == 951
+    assert table.probe(43)[1] == -951
+
+
+def test_fractional_piece_values_give_integer_scores():
+    chess_board = ChessBoard.from_fen(
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQK1NR w KQkq - 0 1")
+    ai = AI(chess_board, 1)
+    ai.piece_score["Bishop"] = 3.255
+    score, _ = ai.evaluate()
+    assert isinstance(score, int)
+    assert score == ai.evaluate(full=True)[0]
+    # White is a bishop short: 3.255 pawns, rounded to 326 centipawns
+    assert score - chess_board.piece_square_score == 326
+
+
+def test_clear():
+    table = TranspositionTable(1)
+    table.store(42, 3, 10, EXACT)
+    table.clear()
+    assert table.probe(42) is None
+
+
+def test_mate_scores_are_stored_relative_to_the_node():
+    ai = AI(ChessBoard(), 1)
+    mate_in_three_plies = ai.MATE_SCORE - 3
+    # Found two plies from the root: the mate is one ply from the node
+    stored = ai.score_to_table(mate_in_three_plies, 2)
+    assert stored == ai.MATE_SCORE - 1
+    # Probed at ply 4 of a later search, the mate is five plies from there
+    assert ai.score_from_table(stored, 4) == ai.MATE_SCORE - 5
+    assert ai.score_from_table(ai.score_to_table(-mate_in_three_plies, 2),
+                               2) == -mate_in_three_plies
+    assert ai.score_to_table(250, 7) == 250
+
+
+def test_mate_distance_survives_the_table_between_searches():
+    # White mates in two: Kc7 and Ra1 (or Rh8)
+    chess_board = ChessBoard.from_fen("k7/8/2K5/8/8/8/8/7R w - - 0 1")
+    ai = AI(chess_board, 1)
+    score, move = ai.search(5, False)
+    assert score == -(ai.MATE_SCORE - 3)
+    chess_board.make_move(move)
+    score, reply = ai.search(4, True)
+    assert score == -(ai.MATE_SCORE - 2)
+    chess_board.make_move(reply)
+    # The table still holds this position from the first search, where it
+    # was two plies from the root
+    score, _ = ai.search(3, False)
+    assert score == -(ai.MATE_SCORE - 1)
@@ -0,0 +1,79 @@
+"""
+The UCI front end, driven through UCIEngine.handle with a text buffer as
+its output.
+"""
+import io
+import time
+import pytest
+from board import ChessBoard
+from uci import UCIEngine, move_to_uci, parse_move
+
+
+@pytest.fixture
+def engine():
+    output = io.StringIO()
+    engine = UCIEngine(output)
+    engine.output = output
+    yield engine
+    engine.handle("stop")
+    engine.run(io.StringIO("quit\n"))
+
+
+def replies(engine) -> list:
+    return engine.output.getvalue().splitlines()
+
+
+def wait_for(engine, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while engine.worker.is_running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not engine.worker.is_running
+
+
+def test_coordinate_notation():
+    chess_board = ChessBoard.from_fen("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+    move = parse_move(chess_board, "B7B8N")
+    assert move.promotion == "Knight"
+    assert move_to_uci(move) == "b7b8n"
+    with pytest.raises(ValueError):
+        parse_move(chess_board, "b7b8")
+
+
+def test_handshake(engine):
+    assert engine.handle("uci")
+    assert engine.handle("isready")
+    lines = replies(engine)
+    assert lines[0].startswith("id name ")
+    assert lines[-2:] == ["uciok", "readyok"]
+    assert engine.handle("") and engine.handle("unknown command")
+    assert engine.handle("quit") is False
+
+
+def test_position_with_moves(engine):
+    engine.handle("position startpos moves e2e4 e7e5 g1f3")
+    assert engine.chess_board.to_fen() == \
+        "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2"
+    engine.handle("position fen 4k3/8/8/8/8/8/4P3/4K3 w - - 0 1 moves e2e4")
+    assert engine.chess_board.to_fen() == "4k3/8/8/8/4P3/8/8/4K3 b - e3 0 1"
+
+
+def test_bad_position_keeps_the_last_one(engine):
+    engine.handle("position startpos moves e2e4")
+    fen = engine.chess_board.to_fen()
+    engine.handle("position startpos moves e2e5")
+    engine.handle("position fen not a fen")
+    assert engine.chess_board.to_fen() == fen
+    lines = replies(engine)
+    assert len(lines) == 2
+    assert all(line.startswith("info string ") for line in lines)
+
+
+def test_go_depth(engine):
+    engine.handle("position fen k7/8/2K5/8/8/8/8/7R w - - 0 1")
+    engine.handle("go depth 4")
+    wait_for(engine)
+    lines = replies(engine)
+    assert [line for line in lines if line.startswith("info depth ")]
+    assert "score mate 2" in lines[-2]
+    assert lines[-1].startswith("bestmove ")
+    parse_move(engine.chess_board, lines[-1].split()[1])